@@ -0,0 +1,22 @@
+"""
+Shared agent settings for the tests and the benchmark suite.
+Import after adding the project root to sys.path.
+"""
+import random
+
+
+def make_agents(count, seed=0):
+    """`count` agent settings (ids agent_1..agent_N) with seeded random traits."""
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": f"agent_{i+1}",
+            "name": f"Agent {i+1}",
+            "aggression": rnd.random(),
+            "risk_taking": rnd.random(),
+            "tyre_management": rnd.random(),
+            "pit_bias": rnd.random(),
+            "weather_sensitivity": rnd.random(),
+        }
+        for i in range(count)
+    ]
@@ -1,6 +1,13 @@
-from fastapi import FastAPI
+from time import perf_counter
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routes.simulation import router as simulation_router
+from routes.simulation import router as simulation_router, executor, profile_registry
+from routes.metrics import router as metrics_router
+from routes.jobs import router as jobs_router, job_manager
+from routes.training import router as training_router
+from services.process_pool import shutdown_pool
+from services.metrics import metrics
 
 app = FastAPI(title="PitSynapse Backend", version="0.1.0")
 
@@ -13,8 +20,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(simulation_router, prefix="/api")
+# Full path template of each included route, keyed by id() (routes are unhashable)
+_route_templates = {}
+for router, prefix in ((simulation_router, "/api"), (jobs_router, "/api"),
+                       (training_router, "/api"), (metrics_router, "")):
+    app.include_router(router, prefix=prefix)
+    _route_templates.update({id(route): prefix + route.path for route in router.routes})
+
+
+def _route_template(scope) -> str:
+    """
+    Matched route as a template (e.g. /api/jobs/{job_id}), so label values stay
+    bounded. Newer FastAPI matches the router's own (unprefixed) route object,
+    older releases a prefixed copy that already carries the full path.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    return _route_templates.get(id(route), route.path)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latency and response size per route template, for /metrics."""
+    start = perf_counter()
+    response = await call_next(request)
+    route = _route_template(request.scope)
+    metrics.observe(
+        "pitsynapse_http_request_duration_seconds",
+        perf_counter() - start,
+        {"route": route, "method": request.method, "status": str(response.status_code)},
+    )
+    size = response.headers.get("content-length")
+    if size is not None:
+        metrics.observe("pitsynapse_http_response_size_bytes", int(size), {"route": route})
+    return response
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.on_event("startup")
+def startup():
+    # Pre-fork and warm the process pool (no-op in thread / inline mode)
+    executor.start()
+    # Parse the predefined agent profiles once, before the first request
+    profile_registry.load()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    shutdown_pool()
+    executor.shutdown()
+    job_manager.shutdown()
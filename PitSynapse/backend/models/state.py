@@ -0,0 +1,103 @@
+"""
+Compact in-race state objects for the PitSynapse simulation loop.
+
+These are plain slotted dataclasses (not Pydantic models): they are allocated
+once per race and mutated in place every lap. from_dict / to_dict adapters keep
+the dict-based call sites working.
+"""
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional
+
+# Traits adapted by prl_system.update_traits_prl
+PRL_TRAITS = ("aggression", "tyre_management", "risk_taking", "pit_bias")
+
+
+@dataclass(slots=True)
+class AgentProfile:
+    id: str
+    name: str
+    aggression: float = 0.5
+    risk: float = 0.5  # read by decide_action; not adapted by PRL
+    risk_taking: float = 0.5
+    tyre_management: float = 0.6
+    pit_bias: float = 0.5
+    weather_sensitivity: float = 0.5
+    learning_rate: float = 0.02
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentProfile":
+        return cls(
+            id=data.get("id", ""),
+            name=data.get("name", data.get("id", "")),
+            aggression=float(data.get("aggression", 0.5)),
+            risk=float(data.get("risk", 0.5)),
+            risk_taking=float(data.get("risk_taking", data.get("risk", 0.5))),
+            tyre_management=float(data.get("tyre_management", 0.6)),
+            pit_bias=float(data.get("pit_bias", 0.5)),
+            weather_sensitivity=float(data.get("weather_sensitivity", 0.5)),
+            learning_rate=float(data.get("learning_rate", 0.02)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def prl_traits(self) -> Dict[str, float]:
+        return {key: getattr(self, key) for key in PRL_TRAITS}
+
+
+@dataclass(slots=True)
+class AgentState:
+    position: int
+    tyre_wear: float = 0.0
+    tyre_age: int = 0
+    pit_next: bool = False
+    gap_ahead: float = 999.0
+    last_lap_time: Optional[float] = None
+    best_lap: Optional[float] = None
+    pit_stops: int = 0
+    total_time: float = 0.0
+
+    # Per-lap scratch values, overwritten every lap
+    prev_position: int = 0
+    action: str = "maintain"
+    lap_time: float = 0.0
+    lap_wear: float = 0.0
+    did_pit: bool = False
+    pit_time: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentState":
+        return cls(
+            position=int(data.get("position", 1)),
+            tyre_wear=float(data.get("tyre_wear", 0.0)),
+            tyre_age=int(data.get("tyre_age", 0)),
+            pit_next=bool(data.get("pit_next", False)),
+            gap_ahead=float(data.get("gap_ahead", 999.0)),
+            last_lap_time=data.get("last_lap_time"),
+            best_lap=data.get("best_lap"),
+            pit_stops=int(data.get("pit_stops", 0)),
+            total_time=float(data.get("total_time", 0.0)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class RaceState:
+    laps_remaining: int = 0
+    weather: str = "dry"
+    leader_position: int = 1
+    total_agents: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RaceState":
+        return cls(
+            laps_remaining=int(data.get("laps_remaining", 0)),
+            weather=data.get("weather", "dry"),
+            leader_position=int(data.get("leader_position", 1)),
+            total_agents=int(data.get("total_agents", 0)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
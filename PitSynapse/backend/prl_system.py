@@ -1,5 +1,10 @@
 # backend/logic/prl_system.py
 
+import numpy as np
+
+PRL_TRAIT_KEYS = ("aggression", "tyre_management", "risk_taking", "pit_bias")
+
+
 def clamp(val, min_v=0.0, max_v=1.0):
     return max(min_v, min(max_v, val))
 
@@ -33,7 +38,7 @@ def update_traits_prl(agent_traits, performance_data, learning_rate=0.02):
     Executed once per lap per agent.
 
     Args:
-        agent_traits: dict {
+        agent_traits: models.state.AgentProfile, or dict {
             aggression,
             tyre_management,
             risk_taking,
@@ -60,6 +65,10 @@ def update_traits_prl(agent_traits, performance_data, learning_rate=0.02):
         }
     """
 
+    # AgentProfile adapter: read the four adapted traits
+    if hasattr(agent_traits, "prl_traits"):
+        agent_traits = agent_traits.prl_traits()
+
     # ---- Skip Lap 1 (No baseline) ----
     if performance_data.get("lap_number", 1) == 1:
         return {
@@ -174,3 +183,102 @@ def update_traits_prl(agent_traits, performance_data, learning_rate=0.02):
             for key in new_traits
         }
     }
+
+
+def update_traits_prl_batch(
+    agent_traits,
+    lap_time,
+    best_lap,
+    tyre_wear_increase,
+    position_before,
+    position_after,
+    total_cars,
+    pitted,
+    expected_wear,
+    learning_rate=0.02,
+):
+    """
+    Array form of update_traits_prl for the whole field in one call.
+    Values match the scalar version element for element (same operations in
+    the same order, in float64).
+
+    The lap-1 skip is left to the caller: call this from lap 2 on.
+
+    Args:
+        agent_traits: dict {aggression, tyre_management, risk_taking, pit_bias}
+            of per-agent arrays
+        lap_time, best_lap, tyre_wear_increase: per-agent arrays
+        position_before, position_after: per-agent arrays
+        total_cars: int
+        pitted: per-agent bool array
+        expected_wear: float
+        learning_rate: float or per-agent array
+
+    Returns:
+        {
+            "traits": {k: updated array},
+            "reward_signal": R array,
+            "changes": {k: delta array},
+        }
+    """
+    lap_time = np.asarray(lap_time, dtype=float)
+    best = np.maximum(np.asarray(best_lap, dtype=float), 0.01)
+    wear_increase = np.asarray(tyre_wear_increase, dtype=float)
+    lr = np.asarray(learning_rate, dtype=float)
+
+    # 1. Reward components
+    R_time = np.clip((best - lap_time) / best, -1.0, 1.0)
+
+    expected_wear = max(expected_wear, 0.001)
+    tyre_eff = 1.0 - (wear_increase / expected_wear)
+    R_tyre = np.clip(tyre_eff, -1.0, 1.0)
+
+    position_delta = np.asarray(position_before) - np.asarray(position_after)
+    R_position = np.clip(position_delta / total_cars, -1.0, 1.0)
+
+    # 2. Combined reward
+    R = np.clip(0.4 * R_time + 0.3 * R_tyre + 0.3 * R_position, -1.0, 1.0)
+    abs_R = np.abs(R)
+    positive = R > 0
+
+    # 3. Aggression
+    delta_agg = np.where(
+        positive,
+        np.where(position_delta > 0, lr * R, -lr * R * 0.5),
+        np.where(position_delta < 0, -lr * abs_R, lr * abs_R * 0.5),
+    )
+
+    # 4. Tyre management
+    delta_tyre = np.where(
+        tyre_eff > 0.8,
+        lr * R,
+        np.where(tyre_eff < 0.5, -lr * abs_R, lr * R * 0.5),
+    )
+
+    # 5. Risk-taking
+    delta_risk = np.where(
+        positive & (position_delta > 0),
+        lr * R,
+        np.where((R < 0) & (position_delta < 0), -lr * abs_R, lr * R * 0.3),
+    )
+
+    # 6. Pit bias (only for cars that pitted this lap)
+    time_loss = lap_time - best * 1.05
+    delta_pit = np.where(
+        np.asarray(pitted, dtype=bool),
+        np.clip(
+            np.where(time_loss < 0, lr * np.abs(time_loss) * 0.5, -lr * time_loss * 0.3),
+            -0.05, 0.05,
+        ),
+        0.0,
+    )
+
+    # 7. Apply & clamp
+    new_traits = {}
+    changes = {}
+    for key, delta in zip(PRL_TRAIT_KEYS, (delta_agg, delta_tyre, delta_risk, delta_pit)):
+        current = np.asarray(agent_traits[key], dtype=float)
+        new_traits[key] = np.clip(current + delta, 0.1, 0.9)
+        changes[key] = new_traits[key] - current
+
+    return {"traits": new_traits, "reward_signal": R, "changes": changes}
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel
+import os
+from typing import Optional
+
+from services.jobs import JobManager, QueueFull
+from services.metrics import metrics
+from services.encoding import dumps
+from services.execution import records_body
+from routes.simulation import SimulationRequest, SimulationResponse, _simulation_call, check_response
+
+router = APIRouter()
+
+# Fixed pool for queued simulations, separate from the request thread pool
+job_manager = JobManager(
+    workers=int(os.environ.get("PITSYNAPSE_JOB_WORKERS", 2)),
+    max_queued=int(os.environ.get("PITSYNAPSE_JOB_QUEUE", 32)),
+    ttl_seconds=float(os.environ.get("PITSYNAPSE_JOB_TTL", 600)),
+    max_bytes=int(os.environ.get("PITSYNAPSE_JOB_MAX_BYTES", 128 * 1024 * 1024)),
+)
+
+# ============================================================
+# Response Models
+# ============================================================
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str  # queued, running, done, failed, cancelled
+    laps_completed: int
+    total_laps: int
+    created_at: float
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[SimulationResponse] = None  # set once status is "done"
+
+
+def _job_metrics():
+    stats = job_manager.stats()
+    for status, count in stats["jobs"].items():
+        yield ("pitsynapse_jobs", "gauge", "Retained simulation jobs by status.",
+               {"status": status}, count)
+    yield ("pitsynapse_job_result_bytes", "gauge", "Serialized size of retained job results.",
+           {}, stats["result_bytes"])
+    yield ("pitsynapse_jobs_rejected_total", "counter", "Job submissions refused with 429.",
+           {}, stats["rejected"])
+
+
+metrics.add_collector(_job_metrics)
+
+
+def _status_response(job) -> Response:
+    """JobStatus body encoded directly (the result is trusted engine output)."""
+    status = job.to_dict()
+    if status["result"] is not None:
+        check_response(status["result"])
+        status["result"] = records_body(status["result"])
+    return Response(content=dumps(status), media_type="application/json")
+
+# ============================================================
+# Routes
+# ============================================================
+
+@router.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(request: SimulationRequest):
+    """
+    Queue a simulation and return its job id right away.
+    Poll GET /api/jobs/{job_id} for progress and the result.
+    Returns 429 when the job queue is full.
+    """
+    if len(request.agents) == 0:
+        raise HTTPException(status_code=400, detail="At least one agent required.")
+
+    try:
+        job = job_manager.submit(
+            _simulation_call(request),
+            total_laps=request.race.total_laps,
+            engine=request.engine,
+            agent_laps=request.race.total_laps * len(request.agents),
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Status, laps completed and, once done, the simulation result."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job.")
+    return _status_response(job)
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job (a running one stops within one lap)."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job.")
+    return _status_response(job)
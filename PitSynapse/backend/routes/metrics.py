@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Response
+
+from services.metrics import metrics, CONTENT_TYPE
+from services.profiling import phase_totals
+from routes.simulation import result_cache
+
+router = APIRouter()
+
+
+def _cache_metrics():
+    stats = result_cache.stats()
+    for tier in ("memory", "disk"):
+        yield ("pitsynapse_cache_hits_total", "counter", "Result cache hits by tier.",
+               {"tier": tier}, stats[f"{tier}_hits"])
+    for key in ("misses", "stores", "evictions"):
+        yield (f"pitsynapse_cache_{key}_total", "counter", f"Result cache {key}.", {}, stats[key])
+    yield ("pitsynapse_cache_entries", "gauge", "Results held in the memory tier.", {}, stats["entries"])
+    yield ("pitsynapse_cache_bytes", "gauge", "Serialized size of the memory tier.", {}, stats["bytes"])
+
+
+def _phase_metrics():
+    totals = phase_totals.snapshot()
+    for phase, values in totals["phases"].items():
+        yield ("pitsynapse_simulation_phase_seconds_total", "counter",
+               "Time per simulation phase over runs with phase_timings.",
+               {"phase": phase}, values["seconds"])
+    for phase, values in totals["phases"].items():
+        yield ("pitsynapse_simulation_phase_calls_total", "counter",
+               "Calls per simulation phase over runs with phase_timings.",
+               {"phase": phase}, values["calls"])
+
+
+metrics.add_collector(_cache_metrics)
+metrics.add_collector(_phase_metrics)
+
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus text exposition format."""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
@@ -1,24 +1,72 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, Response
 from pydantic import BaseModel, Field, validator
 import asyncio
+from functools import partial
+import os
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 
-from services.simulation_runner import run_simulation
+from services.simulation_runner import run_simulation, ENGINES, ENGINE_VERSION, EVENT_TYPES, AGENT_PROFILES_PATH
+from services.ensemble import run_ensemble
+from services.branching import run_branches, OVERRIDE_TYPES
+from services.strategy import optimize_strategy, MAX_STOPS
+from services.profile_store import ProfileStore, profile_settings
+from services.profile_registry import ProfileRegistry
+from services.result_cache import ResultCache, cache_key
+from services.overtakes import OVERTAKE_SAMPLING
+from services.execution import SimulationExecutor, render_result
 
 router = APIRouter()
 
+# Alternative /api/simulate response formats, selected with the Accept header
+COLUMNAR_JSON = "application/vnd.pitsynapse.columnar+json"
+NPZ = "application/vnd.pitsynapse.npz"
+
+# Where /api/simulate runs: "thread" (default), "process" or "inline"
+executor = SimulationExecutor(mode=os.environ.get("PITSYNAPSE_EXECUTION", "thread"))
+
+# Check engine output against SimulationResponse before sending (debug / tests)
+VALIDATE_RESPONSES = os.environ.get("PITSYNAPSE_VALIDATE_RESPONSES", "0") == "1"
+
+# Seeded results are pure functions of the request, so they can be reused
+result_cache = ResultCache(
+    max_bytes=int(os.environ.get("PITSYNAPSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    disk_dir=os.environ.get("PITSYNAPSE_CACHE_DIR") or None,
+)
+
+# Traits an agent must give unless it references a stored profile
+CORE_TRAITS = ("aggression", "risk_taking", "tyre_management", "pit_bias")
+
+# Learned profiles (services.training), referenced by AgentSettings.profile_id
+profile_store = ProfileStore(
+    os.environ.get("PITSYNAPSE_PROFILE_DIR")
+    or Path(__file__).parent.parent.parent / "data" / "learned_profiles"
+)
+
+# Predefined profiles (agent_profiles.json or f1_ingest output), loaded once
+# and re-read when the file changes; checked before the learned store
+profile_registry = ProfileRegistry(
+    os.environ.get("PITSYNAPSE_AGENT_PROFILES") or AGENT_PROFILES_PATH,
+    check_interval=float(os.environ.get("PITSYNAPSE_PROFILE_RELOAD_SECONDS", 1.0)),
+)
+
 # ============================================================
 # Request & Response Models
 # ============================================================
 
 class AgentSettings(BaseModel):
+    """
+    Either all four core traits, or a `profile_id` naming a stored learned
+    profile (traits given alongside it override the stored ones).
+    """
     id: Optional[str] = None
     name: Optional[str] = None
-    aggression: float = Field(..., ge=0.0, le=1.0)
-    risk_taking: float = Field(..., ge=0.0, le=1.0)
-    tyre_management: float = Field(..., ge=0.0, le=1.0)
-    pit_bias: float = Field(..., ge=0.0, le=1.0)
-    weather_sensitivity: Optional[float] = Field(default=0.5, ge=0.0, le=1.0)
+    profile_id: Optional[str] = None
+    aggression: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    risk_taking: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    tyre_management: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    pit_bias: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    weather_sensitivity: Optional[float] = Field(default=None, ge=0.0, le=1.0)  # 0.5 if unset
 
 class RaceParams(BaseModel):
     total_laps: int = Field(..., ge=1, le=200)
@@ -32,9 +80,86 @@ class RaceParams(BaseModel):
             raise ValueError(f"weather must be one of {allowed}")
         return v
 
+class OutputOptions(BaseModel):
+    """Which outputs to build. Summary is always returned."""
+    timeline: bool = True
+    events: Optional[List[str]] = None  # None = all event types, [] = no events
+    max_overtakes: Optional[int] = Field(default=None, ge=0)  # per lap; None = max(100, 2 x agents)
+    overtake_sampling: str = Field(default="first")  # "first" or "spread" when capped
+    phase_timings: bool = False  # add a per-phase timing "metadata" block (bypasses the cache)
+
+    @validator("overtake_sampling")
+    def validate_overtake_sampling(cls, v):
+        if v not in OVERTAKE_SAMPLING:
+            raise ValueError(f"overtake_sampling must be one of {list(OVERTAKE_SAMPLING)}")
+        return v
+
+    @validator("events")
+    def validate_events(cls, v):
+        if v is not None:
+            unknown = set(v).difference(EVENT_TYPES)
+            if unknown:
+                raise ValueError(f"events must be a subset of {list(EVENT_TYPES)}")
+        return v
+
+
 class SimulationRequest(BaseModel):
     race: RaceParams
     agents: List[AgentSettings]
+    engine: str = Field(default="python")
+    seed: Optional[int] = None
+    outputs: OutputOptions = Field(default_factory=OutputOptions)
+
+    @validator("engine")
+    def validate_engine(cls, v):
+        if v not in ENGINES:
+            raise ValueError(f"engine must be one of {list(ENGINES)}")
+        return v
+
+
+class EnsembleRequest(SimulationRequest):
+    runs: int = Field(default=100, ge=1, le=10000)
+
+
+class BranchOverride(BaseModel):
+    type: str  # "pit", "action" or "traits"
+    agent_id: str
+    lap: Optional[int] = None  # pit / action: the lap it applies to (after fork_lap)
+    action: Optional[str] = None  # action: one of agent_logic.ACTIONS
+    traits: Optional[Dict[str, float]] = None  # traits: new values from the fork on
+
+    @validator("type")
+    def validate_type(cls, v):
+        if v not in OVERRIDE_TYPES:
+            raise ValueError(f"type must be one of {list(OVERRIDE_TYPES)}")
+        return v
+
+
+class Branch(BaseModel):
+    name: Optional[str] = None
+    overrides: List[BranchOverride] = Field(default_factory=list)
+
+
+class BranchRequest(SimulationRequest):
+    fork_lap: int = Field(..., ge=0)
+    branches: List[Branch] = Field(..., min_length=1, max_length=64)
+
+
+class StrategyRequest(SimulationRequest):
+    agent_id: str  # whose pit strategy is optimized
+    stops: List[int] = Field(default_factory=lambda: [1, 2, 3], min_length=1)
+    min_stint: int = Field(default=1, ge=1)
+    pace: str = Field(default="maintain")  # action on every non-pit lap
+    top_k: int = Field(default=5, ge=1, le=50)
+    initial_samples: int = Field(default=8, ge=1, le=4096)
+    max_samples: int = Field(default=512, ge=1, le=4096)
+    prescreen: Optional[int] = Field(default=None, ge=1)  # surrogate shortlist size
+
+    @validator("stops")
+    def validate_stops(cls, v):
+        if any(not 1 <= k <= MAX_STOPS for k in v):
+            raise ValueError(f"stops must be between 1 and {MAX_STOPS}")
+        return sorted(set(v))
 
 
 class TimelineEntry(BaseModel):
@@ -51,12 +176,68 @@ class Summary(BaseModel):
     avg_tyre_wear: float
     pit_stops: Dict[str, int]
     winner: str
+    finishing_order: Optional[List[str]] = None
 
 
 class SimulationResponse(BaseModel):
     timeline: List[TimelineEntry]
     summary: Summary
     events: Optional[List[Dict[str, Any]]] = None
+    metadata: Optional[Dict[str, Any]] = None  # only with outputs.phase_timings
+
+
+class EnsembleResponse(BaseModel):
+    runs: int
+    win_probability: Dict[str, float]
+    position_histogram: Dict[str, List[int]]
+    pit_stop_distribution: Dict[str, Dict[str, int]]
+    fastest_lap_quantiles: Dict[str, float]
+
+
+class BranchDelta(BaseModel):
+    total_time: float  # branch minus baseline, seconds
+    position: int  # positive = finished lower than in the baseline
+    pit_stops: int
+
+
+class BranchBaseline(BaseModel):
+    summary: Summary
+    total_time: Dict[str, float]
+
+
+class BranchResult(BaseModel):
+    name: str
+    summary: Summary
+    deltas: Dict[str, BranchDelta]
+
+
+class BranchResponse(BaseModel):
+    fork_lap: int
+    baseline: BranchBaseline
+    branches: List[BranchResult]
+
+
+class StrategyRound(BaseModel):
+    candidates: int
+    samples: int
+
+
+class Strategy(BaseModel):
+    pit_laps: List[int]
+    stops: int
+    samples: int
+    mean_time: float
+    std: float
+    ci95: List[float]  # [low, high], seconds
+
+
+class StrategyResponse(BaseModel):
+    agent_id: str
+    candidates: int
+    prescreened: Optional[int] = None
+    evaluations: int
+    rounds: List[StrategyRound]
+    strategies: List[Strategy]
 
 
 # ============================================================
@@ -68,33 +249,284 @@ async def health_check():
     return {"status": "ok"}
 
 
-@router.post("/simulate", response_model=SimulationResponse)
-async def simulate(request: SimulationRequest):
+@router.get("/cache/stats")
+async def cache_stats():
+    return result_cache.stats()
+
+
+def _agent_settings(agents: List[AgentSettings]) -> List[Dict[str, Any]]:
+    """
+    Agent settings for the engines, with stored profiles resolved.
+    Raises HTTP 400 for an unknown profile_id or an agent without traits.
+    """
+    settings = []
+    for agent in agents:
+        values = agent.dict()
+        profile_id = values.pop("profile_id")
+        if profile_id is None:
+            missing = [key for key in CORE_TRAITS if values[key] is None]
+            if missing:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Agent needs a profile_id or values for {missing}.",
+                )
+            settings.append({key: value for key, value in values.items() if value is not None})
+            continue
+        profile = profile_registry.get(profile_id) or profile_store.get(profile_id)
+        if profile is None:
+            raise HTTPException(status_code=400, detail=f"Unknown profile_id {profile_id!r}.")
+        settings.append(profile_settings(profile, values))
+    return settings
+
+
+def _request_cache_key(request: SimulationRequest, layout: str, agent_settings: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Canonical key for a seeded request; None when the run is not reproducible
+    or carries per-run timings. Keyed on the resolved agent settings, so
+    retraining a stored profile never serves stale results.
+    """
+    if request.seed is None or request.outputs.phase_timings:
+        return None
+    return cache_key({
+        "engine_version": ENGINE_VERSION,
+        "layout": layout,
+        "request": {**request.dict(), "agents": agent_settings},
+    })
+
+
+def _simulation_args(request: SimulationRequest, layout: str = "records"):
+    """(race_params, agent_settings, options) for run_simulation from a request."""
+    options = {
+        "seed": request.seed,
+        "engine": request.engine,
+        "layout": layout,
+        "include_timeline": request.outputs.timeline,
+        "event_types": request.outputs.events,
+        "max_overtakes": request.outputs.max_overtakes,
+        "overtake_sampling": request.outputs.overtake_sampling,
+        "phase_timings": request.outputs.phase_timings,
+    }
+    return request.race.dict(), _agent_settings(request.agents), options
+
+
+def _simulation_call(request: SimulationRequest, layout: str = "records") -> partial:
+    """run_simulation bound to a request's race, agents and output options."""
+    race_params, agent_settings, options = _simulation_args(request, layout)
+    return partial(run_simulation, race_params, agent_settings, **options)
+
+
+def _negotiate_format(accept: Optional[str]) -> str:
+    """Pick "records" (default), "columnar" or "npz" from the Accept header."""
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type == COLUMNAR_JSON:
+            return "columnar"
+        if media_type in (NPZ, "application/x-npz"):
+            return "npz"
+    return "records"
+
+
+def check_response(result: Dict[str, Any], fmt: str = "records"):
+    """
+    Response bodies are encoded without validation: the engines' output is
+    trusted. With PITSYNAPSE_VALIDATE_RESPONSES=1 (debug / tests) a records
+    result is checked against SimulationResponse first.
+    """
+    if fmt == "records" and VALIDATE_RESPONSES:
+        SimulationResponse(**result)
+
+
+_MEDIA_TYPES = {"records": "application/json", "columnar": COLUMNAR_JSON, "npz": NPZ}
+
+
+def _response(body: bytes, result: Optional[Dict[str, Any]], fmt: str) -> Response:
+    """`body` as a `fmt` response; `result` (its objects) is only needed for check_response."""
+    check_response(result, fmt)
+    # Returning a Response skips FastAPI's response_model validation and
+    # encoding; the declared models still document the schema in OpenAPI
+    return Response(content=body, media_type=_MEDIA_TYPES[fmt])
+
+
+def _render(result: Dict[str, Any], fmt: str) -> Response:
+    return _response(render_result(result, fmt), result, fmt)
+
+
+@router.post(
+    "/simulate",
+    response_model=SimulationResponse,
+    responses={
+        200: {
+            "content": {
+                COLUMNAR_JSON: {"schema": {"type": "object"}},
+                NPZ: {"schema": {"type": "string", "format": "binary"}},
+            },
+            "description": "Records JSON by default; columnar JSON or a NumPy .npz "
+                           "archive when requested via the Accept header.",
+        }
+    },
+)
+async def simulate(request: SimulationRequest, accept: Optional[str] = Header(default=None)):
     """
     Main simulation endpoint.
     Calls run_simulation() in a worker thread and returns timeline + summary.
+    Seeded requests are served from the result cache when possible.
+
+    Accept: application/vnd.pitsynapse.columnar+json returns one array per field
+    (agent ids and actions dictionary-encoded); application/vnd.pitsynapse.npz
+    returns the same columns as a compressed NumPy archive.
     """
 
     # Safety: Must have at least 1 agent
     if len(request.agents) == 0:
         raise HTTPException(status_code=400, detail="At least one agent required.")
 
+    fmt = _negotiate_format(accept)
+    layout = "records" if fmt == "records" else "columnar"
+
+    race_params, agent_settings, options = _simulation_args(request, layout)
+    key = _request_cache_key(request, layout, agent_settings)
+    if key is not None:
+        # Disk tier reads and JSON parsing stay off the event loop
+        cached = await asyncio.to_thread(result_cache.get, key)
+        if cached is not None:
+            return await asyncio.to_thread(_render, cached, fmt)
+
+    try:
+        # Run the simulation off the main event loop; the response body is
+        # encoded where it ran and served as is. The result objects are only
+        # kept (decoded, in process mode) when the cache stores them.
+        body, result = await executor.render(
+            race_params, agent_settings, fmt, keep_result=key is not None or VALIDATE_RESPONSES, **options
+        )
+        if key is not None:
+            await asyncio.to_thread(result_cache.put, key, result)
+        return _response(body, result, fmt)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Simulation failed: {str(e)}"
+        )
+
+
+@router.post("/simulate/ensemble", response_model=EnsembleResponse)
+async def simulate_ensemble(request: EnsembleRequest):
+    """
+    Monte Carlo endpoint.
+    Runs the same race `runs` times with different seeds on a process pool
+    and returns aggregate distributions instead of timelines.
+    """
+
+    if len(request.agents) == 0:
+        raise HTTPException(status_code=400, detail="At least one agent required.")
+
+    agent_settings = _agent_settings(request.agents)
     try:
-        # Convert to dict format expected by run_simulation
         race_params = request.race.dict()
-        agent_settings = [agent.dict() for agent in request.agents]
-        
-        # Run CPU-heavy simulation off the main event loop
-        result = await asyncio.to_thread(run_simulation, race_params, agent_settings)
 
-        # Validate result structure
-        if "timeline" not in result or "summary" not in result:
-            raise ValueError("Simulation returned an invalid structure.")
+        # run_ensemble blocks on the process pool; keep the event loop free
+        result = await executor.run(
+            "ensemble",
+            request.engine,
+            request.runs * request.race.total_laps * len(agent_settings),
+            partial(
+                run_ensemble,
+                race_params,
+                agent_settings,
+                request.runs,
+                seed=request.seed,
+                engine=request.engine,
+            ),
+        )
+        return EnsembleResponse(**result)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ensemble failed: {str(e)}"
+        )
+
+
+@router.post("/simulate/branch", response_model=BranchResponse)
+async def simulate_branch(request: BranchRequest):
+    """
+    What-if endpoint.
+    Simulates the race once up to `fork_lap`, then runs every branch (forced
+    pits, action overrides, trait changes) from a copy of that state in
+    parallel and returns per-agent deltas against the baseline.
+    """
+
+    if len(request.agents) == 0:
+        raise HTTPException(status_code=400, detail="At least one agent required.")
+    if request.fork_lap >= request.race.total_laps:
+        raise HTTPException(status_code=400, detail="fork_lap must be before the last lap.")
+
+    n_agents = len(request.agents)
+    remaining = request.race.total_laps - request.fork_lap
+    agent_settings = _agent_settings(request.agents)
+    try:
+        result = await executor.run(
+            "branch",
+            request.engine,
+            n_agents * (request.race.total_laps + remaining * len(request.branches)),
+            partial(
+                run_branches,
+                request.race.dict(),
+                agent_settings,
+                request.fork_lap,
+                [branch.dict() for branch in request.branches],
+                seed=request.seed,
+                engine=request.engine,
+            ),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Branching failed: {str(e)}"
+        )
+    return BranchResponse(**result)
 
-        return SimulationResponse(**result)
 
+@router.post("/simulate/strategy", response_model=StrategyResponse)
+async def simulate_strategy(request: StrategyRequest):
+    """
+    Pit-strategy optimizer.
+    Searches every one-, two- and three-stop pit-lap set for `agent_id`,
+    pruning weak candidates early with successive halving over Monte Carlo
+    samples, and returns the best strategies with 95% confidence intervals.
+    """
+
+    if not any(agent.id == request.agent_id for agent in request.agents):
+        raise HTTPException(status_code=400, detail=f"Unknown agent_id {request.agent_id!r}.")
+
+    agent_settings = _agent_settings(request.agents)
+    try:
+        result = await executor.run(
+            "strategy",
+            "numpy",  # the evaluator is NumPy whichever engine the request names
+            request.race.total_laps,
+            partial(
+                optimize_strategy,
+                request.race.dict(),
+                agent_settings,
+                request.agent_id,
+                stops=request.stops,
+                min_stint=request.min_stint,
+                pace=request.pace,
+                top_k=request.top_k,
+                initial_samples=request.initial_samples,
+                max_samples=request.max_samples,
+                prescreen=request.prescreen,
+                seed=request.seed,
+            ),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Simulation failed: {str(e)}"
+            detail=f"Strategy search failed: {str(e)}"
         )
+    return StrategyResponse(**result)
@@ -0,0 +1,107 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from functools import partial
+from typing import List, Dict, Any, Optional
+
+from services.training import train_profiles
+from routes.simulation import SimulationRequest, executor, profile_store, profile_registry, _agent_settings
+
+router = APIRouter()
+
+# ============================================================
+# Request & Response Models
+# ============================================================
+
+class TrainingRequest(SimulationRequest):
+    races: int = Field(default=10, ge=1, le=1000)  # per season; traits carry over
+    seeds: int = Field(default=4, ge=1, le=256)  # independent seasons, run in parallel
+    name: Optional[str] = None  # profile id prefix (default: the training id)
+
+
+class LearnedProfile(BaseModel):
+    profile_id: str
+    traits: Dict[str, float]
+    spread: Dict[str, float]
+
+
+class TrainingResponse(BaseModel):
+    training_id: str
+    races: int
+    seeds: int
+    profiles: Dict[str, LearnedProfile]
+    mean_position: Dict[str, List[float]]
+
+
+class StoredProfile(BaseModel):
+    profile_id: str
+    name: Optional[str] = None
+    traits: Dict[str, float]
+    meta: Dict[str, Any] = Field(default_factory=dict)
+    shapes: Optional[Dict[str, List[Any]]] = None  # registry profiles, ?shapes=true
+
+# ============================================================
+# Routes
+# ============================================================
+
+@router.post("/train", response_model=TrainingResponse)
+async def train(request: TrainingRequest):
+    """
+    Multi-race PRL training.
+    Runs `seeds` independent seasons of `races` races in parallel, carrying
+    learned traits from race to race, and stores each agent's learned profile
+    for later /api/simulate calls (AgentSettings.profile_id).
+    """
+
+    if len(request.agents) == 0:
+        raise HTTPException(status_code=400, detail="At least one agent required.")
+
+    agent_settings = _agent_settings(request.agents)
+    try:
+        result = await executor.run(
+            "train",
+            request.engine,
+            request.seeds * request.races * request.race.total_laps * len(agent_settings),
+            partial(
+                train_profiles,
+                request.race.dict(),
+                agent_settings,
+                request.races,
+                seeds=request.seeds,
+                seed=request.seed,
+                engine=request.engine,
+                store=profile_store,
+                name=request.name,
+            ),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Training failed: {str(e)}"
+        )
+    return TrainingResponse(**result)
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """Ids of the stored learned profiles and of the predefined (registry) profiles."""
+    return {"profiles": profile_store.list_ids(), "registry": profile_registry.ids()}
+
+
+@router.get("/profiles/{profile_id}", response_model=StoredProfile)
+async def get_profile(profile_id: str, shapes: bool = False):
+    """
+    One profile: a predefined registry profile (with its ingest curves when
+    `shapes` is set) or a stored learned profile and how it was trained.
+    """
+    profile = profile_registry.get(profile_id)
+    if profile is not None:
+        profile = {"profile_id": profile_id, **profile, "meta": {"source": "registry"}}
+        if shapes:
+            profile["shapes"] = {key: value.tolist() for key, value in profile_registry.shapes(profile_id).items()}
+        return profile
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Unknown profile.")
+    return profile
@@ -3,12 +3,17 @@
 Agent decision logic for PitSynapse (MVP).
 
 Exports:
- - decide_action(agent_state, profile, race_state) -> str
+ - decide_action(agent_state, profile, race_state) -> str (models.state objects or dicts)
+ - decide_actions(agent_states, profiles, race_state) -> np.ndarray of action codes (whole field)
 Actions: "push_hard" | "push_medium" | "maintain" | "conserve_low" | "conserve_medium" | "conserve_high" | "pit"
 """
 
 from typing import Dict, Any
 
+import numpy as np
+
+from models.state import AgentState, AgentProfile, RaceState
+
 # Action names match ActionEnum in models.events
 PIT = "pit_stop"
 PUSH_HARD = "push_hard"
@@ -18,13 +23,28 @@ CONSERVE_LOW = "conserve_low"
 CONSERVE_MEDIUM = "conserve_medium"
 CONSERVE_HIGH = "conserve_high"
 
-def decide_action(agent_state: Dict[str, Any], profile: Dict[str, Any], race_state: Dict[str, Any]) -> str:
+# Stable action codes (index into ACTIONS) for array-backed state and compact outputs
+ACTIONS = (PUSH_HARD, PUSH_MEDIUM, MAINTAIN, CONSERVE_LOW, CONSERVE_MEDIUM, CONSERVE_HIGH, PIT)
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+A_PUSH_HARD, A_PUSH_MEDIUM, A_MAINTAIN, A_CONSERVE_LOW, A_CONSERVE_MEDIUM, A_CONSERVE_HIGH, A_PIT = range(len(ACTIONS))
+
+# Pit thresholds on tyre wear (0-1)
+HARD_PIT_THRESHOLD = 0.82  # immediate pit if above
+SOFT_PIT_THRESHOLD = 0.70  # consider pitting if combined conditions
+
+def decide_action(
+    agent_state: AgentState | Dict[str, Any],
+    profile: AgentProfile | Dict[str, Any],
+    race_state: RaceState | Dict[str, Any]
+) -> str:
     """
     Decide action for current lap for an agent (MVP rules).
 
-    agent_state: dynamic values (tyre_wear (0-1), tyre_age, position, gap_ahead, gap_behind, pit_next flag)
-    profile: static/dynamic profile (aggression, risk, tyre_management, pit_bias, weather_sensitivity)
-    race_state: {laps_remaining, weather, leader_position, total_agents}
+    agent_state: AgentState, or a dict of dynamic values (tyre_wear (0-1), tyre_age, position, gap_ahead, gap_behind, pit_next flag)
+    profile: AgentProfile, or a dict (aggression, risk, tyre_management, pit_bias, weather_sensitivity)
+    race_state: RaceState, or a dict {laps_remaining, weather, leader_position, total_agents}
+
+    Dicts are converted with the models.state from_dict adapters (same defaults).
 
     Simple rule set:
       - Pit if tyre very worn OR explicitly flagged to pit_next OR tyre_wear exceeds safe threshold (profile-aware)
@@ -33,24 +53,30 @@ def decide_action(agent_state: Dict[str, Any], profile: Dict[str, Any], race_sta
           * Conserve if tyre_management high and tyre_wear > mid threshold
           * Otherwise maintain or medium push depending on risk
     """
-    tyre_wear = float(agent_state.get("tyre_wear", 0.0))
-    tyre_age = int(agent_state.get("tyre_age", 0))
-    position = int(agent_state.get("position", 1))
-    gap_ahead = float(agent_state.get("gap_ahead", 999.0))
-    pit_next = bool(agent_state.get("pit_next", False))
-    laps_remaining = int(race_state.get("laps_remaining", 0))
-    weather = race_state.get("weather", "dry")
-
-    aggression = float(profile.get("aggression", 0.5))
-    risk = float(profile.get("risk", 0.5))
-    tyre_management = float(profile.get("tyre_management", 0.6))
-    pit_bias = float(profile.get("pit_bias", 0.5))
-    weather_sensitivity = float(profile.get("weather_sensitivity", 0.5))
+    if isinstance(agent_state, dict):
+        agent_state = AgentState.from_dict(agent_state)
+    if isinstance(profile, dict):
+        profile = AgentProfile.from_dict(profile)
+    if isinstance(race_state, dict):
+        race_state = RaceState.from_dict(race_state)
+
+    tyre_wear = agent_state.tyre_wear
+    position = agent_state.position
+    gap_ahead = agent_state.gap_ahead
+    pit_next = agent_state.pit_next
+    laps_remaining = race_state.laps_remaining
+    weather = race_state.weather
+
+    aggression = profile.aggression
+    risk = profile.risk
+    tyre_management = profile.tyre_management
+    pit_bias = profile.pit_bias
+    weather_sensitivity = profile.weather_sensitivity
 
     # === PIT logic ===
     # base thresholds
-    hard_pit_threshold = 0.82  # immediate pit if above
-    soft_pit_threshold = 0.70  # consider pitting if combined conditions
+    hard_pit_threshold = HARD_PIT_THRESHOLD
+    soft_pit_threshold = SOFT_PIT_THRESHOLD
     # profile-biased adjustment
     adjusted_soft = soft_pit_threshold - (pit_bias - 0.5) * 0.15  # more pit_bias => pit earlier
     adjusted_soft = max(0.45, min(0.85, adjusted_soft))
@@ -96,3 +122,78 @@ def decide_action(agent_state: Dict[str, Any], profile: Dict[str, Any], race_sta
         return PUSH_MEDIUM
 
     return MAINTAIN
+
+
+def _field(values: Dict[str, Any], key: str, default, n: int, dtype=float) -> np.ndarray:
+    """Column `key` as an array of length n (scalar default when missing)."""
+    column = values.get(key)
+    if column is None:
+        return np.full(n, default, dtype=dtype)
+    return np.asarray(column, dtype=dtype)
+
+
+def decide_actions(agent_states: Dict[str, Any], profiles: Dict[str, Any], race_state: RaceState | Dict[str, Any]) -> np.ndarray:
+    """
+    Batched decide_action for the whole field. Returns an int array of action
+    codes (index into ACTIONS) that matches decide_action agent by agent.
+
+    agent_states: columns of equal length (tyre_wear, position, optional gap_ahead, pit_next)
+    profiles: trait columns (aggression, risk, tyre_management, pit_bias, weather_sensitivity)
+    race_state: RaceState, or {laps_remaining, weather}, shared by the field
+
+    Missing columns take the same defaults as decide_action.
+    """
+    if isinstance(race_state, dict):
+        race_state = RaceState.from_dict(race_state)
+
+    tyre_wear = np.asarray(agent_states["tyre_wear"], dtype=float)
+    n = tyre_wear.shape[0]
+    position = _field(agent_states, "position", 1, n, dtype=np.int64)
+    gap_ahead = _field(agent_states, "gap_ahead", 999.0, n)
+    pit_next = _field(agent_states, "pit_next", False, n, dtype=bool)
+    laps_remaining = race_state.laps_remaining
+    weather = race_state.weather
+
+    aggression = _field(profiles, "aggression", 0.5, n)
+    risk = _field(profiles, "risk", 0.5, n)
+    tyre_management = _field(profiles, "tyre_management", 0.6, n)
+    pit_bias = _field(profiles, "pit_bias", 0.5, n)
+    weather_sensitivity = _field(profiles, "weather_sensitivity", 0.5, n)
+
+    # Same rule order as decide_action; np.select takes the first matching rule
+    adjusted_soft = np.clip(SOFT_PIT_THRESHOLD - (pit_bias - 0.5) * 0.15, 0.45, 0.85)
+    pit = (
+        pit_next
+        | (tyre_wear >= HARD_PIT_THRESHOLD)
+        | (
+            (tyre_wear >= adjusted_soft)
+            & (laps_remaining > 4)
+            & ((pit_bias > 0.6) | (tyre_management > 0.8) | (tyre_wear > 0.78))
+        )
+        | ((weather != "dry") & (weather_sensitivity > 0.75) & (tyre_wear > 0.6))
+    )
+    push_gap = (gap_ahead <= 1.5) & (aggression > 0.7)
+    push_late = (laps_remaining <= 6) & (risk > 0.7) & (position > 1)
+    conserve = (tyre_wear > 0.55) & (tyre_management > 0.6)
+
+    return np.select(
+        [
+            pit,
+            push_gap,
+            push_late,
+            conserve,
+            (aggression > 0.65) | (risk > 0.65),
+        ],
+        [
+            A_PIT,
+            np.where(aggression > 0.85, A_PUSH_HARD, A_PUSH_MEDIUM),
+            np.where(risk > 0.85, A_PUSH_HARD, A_PUSH_MEDIUM),
+            np.where(
+                (tyre_wear > 0.75) | (tyre_management > 0.85),
+                A_CONSERVE_HIGH,
+                np.where(tyre_wear > 0.65, A_CONSERVE_MEDIUM, A_CONSERVE_LOW),
+            ),
+            A_PUSH_MEDIUM,
+        ],
+        default=A_MAINTAIN,
+    )
@@ -0,0 +1,191 @@
+# backend/services/branching.py
+"""
+What-if strategy branches that share a race prefix.
+
+Exposes:
+ - run_branches(race_params, agent_settings, fork_lap, branches, seed, engine, workers) -> Dict
+ - OVERRIDE_TYPES, BRANCH_TRAITS
+
+Behavior:
+ - the baseline race runs once, taking a RaceSnapshot at `fork_lap`; laps
+   1..fork_lap are never simulated again
+ - every branch resumes from that snapshot with its overrides applied; the
+   snapshot is shared and each branch restores its own copy of the state
+ - branches run in parallel on the ensemble process pool (inline for one
+   branch or workers=1); the snapshot and the per-branch final state cross
+   process boundaries as packed arrays
+ - after the fork each branch continues the baseline's random stream, so
+   deltas come from the overrides rather than from fresh noise
+
+Override types (agent_id names the agent, lap is 1-based and after fork_lap):
+ - {"type": "pit", "agent_id", "lap"}                  force a pit stop
+ - {"type": "action", "agent_id", "lap", "action"}     replace the decided action
+ - {"type": "traits", "agent_id", "traits": {...}}     set traits from the fork on
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.agent_logic import ACTIONS, PIT
+from services.process_pool import get_pool, pool_workers
+from services.simulation_runner import run_simulation, resume_simulation, _build_profiles
+from services.snapshots import RaceSnapshot, STATE_COLUMNS, with_traits
+
+OVERRIDE_TYPES = ("pit", "action", "traits")
+
+# Settable traits (AgentSettings names); risk_taking also sets the decision
+# "risk", as when profiles are built from settings
+BRANCH_TRAITS = ("aggression", "risk_taking", "tyre_management", "pit_bias", "weather_sensitivity")
+
+_TOTAL_TIME = STATE_COLUMNS.index("total_time")
+_PIT_STOPS = STATE_COLUMNS.index("pit_stops")
+
+
+def _compile_overrides(overrides: List[Dict[str, Any]], agent_index: Dict[str, int], fork_lap: int, total_laps: int):
+    """Branch overrides -> ({lap: {agent index: action}}, {agent index: {profile column: value}})."""
+    actions: Dict[int, Dict[int, str]] = {}
+    traits: Dict[int, Dict[str, float]] = {}
+    for override in overrides:
+        kind = override.get("type")
+        if kind not in OVERRIDE_TYPES:
+            raise ValueError(f"override type must be one of {list(OVERRIDE_TYPES)}")
+        agent_id = override.get("agent_id")
+        if agent_id not in agent_index:
+            raise ValueError(f"unknown agent_id {agent_id!r}")
+        idx = agent_index[agent_id]
+
+        if kind == "traits":
+            for key, value in (override.get("traits") or {}).items():
+                if key not in BRANCH_TRAITS:
+                    raise ValueError(f"traits must be among {list(BRANCH_TRAITS)}")
+                if not 0.0 <= value <= 1.0:
+                    raise ValueError(f"trait {key} must be within [0, 1]")
+                traits.setdefault(idx, {})[key] = float(value)
+                if key == "risk_taking":
+                    traits[idx]["risk"] = float(value)
+            continue
+
+        lap = override.get("lap")
+        if lap is None or not fork_lap < lap <= total_laps:
+            raise ValueError(f"override lap must be in ({fork_lap}, {total_laps}]")
+        action = PIT if kind == "pit" else override.get("action")
+        if action not in ACTIONS:
+            raise ValueError(f"action must be one of {list(ACTIONS)}")
+        actions.setdefault(int(lap), {})[idx] = action
+    return actions, traits
+
+
+def _final_state(snapshot: RaceSnapshot, summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact outcome of one run: final total times and pit stops plus its summary."""
+    return {
+        "total_time": snapshot.state[:, _TOTAL_TIME],
+        "pit_stops": snapshot.state[:, _PIT_STOPS].astype(np.int64),
+        "summary": summary,
+    }
+
+
+def _run_branch(fork: RaceSnapshot, actions: Dict[int, Dict[int, str]], traits: Dict[int, Dict[str, float]]) -> Dict[str, Any]:
+    """Worker entry point: resume one branch from the fork snapshot."""
+    total_laps = fork.race_params.get("total_laps", 50)
+    result = resume_simulation(
+        with_traits(fork, traits),
+        include_timeline=False,
+        event_types=(),
+        snapshot_laps=[total_laps],
+        action_overrides=actions,
+    )
+    return _final_state(result["snapshots"][0], result["summary"])
+
+
+def _deltas(agent_ids: List[str], base: Dict[str, Any], branch: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    base_rank = np.argsort(np.argsort(base["total_time"], kind="stable"), kind="stable")
+    branch_rank = np.argsort(np.argsort(branch["total_time"], kind="stable"), kind="stable")
+    time_delta = np.round(branch["total_time"] - base["total_time"], 3).tolist()
+    position_delta = (branch_rank - base_rank).tolist()
+    pit_delta = (branch["pit_stops"] - base["pit_stops"]).tolist()
+    return {
+        aid: {
+            "total_time": time_delta[i],
+            "position": position_delta[i],
+            "pit_stops": pit_delta[i],
+        }
+        for i, aid in enumerate(agent_ids)
+    }
+
+
+def run_branches(
+    race_params: Dict[str, Any],
+    agent_settings: List[Dict[str, Any]],
+    fork_lap: int,
+    branches: List[Dict[str, Any]],
+    seed: int | None = None,
+    engine: str = "python",
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Simulate the baseline once and every branch from its fork-lap snapshot.
+
+    Args:
+        race_params / agent_settings / seed / engine: as for run_simulation
+        fork_lap: laps shared by all branches (0 = branch from the start)
+        branches: [{"name": str (optional), "overrides": [override, ...]}]
+        workers: branch parallelism (1 runs inline); defaults to the pool size
+
+    Returns:
+        {
+            "fork_lap": int,
+            "baseline": {"summary": {...}, "total_time": {agent_id: float}},
+            "branches": [{
+                "name": str,
+                "summary": {...},
+                "deltas": {agent_id: {"total_time": float,   # branch - baseline
+                                      "position": int,       # + = finished lower
+                                      "pit_stops": int}}
+            }]
+        }
+    """
+    total_laps = race_params.get("total_laps", 50)
+    if not 0 <= fork_lap < total_laps:
+        raise ValueError(f"fork_lap must be in [0, {total_laps})")
+    if not branches:
+        raise ValueError("At least one branch required")
+
+    agent_ids = [p.id for p in _build_profiles(agent_settings)]
+    agent_index = {aid: i for i, aid in enumerate(agent_ids)}
+    compiled = [
+        _compile_overrides(branch.get("overrides", []), agent_index, fork_lap, total_laps)
+        for branch in branches
+    ]
+
+    # Shared prefix (and the baseline's own continuation), simulated once
+    baseline = run_simulation(
+        race_params, agent_settings, seed=seed, engine=engine,
+        include_timeline=False, event_types=(), snapshot_laps=[fork_lap, total_laps],
+    )
+    fork, final = baseline["snapshots"]
+    base = _final_state(final, baseline["summary"])
+
+    workers = workers or pool_workers()
+    if len(branches) == 1 or workers == 1:
+        outcomes = [_run_branch(fork, actions, traits) for actions, traits in compiled]
+    else:
+        executor = get_pool()
+        futures = [executor.submit(_run_branch, fork, actions, traits) for actions, traits in compiled]
+        outcomes = [f.result() for f in futures]
+
+    return {
+        "fork_lap": fork_lap,
+        "baseline": {
+            "summary": base["summary"],
+            "total_time": dict(zip(agent_ids, np.round(base["total_time"], 3).tolist())),
+        },
+        "branches": [
+            {
+                "name": branch.get("name") or f"branch_{i + 1}",
+                "summary": outcome["summary"],
+                "deltas": _deltas(agent_ids, base, outcome),
+            }
+            for i, (branch, outcome) in enumerate(zip(branches, outcomes))
+        ],
+    }
@@ -0,0 +1,141 @@
+# backend/services/columnar.py
+"""
+Columnar result layout and binary encoding.
+
+Exposes:
+ - new_timeline() / new_events() -> empty column tables the engines append to
+ - append_row(table, *values)
+ - concat_chunks(table) -> column lists from per-lap array chunks
+ - columnar_result(agents_ordered, timeline, summary, events) -> Dict
+ - to_npz_bytes(result) -> bytes (NumPy .npz archive of a columnar result)
+
+Columnar layout (layout="columnar" in run_simulation):
+    {
+        "layout": "columnar",
+        "agents": {"id": [...], "name": [...]},      # agent column values index into these
+        "actions": [...],                            # action column values index into these
+        "timeline": {"lap": [...], "agent": [...], "position": [...], ...},
+        "summary": {...},                            # unchanged
+        "events": {"lap_complete": {"lap": [...], ...}, "pit_stop": {...}, ...}
+    }
+Every event table carries a "lap" column; trait deltas are flattened into
+"delta_<trait>" columns.
+"""
+
+import io
+import json
+from typing import Dict, Any, List
+
+import numpy as np
+
+from models.state import AgentProfile
+from services.agent_logic import ACTIONS
+
+TIMELINE_COLUMNS = ("lap", "agent", "position", "lap_time", "tyre_wear", "action")
+
+EVENT_COLUMNS = {
+    "lap_complete": ("lap", "agent", "action", "lap_time", "position", "position_change",
+                     "tyre_wear", "tyre_age", "timestamp"),
+    "pit_stop": ("lap", "agent", "pit_stop_time", "position", "pit_reason", "position_change",
+                 "timestamp"),
+    "overtake": ("lap", "agent", "overtaken_agent", "position_before", "position_after",
+                 "timestamp"),
+    "prl_update": ("lap", "agent", "prl_reward", "delta_aggression", "delta_tyre_management",
+                   "delta_risk_taking", "delta_pit_bias", "timestamp"),
+}
+
+# Binary dtypes; anything not listed is float64
+_INT_COLUMNS = {
+    "lap": np.int32,
+    "agent": np.int32,
+    "overtaken_agent": np.int32,
+    "position": np.int32,
+    "position_change": np.int32,
+    "position_before": np.int32,
+    "position_after": np.int32,
+    "tyre_age": np.int32,
+    "action": np.uint8,
+}
+_STRING_COLUMNS = {"pit_reason"}
+
+
+def new_timeline() -> Dict[str, list]:
+    return {col: [] for col in TIMELINE_COLUMNS}
+
+
+def new_events(event_types=None) -> Dict[str, Dict[str, list]]:
+    """Empty tables for the selected event types (all when None)."""
+    return {
+        etype: {col: [] for col in cols}
+        for etype, cols in EVENT_COLUMNS.items()
+        if event_types is None or etype in event_types
+    }
+
+
+def append_row(table: Dict[str, list], *values):
+    """Append one row; values follow the table's column order."""
+    for column, value in zip(table.values(), values):
+        column.append(value)
+
+
+def concat_chunks(table: Dict[str, list]) -> Dict[str, list]:
+    """Join per-lap array chunks (appended with append_row) into plain column lists."""
+    return {
+        col: np.concatenate(chunks).tolist() if chunks else []
+        for col, chunks in table.items()
+    }
+
+
+def columnar_result(
+    agents_ordered: List[AgentProfile],
+    timeline: Dict[str, list],
+    summary: Dict[str, Any],
+    events: Dict[str, Dict[str, list]] | None
+) -> Dict[str, Any]:
+    return {
+        "layout": "columnar",
+        "agents": {
+            "id": [p.id for p in agents_ordered],
+            "name": [p.name for p in agents_ordered],
+        },
+        "actions": list(ACTIONS),
+        "timeline": timeline,
+        "summary": summary,
+        "events": events,
+    }
+
+
+def _column_array(name: str, values) -> np.ndarray:
+    if name in _STRING_COLUMNS:
+        return np.asarray(values, dtype=str)
+    return np.asarray(values, dtype=_INT_COLUMNS.get(name, np.float64))
+
+
+def to_npz_bytes(result: Dict[str, Any]) -> bytes:
+    """
+    Encode a columnar result as a compressed .npz archive.
+
+    Array names: "agents.id", "agents.name", "actions", "timeline.<col>",
+    "events.<type>.<col>", "summary" and, when present, "metadata" (JSON strings).
+    Load with numpy.load(io.BytesIO(payload)).
+    """
+    if result.get("layout") != "columnar":
+        raise ValueError("to_npz_bytes needs a columnar result")
+
+    arrays = {
+        "agents.id": np.asarray(result["agents"]["id"], dtype=str),
+        "agents.name": np.asarray(result["agents"]["name"], dtype=str),
+        "actions": np.asarray(result["actions"], dtype=str),
+        "summary": np.asarray(json.dumps(result["summary"])),
+    }
+    if result.get("metadata") is not None:
+        arrays["metadata"] = np.asarray(json.dumps(result["metadata"]))
+    for col, values in result["timeline"].items():
+        arrays[f"timeline.{col}"] = _column_array(col, values)
+    for etype, table in (result.get("events") or {}).items():
+        for col, values in table.items():
+            arrays[f"events.{etype}.{col}"] = _column_array(col, values)
+
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **arrays)
+    return buf.getvalue()
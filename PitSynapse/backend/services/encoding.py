@@ -0,0 +1,41 @@
+# backend/services/encoding.py
+"""
+Fast JSON encoding for response bodies.
+
+Exposes:
+ - dumps(obj) -> bytes (compact JSON)
+ - FAST_JSON: True when orjson is installed
+
+Uses orjson when it is available (NumPy arrays and scalars included) and
+falls back to the standard library otherwise; both produce the same compact
+JSON for engine output.
+"""
+
+import json
+from typing import Any
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+FAST_JSON = orjson is not None
+
+
+def _default(value: Any):
+    """Values neither encoder handles natively: NumPy types (stdlib path)."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if FAST_JSON:
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+else:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), default=_default).encode("utf-8")
@@ -0,0 +1,138 @@
+# backend/services/ensemble.py
+"""
+Monte Carlo ensembles over run_simulation.
+
+Exposes:
+ - run_ensemble(race_params, agent_settings, runs, seed, engine, workers) -> Dict of distributions
+
+Behavior:
+ - runs the same race `runs` times with independent child seeds spawned from one
+   root seed, in batches on the shared process pool (services.process_pool)
+ - workers return compact per-run outcomes (finishing order, pit stops, fastest lap)
+   instead of full timelines
+ - aggregates win probability, finishing-position histograms, pit-stop count
+   distributions and fastest-lap quantiles
+"""
+
+from typing import Dict, Any, List
+
+import numpy as np
+
+from services.simulation_runner import run_simulation, _build_profiles
+from services.rng import spawn_seeds
+from services.process_pool import get_pool, pool_workers
+
+FASTEST_LAP_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+def _run_batch(
+    race_params: Dict[str, Any],
+    agent_settings: List[Dict[str, Any]],
+    seeds: List[int],
+    engine: str
+) -> Dict[str, list]:
+    """
+    Worker entry point: run one batch of seeds and keep only what the
+    aggregation needs. Returns agent-index arrays as plain lists.
+    """
+    finish_positions = []
+    pit_stops = []
+    fastest_laps = []
+    for seed in seeds:
+        result = run_simulation(
+            race_params, agent_settings, seed=seed, engine=engine,
+            include_timeline=False, event_types=()
+        )
+        summary = result["summary"]
+        ids = list(summary["pit_stops"].keys())
+        rank = {aid: pos for pos, aid in enumerate(summary["finishing_order"])}
+        finish_positions.append([rank[aid] for aid in ids])
+        pit_stops.append([summary["pit_stops"][aid] for aid in ids])
+        fastest_laps.append(summary["fastest_lap"])
+    return {
+        "finish_positions": finish_positions,
+        "pit_stops": pit_stops,
+        "fastest_laps": fastest_laps,
+    }
+
+
+def _aggregate(agent_ids: List[str], finish_positions: np.ndarray, pit_stops: np.ndarray, fastest_laps: np.ndarray) -> Dict[str, Any]:
+    """Turn per-run outcome arrays (runs x agents) into distributions."""
+    runs, n_agents = finish_positions.shape
+
+    win_counts = np.bincount(finish_positions.argmin(axis=1), minlength=n_agents)
+    position_hist = np.zeros((n_agents, n_agents), dtype=np.int64)
+    np.add.at(position_hist, (np.broadcast_to(np.arange(n_agents), finish_positions.shape), finish_positions), 1)
+
+    pit_distribution = {}
+    for col, aid in enumerate(agent_ids):
+        counts, freq = np.unique(pit_stops[:, col], return_counts=True)
+        pit_distribution[aid] = {str(c): int(f) for c, f in zip(counts.tolist(), freq.tolist())}
+
+    quantiles = np.quantile(fastest_laps, FASTEST_LAP_QUANTILES)
+    return {
+        "runs": runs,
+        "win_probability": {aid: round(float(win_counts[col]) / runs, 4) for col, aid in enumerate(agent_ids)},
+        "position_histogram": {aid: position_hist[col].tolist() for col, aid in enumerate(agent_ids)},
+        "pit_stop_distribution": pit_distribution,
+        "fastest_lap_quantiles": {f"p{int(q * 100)}": round(float(v), 3) for q, v in zip(FASTEST_LAP_QUANTILES, quantiles)},
+    }
+
+
+def run_ensemble(
+    race_params: Dict[str, Any],
+    agent_settings: List[Dict[str, Any]],
+    runs: int,
+    seed: int | None = None,
+    engine: str = "python",
+    workers: int | None = None
+) -> Dict[str, Any]:
+    """
+    Run `runs` seeded simulations in parallel and aggregate the outcomes.
+
+    Args:
+        race_params: {total_laps, weather, track_id}
+        agent_settings: List of agent settings (as for run_simulation)
+        runs: number of Monte Carlo samples
+        seed: root seed; run i uses child stream i (fresh entropy if None)
+        engine: simulation engine passed through to run_simulation
+        workers: parallelism used to size batches (1 runs inline); defaults to the pool size
+
+    Returns:
+        {
+            "runs": int,
+            "win_probability": Dict[agent_id, float],
+            "position_histogram": Dict[agent_id, List[int]],  # index 0 = P1
+            "pit_stop_distribution": Dict[agent_id, Dict[str(count), int]],
+            "fastest_lap_quantiles": Dict["p5".."p95", float]
+        }
+    """
+    if runs < 1:
+        raise ValueError("runs must be >= 1")
+    if not agent_settings:
+        raise ValueError("At least one agent required")
+
+    seeds = spawn_seeds(seed, runs)
+
+    # A handful of batches per worker amortizes pickling while keeping load balanced
+    n_batches = min(runs, max(1, (workers or pool_workers()) * 4))
+    batches = [seeds[i::n_batches] for i in range(n_batches)]
+
+    if n_batches == 1 or workers == 1:
+        outcomes = [_run_batch(race_params, agent_settings, seeds, engine)]
+    else:
+        executor = get_pool()
+        futures = [
+            executor.submit(_run_batch, race_params, agent_settings, batch, engine)
+            for batch in batches
+        ]
+        outcomes = [f.result() for f in futures]
+
+    # Agent ids in the order run_simulation reports them
+    agent_ids = [p.id for p in _build_profiles(agent_settings)]
+
+    return _aggregate(
+        agent_ids,
+        np.array([row for o in outcomes for row in o["finish_positions"]], dtype=np.int64),
+        np.array([row for o in outcomes for row in o["pit_stops"]], dtype=np.int64),
+        np.array([v for o in outcomes for v in o["fastest_laps"]], dtype=float),
+    )
@@ -0,0 +1,219 @@
+# backend/services/execution.py
+"""
+Where /api/simulate runs its simulations.
+
+Exposes:
+ - EXECUTION_MODES: "thread", "process", "inline"
+ - SimulationExecutor(mode)
+     render(race_params, agent_settings, fmt, keep_result, **options)
+         -> awaitable (response body bytes, result dict or None)
+     run(kind, engine, agent_laps, call) -> awaitable call() in a worker thread
+     start() / shutdown()
+ - pack_request(...) / render_packed(packed, fmt, keep_result): the compact
+   process-pool wire format
+ - RESPONSE_FORMATS, records_body(result), render_result(result, fmt) -> bytes
+
+Modes:
+ - thread   asyncio.to_thread (default). Simple, but pure-Python runs share
+            one core through the GIL.
+ - process  the shared process pool (services.process_pool, also used by
+            ensembles, branches, strategy search and training), whose workers
+            come from a server process with the simulation modules imported,
+            so concurrent runs use one core each. start() brings every worker
+            up and runs a warm-up race in it before the first request.
+ - inline   on the event loop itself; for tests and single-request tools.
+
+Process workers exchange compact messages instead of pickled dict trees: the
+request goes over as flat tuples (agent settings as rows of AGENT_FIELDS)
+and the result comes back as bytes. render() has the worker encode the final
+response body (records JSON, columnar JSON or .npz) so the parent serves it
+as is; the parent only parses it back when it needs the objects (keep_result,
+e.g. for the result cache).
+"""
+
+import asyncio
+from functools import partial
+import json
+import os
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+from services.columnar import to_npz_bytes
+from services.encoding import dumps
+from services.metrics import metrics, record_run
+from services.process_pool import get_pool, pool_workers, shutdown_pool
+from services.simulation_runner import run_simulation
+
+EXECUTION_MODES = ("thread", "process", "inline")
+
+# Field order of one packed agent row
+AGENT_FIELDS = (
+    "id", "name", "aggression", "risk_taking", "tyre_management", "pit_bias",
+    "weather_sensitivity", "risk", "learning_rate",
+)
+RACE_FIELDS = ("total_laps", "weather", "track_id")
+
+# /api/simulate response bodies: records JSON, columnar JSON, NumPy .npz
+RESPONSE_FORMATS = ("records", "columnar", "npz")
+
+
+def pack_request(race_params: Dict[str, Any], agent_settings: List[Dict[str, Any]], **options) -> tuple:
+    """(race row, agent rows, sorted option items): flat tuples of scalars."""
+    race = tuple(race_params.get(key) for key in RACE_FIELDS)
+    agents = tuple(tuple(agent.get(key) for key in AGENT_FIELDS) for agent in agent_settings)
+    return race, agents, tuple(sorted(options.items()))
+
+
+def unpack_request(packed: tuple):
+    race, agents, options = packed
+    race_params = {key: value for key, value in zip(RACE_FIELDS, race) if value is not None}
+    agent_settings = [
+        {key: value for key, value in zip(AGENT_FIELDS, row) if value is not None}
+        for row in agents
+    ]
+    return race_params, agent_settings, dict(options)
+
+
+def records_body(result: Dict[str, Any]) -> Dict[str, Any]:
+    """A records result in SimulationResponse field order."""
+    return {
+        "timeline": result["timeline"],
+        "summary": result["summary"],
+        "events": result.get("events"),
+        "metadata": result.get("metadata"),
+    }
+
+
+def render_result(result: Dict[str, Any], fmt: str) -> bytes:
+    """The response body for a result (records layout for "records", columnar otherwise)."""
+    if fmt == "records":
+        return dumps(records_body(result))
+    if fmt == "columnar":
+        return dumps(result)
+    if fmt == "npz":
+        return to_npz_bytes(result)
+    raise ValueError(f"format must be one of {list(RESPONSE_FORMATS)}")
+
+
+def render_packed(packed: tuple, fmt: str, keep_result: bool = False) -> tuple:
+    """
+    Process worker entry point: (response body, result JSON or None). The
+    JSON bodies parse back to the result, so a separate result JSON is only
+    encoded for an .npz body that the caller wants to keep.
+    """
+    race_params, agent_settings, options = unpack_request(packed)
+    result = run_simulation(race_params, agent_settings, **options)
+    body = render_result(result, fmt)
+    return body, dumps(result) if keep_result and fmt == "npz" else None
+
+
+def _render_local(race_params, agent_settings, fmt: str, keep_result: bool, options: Dict[str, Any]) -> tuple:
+    result = run_simulation(race_params, agent_settings, **options)
+    return render_result(result, fmt), result if keep_result else None
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+class SimulationExecutor:
+    def __init__(self, mode: str = "thread"):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"execution mode must be one of {list(EXECUTION_MODES)}")
+        self.mode = mode
+        self._pool = None
+        self._start_lock = threading.Lock()
+
+    # ---------------- lifecycle ---------------- #
+
+    def start(self):
+        """
+        Start the shared process pool and wait until every worker is up and
+        warm. Blocks: call it from the startup hook or a worker thread.
+        """
+        if self.mode != "process" or self._pool is not None:
+            return
+        with self._start_lock:
+            if self._pool is not None:
+                return
+            pool = get_pool()
+            # Workers spawn on demand; enough concurrent no-ops bring all of them up
+            for future in [pool.submit(_ready) for _ in range(pool_workers())]:
+                future.result()
+            self._pool = pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            shutdown_pool()
+            self._pool = None
+
+    # ---------------- running ---------------- #
+
+    async def render(self, race_params: Dict[str, Any], agent_settings: List[Dict[str, Any]], fmt: str,
+                     keep_result: bool = False, **options) -> tuple:
+        """
+        Run the simulation and encode its `fmt` response body where it ran:
+        returns (body bytes, result dict when keep_result else None). In
+        process mode the body crosses the process boundary once and is not
+        decoded unless keep_result asks for the objects.
+        """
+        if fmt not in RESPONSE_FORMATS:
+            raise ValueError(f"format must be one of {list(RESPONSE_FORMATS)}")
+        engine = options.get("engine", "python")
+        agent_laps = race_params.get("total_laps", 50) * len(agent_settings)
+        if self.mode != "process":
+            return await self.run(
+                "simulate", engine, agent_laps,
+                partial(_render_local, race_params, agent_settings, fmt, keep_result, options),
+            )
+
+        if self._pool is None:
+            # Not started by the startup hook: spawning workers must not block the event loop
+            await asyncio.to_thread(self.start)
+        packed = pack_request(race_params, agent_settings, **options)
+        metrics.inc("pitsynapse_simulations_in_flight", {"kind": "simulate"})
+        start = perf_counter()
+        try:
+            body, raw = await asyncio.get_running_loop().run_in_executor(
+                self._pool, render_packed, packed, fmt, keep_result
+            )
+        finally:
+            metrics.inc("pitsynapse_simulations_in_flight", {"kind": "simulate"}, -1)
+        record_run(engine, agent_laps, perf_counter() - start)
+        if not keep_result:
+            return body, None
+        return body, await asyncio.to_thread(_loads, raw or body)
+
+    async def run(self, kind: str, engine: str, agent_laps: int, call: Callable[[], Any]):
+        """
+        Run `call` (a zero-argument callable) for a simulation route in a worker
+        thread (inline in "inline" mode); feeds the queue depth, in-flight and
+        throughput metrics.
+        """
+        if self.mode == "inline":
+            return _tracked(kind, engine, agent_laps, call, queued=False)
+        metrics.inc("pitsynapse_worker_queue_depth", {"pool": "threads"})
+        return await asyncio.to_thread(_tracked, kind, engine, agent_laps, call)
+
+
+def _loads(raw: bytes) -> Dict[str, Any]:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _tracked(kind: str, engine: str, agent_laps: int, call: Callable[[], Any], queued: bool = True):
+    if queued:
+        metrics.inc("pitsynapse_worker_queue_depth", {"pool": "threads"}, -1)
+    metrics.inc("pitsynapse_simulations_in_flight", {"kind": kind})
+    start = perf_counter()
+    try:
+        result = call()
+    finally:
+        metrics.inc("pitsynapse_simulations_in_flight", {"kind": kind}, -1)
+    record_run(engine, agent_laps, perf_counter() - start)
+    return result
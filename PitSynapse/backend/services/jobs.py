@@ -0,0 +1,268 @@
+# backend/services/jobs.py
+"""
+Asynchronous simulation jobs on a fixed-size worker pool.
+
+Exposes:
+ - JobManager(workers, max_queued, ttl_seconds, max_bytes)
+     submit(call, total_laps, engine, agent_laps) -> Job   (raises QueueFull)
+     get(job_id) / cancel(job_id) -> Job | None
+     stats() / shutdown()
+ - Job: status, laps completed, result or error for one submitted run
+ - QueueFull, JobCancelled
+
+Behavior:
+ - `workers` threads are started lazily and pull from a queue of at most
+   `max_queued` live waiting jobs; submitting beyond that raises QueueFull
+   (HTTP 429). A cancelled queued job frees its place at once, even though
+   its entry stays in the queue until a worker pops and skips it
+ - a job's call receives a `progress` keyword (see run_simulation), which
+   records laps completed and aborts the run with JobCancelled once the job
+   is cancelled; queued jobs that were cancelled are skipped
+ - finished jobs (done, failed, cancelled) are kept for `ttl_seconds`, and
+   finished results are bounded by `max_bytes` of serialized JSON, oldest
+   evicted first; a result larger than the whole budget fails the job
+"""
+
+from collections import OrderedDict
+import json
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import uuid
+
+from services.metrics import metrics, record_run
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class QueueFull(Exception):
+    """The job queue is at its depth limit."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled."""
+
+
+class Job:
+    __slots__ = (
+        "id", "status", "total_laps", "laps_completed", "result", "error",
+        "created_at", "finished_at", "size", "engine", "agent_laps",
+        "_call", "_cancelled",
+    )
+
+    def __init__(self, call: Callable[..., Dict[str, Any]], total_laps: int, engine: str, agent_laps: int):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.total_laps = total_laps
+        self.laps_completed = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.size = 0
+        self.engine = engine
+        self.agent_laps = agent_laps
+        self._call = call
+        self._cancelled = threading.Event()
+
+    def progress(self, laps_completed: int):
+        """Progress callback handed to the simulation."""
+        if self._cancelled.is_set():
+            raise JobCancelled()
+        self.laps_completed = laps_completed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "laps_completed": self.laps_completed,
+            "total_laps": self.total_laps,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+class JobManager:
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queued: int = 32,
+        ttl_seconds: float = 600.0,
+        max_bytes: int = 128 * 1024 * 1024,
+    ):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._waiting = 0  # live queued jobs; admission is based on this, not the queue size
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, Job]" = OrderedDict()  # finish order
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._threads: list = []
+        self._counters = {"submitted": 0, "rejected": 0, "evicted": 0, "expired": 0}
+
+    # ---------------- public API ---------------- #
+
+    def submit(self, call: Callable[..., Dict[str, Any]], total_laps: int,
+               engine: str = "python", agent_laps: int = 0) -> Job:
+        """
+        Enqueue `call` (invoked as call(progress=...)); returns the queued Job.
+        Raises QueueFull when max_queued jobs are already waiting.
+        """
+        job = Job(call, total_laps, engine, agent_laps)
+        with self._lock:
+            self._sweep(time.time())
+            self._start_workers()
+            if self._waiting >= self.max_queued:
+                self._counters["rejected"] += 1
+                raise QueueFull(f"job queue is full ({self.max_queued} waiting)")
+            self._waiting += 1
+            self._queue.put_nowait(job)
+            self._jobs[job.id] = job
+            self._counters["submitted"] += 1
+        metrics.inc("pitsynapse_worker_queue_depth", {"pool": "jobs"})
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._sweep(time.time())
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job (a running one stops at its next lap).
+        Finished jobs are left as they are.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job._cancelled.set()
+            if job.status == QUEUED:
+                # Frees its place now; a worker pops and skips the entry later
+                self._leave_queue()
+                self._finish(job, CANCELLED)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status = dict.fromkeys((QUEUED, RUNNING) + FINISHED, 0)
+            for job in self._jobs.values():
+                by_status[job.status] += 1
+            return {
+                "workers": self.workers,
+                "max_queued": self.max_queued,
+                "queue_depth": self._waiting,
+                "jobs": by_status,
+                "result_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                **self._counters,
+            }
+
+    def shutdown(self):
+        """Cancel every unfinished job and stop the workers."""
+        with self._lock:
+            for job in self._jobs.values():
+                job._cancelled.set()
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+    # ---------------- internals ---------------- #
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"pitsynapse-job-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.status != QUEUED:
+                    continue  # cancelled while waiting; its place is already free
+                self._leave_queue()
+                if job._cancelled.is_set():
+                    self._finish(job, CANCELLED)
+                    continue
+                job.status = RUNNING
+            self._run(job)
+
+    def _run(self, job: Job):
+        metrics.inc("pitsynapse_simulations_in_flight", {"kind": "job"})
+        start = time.perf_counter()
+        result = error = None
+        try:
+            result = job._call(progress=job.progress)
+            status = DONE
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            status, error = FAILED, f"Simulation failed: {e}"
+        finally:
+            metrics.inc("pitsynapse_simulations_in_flight", {"kind": "job"}, -1)
+        if status == DONE:
+            record_run(job.engine, job.agent_laps, time.perf_counter() - start)
+
+        size = 0
+        if result is not None:
+            size = len(json.dumps(result, separators=(",", ":")))
+            if size > self.max_bytes:
+                error = f"result of {size} bytes exceeds the job retention limit of {self.max_bytes} bytes"
+                result, status, size = None, FAILED, 0
+        with self._lock:
+            job.result = result
+            job.error = error
+            job.size = size
+            self._finish(job, status)
+
+    def _leave_queue(self):
+        """A live queued job starts or is cancelled. Caller holds the lock."""
+        self._waiting -= 1
+        metrics.inc("pitsynapse_worker_queue_depth", {"pool": "jobs"}, -1)
+
+    def _finish(self, job: Job, status: str):
+        """Mark a job finished and enforce the result budget. Caller holds the lock."""
+        job.status = status
+        job.finished_at = time.time()
+        job._call = None
+        if job.id not in self._jobs:
+            return  # expired or evicted while it was running
+        self._finished[job.id] = job
+        self._bytes += job.size
+        while self._bytes > self.max_bytes and self._finished:
+            _, oldest = self._finished.popitem(last=False)
+            self._drop(oldest)
+            self._counters["evicted"] += 1
+
+    def _sweep(self, now: float):
+        """Drop finished jobs older than the TTL. Caller holds the lock."""
+        while self._finished:
+            oldest = next(iter(self._finished.values()))
+            if now - oldest.finished_at < self.ttl_seconds:
+                break
+            self._finished.popitem(last=False)
+            self._drop(oldest)
+            self._counters["expired"] += 1
+
+    def _drop(self, job: Job):
+        self._jobs.pop(job.id, None)
+        self._bytes -= job.size
@@ -0,0 +1,52 @@
+# backend/services/lap_history.py
+"""
+Backend read access to the historical lap / pit store (data/lap_store.py,
+filled by data/f1_ingest.py).
+
+Exposes:
+ - LAP_STORE_PATH: the store file (PITSYNAPSE_LAP_STORE, default data/laps.sqlite
+   at the repo root)
+ - available(path) -> whether the store module and file are both there
+ - track_distributions(circuit, driver, path) -> {"base_pace", "pit_loss"} or None
+
+Behavior:
+ - the store module lives with the ingest scripts in the repo's data/
+   directory and is imported from there; without it (or without a store
+   file) lookups return None and callers keep the fixed race_model values
+ - every lookup is an indexed SQLite query on its own short-lived
+   connection, so it is safe from any thread and takes milliseconds
+ - distributions are lap_store's {"count", "mean", "std", "p10", "p50", "p90"}
+"""
+
+import os
+from pathlib import Path
+import sys
+from typing import Any, Dict, Optional
+
+INGEST_DIR = Path(__file__).parent.parent.parent.parent / "data"
+LAP_STORE_PATH = Path(os.environ.get("PITSYNAPSE_LAP_STORE") or INGEST_DIR / "laps.sqlite")
+
+sys.path.insert(0, str(INGEST_DIR))
+try:
+    from lap_store import LapStore
+except ImportError:  # ingest scripts not deployed
+    LapStore = None
+
+
+def available(path: Optional[Path] = None) -> bool:
+    return LapStore is not None and Path(path or LAP_STORE_PATH).exists()
+
+
+def track_distributions(circuit: Optional[str] = None, driver: Optional[str] = None,
+                        path: Optional[Path] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Clean-lap pace and pit-stop duration distributions for a circuit and/or
+    driver (both None: the whole store); None when the store is unavailable.
+    """
+    if not available(path):
+        return None
+    with LapStore(path or LAP_STORE_PATH) as store:
+        return {
+            "base_pace": store.base_pace(circuit=circuit, driver=driver),
+            "pit_loss": store.pit_loss(circuit=circuit, driver=driver),
+        }
@@ -0,0 +1,185 @@
+# backend/services/metrics.py
+"""
+Process-wide metrics in Prometheus text exposition format.
+
+Exposes:
+ - metrics: the shared Metrics registry
+ - Metrics.inc(name, labels, value) / observe(name, value, labels) / set(name, value, labels)
+ - Metrics.add_collector(fn) for values read at scrape time (cache stats, phase totals)
+ - Metrics.render() -> str (text format 0.0.4)
+ - record_run(engine, agent_laps, seconds): throughput counters for one run
+
+Lock-light: every thread writes to its own shard (found through a
+threading.local), so the hot path never takes a lock. The only lock guards the
+shard list, taken once per new thread and once per scrape. A scrape sums
+shard snapshots, so a value can trail a concurrent update by one observation.
+"""
+
+from bisect import bisect_left
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+
+# name -> (type, help, histogram buckets)
+DEFINITIONS = {
+    "pitsynapse_http_request_duration_seconds": (
+        "histogram", "HTTP request latency by route, method and status.", LATENCY_BUCKETS),
+    "pitsynapse_http_response_size_bytes": (
+        "histogram", "HTTP response body size by route.", SIZE_BUCKETS),
+    "pitsynapse_simulations_in_flight": (
+        "gauge", "Simulations currently running, by kind.", None),
+    "pitsynapse_worker_queue_depth": (
+        "gauge", "Simulations submitted to a worker pool but not started yet.", None),
+    "pitsynapse_simulation_runs_total": (
+        "counter", "Completed simulation runs by engine.", None),
+    "pitsynapse_simulation_agent_laps_total": (
+        "counter", "Simulated agent-laps by engine.", None),
+    "pitsynapse_simulation_seconds_total": (
+        "counter", "Wall time spent simulating by engine.", None),
+    "pitsynapse_simulation_agent_laps_per_second": (
+        "gauge", "Throughput of the most recent run by engine.", None),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Shard:
+    """One thread's values. Only its owner thread writes to it."""
+    __slots__ = ("values", "histograms")
+
+    def __init__(self):
+        self.values: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+
+class Metrics:
+    def __init__(self, definitions=DEFINITIONS):
+        self.definitions = dict(definitions)
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+        self._last: Dict[Tuple[str, Labels], float] = {}
+        self._collectors: List[Callable[[], Iterable[tuple]]] = []
+
+    # ---------------- recording (hot path) ---------------- #
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, labels: Dict[str, str] | None = None, value: float = 1.0):
+        """Add to a counter, or move a gauge by `value` (negative to decrease)."""
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        values = self._shard().values
+        values[key] = values.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Dict[str, str] | None = None):
+        """Record one histogram observation."""
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        histograms = self._shard().histograms
+        slots = histograms.get(key)
+        if slots is None:
+            # [per-bucket counts..., +Inf count, sum]
+            slots = histograms[key] = [0.0] * (len(self.definitions[name][2]) + 2)
+        slots[bisect_left(self.definitions[name][2], value)] += 1
+        slots[-1] += value
+
+    def set(self, name: str, value: float, labels: Dict[str, str] | None = None):
+        """Set a last-value gauge (a single dict store; no shard)."""
+        self._last[(name, tuple(sorted(labels.items())) if labels else ())] = value
+
+    def add_collector(self, collector: Callable[[], Iterable[tuple]]):
+        """
+        Register a scrape-time source. It returns (name, type, help, labels, value)
+        tuples; value is a number.
+        """
+        self._collectors.append(collector)
+
+    # ---------------- scraping ---------------- #
+
+    def snapshot(self) -> Tuple[Dict, Dict]:
+        """Summed (values, histograms) over all shards."""
+        with self._lock:
+            shards = list(self._shards)
+        values: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        for shard in shards:
+            for key, value in shard.values.copy().items():
+                values[key] = values.get(key, 0.0) + value
+            for key, slots in shard.histograms.copy().items():
+                total = histograms.setdefault(key, [0.0] * len(slots))
+                for i, count in enumerate(list(slots)):
+                    total[i] += count
+        values.update(self._last.copy())
+        return values, histograms
+
+    def render(self) -> str:
+        values, histograms = self.snapshot()
+        lines: List[str] = []
+
+        for name, (kind, help_text, buckets) in self.definitions.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for (metric, labels), slots in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0.0
+                    for bound, count in zip(buckets + (float("inf"),), slots):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _number(bound)
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {_number(cumulative)}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(slots[-1])}")
+                    lines.append(f"{name}_count{_labels(labels)} {_number(cumulative)}")
+            else:
+                for (metric, labels), value in sorted(values.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        described = set(self.definitions)
+        for collector in self._collectors:
+            for name, kind, help_text, labels, value in collector():
+                if name not in described:
+                    described.add(name)
+                    lines.append(f"# HELP {name} {help_text}")
+                    lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+metrics = Metrics()
+
+
+def record_run(engine: str, agent_laps: int, seconds: float):
+    """Feed the throughput metrics with one finished simulation (or batch of runs)."""
+    labels = {"engine": engine}
+    metrics.inc("pitsynapse_simulation_runs_total", labels)
+    metrics.inc("pitsynapse_simulation_agent_laps_total", labels, agent_laps)
+    metrics.inc("pitsynapse_simulation_seconds_total", labels, seconds)
+    if seconds > 0:
+        metrics.set("pitsynapse_simulation_agent_laps_per_second", agent_laps / seconds, labels)
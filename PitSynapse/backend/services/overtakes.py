@@ -0,0 +1,165 @@
+# backend/services/overtakes.py
+"""
+Pairwise overtake detection between two lap orderings.
+
+Exposes:
+ - OVERTAKE_SAMPLING: ("first", "spread")
+ - default_max_overtakes(n) -> per-lap event cap used when callers give none
+ - passes_per_slot(prev_positions) -> number of cars each car passed
+ - detect_overtakes(order, prev_position, max_events, sampling) -> index arrays
+
+Car A passed car B on a lap when A was behind B before the lap and is ahead
+of it after. These are the inversions between the previous and the new
+ordering; they are counted with a vectorized bottom-up merge sort
+(O(n log^2 n) NumPy work per lap, no O(n^2) pair scan). The returned passes
+are then picked by rank: the k-th car a passer overtook is a k-th-smallest
+query on a wavelet matrix of the slots, answered for all picks at once, so
+returning E passes costs O((n + E) log n) on top of the counting.
+
+Picking by rank, rather than having the merge sort list the pairs, is what
+keeps capped laps cheap: a capped pick is a handful of passes out of up to
+n(n-1)/2, and listing them all first costs time and memory in that total.
+On a reversed 10,000-car field with the default cap (20,000 of ~50M passes)
+listing takes ~12 s and ~3 GB; picking takes ~20 ms and ~4 MB (the
+"reversed" detect_overtakes benchmark).
+
+A full reshuffle of n cars implies up to n(n-1)/2 passes, so the engines cap
+the events per lap (default: default_max_overtakes(n), i.e.
+max(MIN_OVERTAKE_CAP, OVERTAKES_PER_AGENT * n); fields of up to 14 cars are
+never capped by it):
+ - "first":  the first max_events passes (leaders first)
+ - "spread": max_events passes evenly spread over all of them
+Both modes are deterministic and never touch the race's random stream.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+OVERTAKE_SAMPLING = ("first", "spread")
+
+# Default per-lap cap on overtake events, proportional to the field size
+OVERTAKES_PER_AGENT = 2
+MIN_OVERTAKE_CAP = 100
+
+
+def default_max_overtakes(n: int) -> int:
+    return max(MIN_OVERTAKE_CAP, OVERTAKES_PER_AGENT * n)
+
+
+def passes_per_slot(prev_positions: np.ndarray) -> np.ndarray:
+    """
+    prev_positions: previous position of the car in each new-order slot (a
+    permutation of 1..n). Returns counts[i] = cars with a better previous
+    position that finished the lap behind slot i, i.e. cars slot i passed.
+    """
+    vals = np.asarray(prev_positions, dtype=np.int64).copy()
+    n = vals.shape[0]
+    counts = np.zeros(n, dtype=np.int64)
+    owner = np.arange(n)
+    slots = np.arange(n)
+    stride = n + 1  # key = block * stride + value keeps blocks apart
+
+    width = 1
+    while width < n:
+        # Invariant: vals sorted within each block of `width` original slots
+        block = slots // width
+        right = block + 1
+        left = np.nonzero((block % 2 == 0) & (right * width < n))[0]
+        keys = block * stride + vals
+        # Right-sibling values smaller than each left value
+        below = np.searchsorted(keys, right[left] * stride + vals[left]) - right[left] * width
+        counts[owner[left]] += below
+
+        merged = np.argsort((slots // (2 * width)) * stride + vals, kind="stable")
+        vals = vals[merged]
+        owner = owner[merged]
+        width *= 2
+    return counts
+
+
+def detect_overtakes(
+    order: np.ndarray,
+    prev_position: np.ndarray,
+    max_events: int | None = None,
+    sampling: str = "first"
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every pairwise pass implied by a lap's reordering.
+
+    Args:
+        order: agent indices by new position (order[0] leads)
+        prev_position: 1-based position of each agent before the lap
+        max_events: cap on returned passes (None = all)
+        sampling: which passes to keep when capped (see OVERTAKE_SAMPLING)
+
+    Returns:
+        (agent, overtaken_agent, position_before, position_after) arrays; the
+        positions are the passing agent's. Sorted by the passer's new position,
+        then the passed car's.
+    """
+    if sampling not in OVERTAKE_SAMPLING:
+        raise ValueError(f"sampling must be one of {list(OVERTAKE_SAMPLING)}")
+    order = np.asarray(order, dtype=np.int64)
+    seq = np.asarray(prev_position, dtype=np.int64)[order]
+    n = seq.shape[0]
+    empty = np.zeros(0, dtype=np.int64)
+    if n < 2 or (max_events is not None and max_events <= 0) or np.all(seq[:-1] < seq[1:]):
+        return empty, empty, empty, empty
+
+    counts = passes_per_slot(seq)
+    total = int(counts.sum())
+    if max_events is None or total <= max_events:
+        ranks = None
+    elif sampling == "first":
+        ranks = np.arange(max_events, dtype=np.int64)
+    else:
+        ranks = (np.arange(max_events, dtype=np.int64) * total) // max_events
+
+    if ranks is None:
+        ranks = np.arange(total, dtype=np.int64)
+
+    # Map each pass rank to (passer slot, k-th car it passed, in slot order)
+    ends = np.cumsum(counts)
+    passer = np.searchsorted(ends, ranks, side="right")
+    offset = ranks - (ends[passer] - counts[passer])
+    # The cars a passer overtook are the slots after it holding a smaller
+    # previous position. Among all slots with a smaller previous position,
+    # (v - 1) - counts precede the passer, so the k-th overtaken car is the
+    # ((v - 1) - counts + k)-th smallest of those slots.
+    slot_of = np.empty(n, dtype=np.int64)
+    slot_of[seq - 1] = np.arange(n)
+    v = seq[passer]
+    passed_slots = _kth_smallest_in_prefix(slot_of, v - 1, (v - 1) - counts[passer] + offset)
+    return order[passer], order[passed_slots], seq[passer], passer + 1
+
+
+def _kth_smallest_in_prefix(values: np.ndarray, prefix: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """
+    For each query, the k-th smallest (0-based) of values[:prefix], with
+    values a permutation of 0..n-1. Builds a wavelet matrix (one stable
+    partition per bit) and walks all queries down it together:
+    O((n + queries) log n).
+    """
+    n = values.shape[0]
+    levels = []
+    cur = values
+    for bit in reversed(range(max(1, (n - 1).bit_length()))):
+        ones = (cur >> bit) & 1
+        rank1 = np.concatenate(([0], np.cumsum(ones)))
+        levels.append((bit, rank1, n - int(rank1[-1])))
+        cur = np.concatenate((cur[ones == 0], cur[ones == 1]))
+
+    lo = np.zeros_like(k)
+    hi = np.asarray(prefix, dtype=np.int64).copy()
+    k = np.asarray(k, dtype=np.int64).copy()
+    result = np.zeros_like(k)
+    for bit, rank1, zeros in levels:
+        ones_lo, ones_hi = rank1[lo], rank1[hi]
+        zero_count = (hi - lo) - (ones_hi - ones_lo)
+        high = k >= zero_count
+        k -= np.where(high, zero_count, 0)
+        lo = np.where(high, zeros + ones_lo, lo - ones_lo)
+        hi = np.where(high, zeros + ones_hi, hi - ones_hi)
+        result |= high.astype(np.int64) << bit
+    return result
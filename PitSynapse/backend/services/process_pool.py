@@ -0,0 +1,76 @@
+# backend/services/process_pool.py
+"""
+The process pool shared by ensembles, branches, strategy search and training.
+
+Exposes:
+ - get_pool() -> ProcessPoolExecutor (created on first use)
+ - pool_workers() -> its size (PITSYNAPSE_ENSEMBLE_WORKERS, default cpu_count)
+ - shutdown_pool()
+ - process_context() / warm_up / PRELOAD_MODULES: how every worker process
+   in the backend is started (also used by services.execution)
+
+Behavior:
+ - workers never fork the server process directly: the first request may
+   create the pool from a request-handling thread of a multithreaded server,
+   where a plain fork can copy held locks. They come from a forkserver
+   (spawn where forkserver is unavailable) that has PRELOAD_MODULES imported
+ - each worker runs warm_up once, so the first task it gets runs hot
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import threading
+from typing import Optional
+
+# Modules imported once in the fork server, so workers start with them loaded
+PRELOAD_MODULES = [
+    "services.simulation_runner", "services.vector_engine", "services.ensemble",
+    "services.branching", "services.strategy", "services.training",
+]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def process_context():
+    """forkserver context preloaded with PRELOAD_MODULES; spawn where unavailable."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD_MODULES)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def warm_up():
+    """Worker initializer: one tiny race per engine so first tasks run hot."""
+    from services.simulation_runner import run_simulation
+
+    race = {"total_laps": 2, "weather": "dry"}
+    agents = [{"aggression": 0.5, "risk_taking": 0.5, "tyre_management": 0.5, "pit_bias": 0.5}] * 2
+    for engine in ("python", "numpy"):
+        run_simulation(race, agents, seed=0, engine=engine)
+
+
+def pool_workers() -> int:
+    return int(os.environ.get("PITSYNAPSE_ENSEMBLE_WORKERS", os.cpu_count() or 1))
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The shared process pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=pool_workers(), mp_context=process_context(), initializer=warm_up
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the shared process pool (called on app shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
@@ -0,0 +1,187 @@
+# backend/services/profile_registry.py
+"""
+Load-once registry of predefined agent profiles (agent_profiles.json).
+
+Exposes:
+ - ProfileRegistry(path, check_interval)
+     get(profile_id) -> {"name", "traits"} | None   (ProfileStore shape)
+     shapes(profile_id) -> {"speed_shape", "tyre_wear_shape"} arrays
+     ids() / load() / stats()
+ - REGISTRY_TRAITS
+
+Behavior:
+ - the file is parsed once into an id-indexed table: one float64 trait
+   matrix (profiles x REGISTRY_TRAITS) plus NaN-padded float32 arrays for
+   the f1_ingest curves (speed_shape: profiles x laps x sectors,
+   tyre_wear_shape: profiles x laps); lookups never touch JSON
+ - the file's mtime and size are checked at most every `check_interval`
+   seconds and the table is rebuilt only when they changed; readers keep
+   the table they started with while a new one is swapped in, and a file
+   that fails to parse leaves the last good table in place
+ - accepts {"profiles": [...]} (this repo's file) and a bare list
+   (f1_ingest.py output); "risk_taking" defaults to "risk" and missing traits
+   to the AgentProfile defaults; a missing file is an empty registry
+"""
+
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+REGISTRY_TRAITS = ("aggression", "risk", "risk_taking", "tyre_management", "pit_bias", "weather_sensitivity")
+_DEFAULTS = {"aggression": 0.5, "risk": 0.5, "tyre_management": 0.6, "pit_bias": 0.5, "weather_sensitivity": 0.5}
+
+
+@dataclass(frozen=True, slots=True)
+class _Table:
+    ids: List[str]
+    index: Dict[str, int]
+    names: List[str]
+    traits: np.ndarray
+    speed_shape: np.ndarray  # profiles x laps x sectors, NaN-padded
+    speed_laps: np.ndarray  # valid laps per profile
+    tyre_wear_shape: np.ndarray  # profiles x laps, NaN-padded
+    wear_laps: np.ndarray
+    stamp: tuple  # (mtime_ns, size) of the file it was built from
+
+
+def _parse(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _padded(rows: List[Any], trailing: tuple) -> tuple:
+    """Ragged per-profile curves -> (NaN-padded float32 array, lengths)."""
+    arrays = [
+        np.asarray(row, dtype=np.float32).reshape((-1,) + trailing) if row else np.empty((0,) + trailing, np.float32)
+        for row in rows
+    ]
+    lengths = np.array([len(a) for a in arrays], dtype=np.int64)
+    out = np.full((len(arrays), int(lengths.max(initial=0))) + trailing, np.nan, dtype=np.float32)
+    for i, a in enumerate(arrays):
+        out[i, :len(a)] = a
+    return out, lengths
+
+
+def _build(entries: List[Dict[str, Any]], stamp: tuple) -> _Table:
+    ids, names, rows = [], [], []
+    for i, entry in enumerate(entries):
+        ids.append(str(entry.get("id") or f"profile_{i + 1}"))
+        names.append(entry.get("name") or ids[-1])
+        values = {key: float(entry.get(key, default)) for key, default in _DEFAULTS.items()}
+        values["risk_taking"] = float(entry.get("risk_taking", values["risk"]))
+        rows.append([values[key] for key in REGISTRY_TRAITS])
+    index = {pid: i for i, pid in enumerate(ids)}
+    if len(index) != len(ids):
+        raise ValueError("agent profile ids must be unique")
+
+    sectors = max((len(e["speed_shape"][0]) for e in entries if e.get("speed_shape")), default=0)
+    speed, speed_laps = _padded([e.get("speed_shape") for e in entries], (sectors,))
+    wear, wear_laps = _padded([e.get("tyre_wear_shape") for e in entries], ())
+    return _Table(
+        ids=ids,
+        index=index,
+        names=names,
+        traits=np.array(rows, dtype=float).reshape(-1, len(REGISTRY_TRAITS)),
+        speed_shape=speed,
+        speed_laps=speed_laps,
+        tyre_wear_shape=wear,
+        wear_laps=wear_laps,
+        stamp=stamp,
+    )
+
+
+_EMPTY = _build([], (None, None))
+
+
+class ProfileRegistry:
+    def __init__(self, path: str | Path, check_interval: float = 1.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._table = _EMPTY
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self._reloads = 0
+
+    # ---------------- public API ---------------- #
+
+    def load(self) -> int:
+        """Load (or reload) now, e.g. at startup; returns the profile count. Raises on a bad file."""
+        with self._lock:
+            self._refresh(time.monotonic(), strict=True)
+            return len(self._table.ids)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        table = self._current()
+        i = table.index.get(profile_id)
+        if i is None:
+            return None
+        return {
+            "name": table.names[i],
+            "traits": dict(zip(REGISTRY_TRAITS, table.traits[i].tolist())),
+        }
+
+    def shapes(self, profile_id: str) -> Optional[Dict[str, np.ndarray]]:
+        """The profile's speed_shape (laps x sectors) and tyre_wear_shape (laps); empty when absent."""
+        table = self._current()
+        i = table.index.get(profile_id)
+        if i is None:
+            return None
+        return {
+            "speed_shape": table.speed_shape[i, :table.speed_laps[i]],
+            "tyre_wear_shape": table.tyre_wear_shape[i, :table.wear_laps[i]],
+        }
+
+    def ids(self) -> List[str]:
+        return list(self._current().ids)
+
+    def stats(self) -> Dict[str, Any]:
+        table = self._current()
+        return {
+            "path": str(self.path),
+            "profiles": len(table.ids),
+            "reloads": self._reloads,
+            "bytes": table.traits.nbytes + table.speed_shape.nbytes + table.tyre_wear_shape.nbytes,
+        }
+
+    # ---------------- internals ---------------- #
+
+    def _current(self) -> _Table:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._table
+        with self._lock:
+            if now - self._checked_at >= self.check_interval:
+                self._refresh(now, strict=False)
+            return self._table
+
+    def _refresh(self, now: float, strict: bool):
+        """Rebuild the table if the file changed. Caller holds the lock."""
+        self._checked_at = now
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._table = _EMPTY
+            return
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._table.stamp:
+            return
+        try:
+            data = _parse(self.path.read_bytes())
+            entries = data.get("profiles", []) if isinstance(data, dict) else data
+            table = _build(entries, stamp)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError, IndexError):
+            if strict:
+                raise
+            return  # keep serving the last good table (e.g. file mid-write); retried next check
+        self._table = table
+        self._reloads += 1
@@ -0,0 +1,102 @@
+# backend/services/profile_store.py
+"""
+Local store of learned agent profiles.
+
+Exposes:
+ - ProfileStore(directory) with save(profile_id, profile) / get(profile_id) / list_ids()
+   (get returns a shared dict; treat it as read-only)
+ - profile_settings(profile, overrides) -> agent settings dict for run_simulation
+ - PROFILE_ID_PATTERN, PROFILE_TRAITS
+
+Behavior:
+ - one JSON file per profile (`<profile_id>.json`), written with
+   write-then-rename so readers never see a partial file
+ - a stored profile holds the traits an AgentProfile carries (the decision
+   "risk" and PRL "risk_taking" separately, plus learning_rate) and free-form
+   metadata about how it was produced
+ - profile ids are restricted to PROFILE_ID_PATTERN, so an id is always a
+   plain file name inside the store directory
+ - parsed profiles are cached and a file is re-read only when its mtime or
+   size changes
+"""
+
+import json
+import os
+from pathlib import Path
+import re
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+# Values a stored profile restores (settings names, as _build_profiles reads them)
+PROFILE_TRAITS = (
+    "aggression", "risk", "risk_taking", "tyre_management", "pit_bias",
+    "weather_sensitivity", "learning_rate",
+)
+
+
+def _check_id(profile_id: str):
+    if not isinstance(profile_id, str) or not PROFILE_ID_PATTERN.match(profile_id):
+        raise ValueError(f"invalid profile_id {profile_id!r}")
+
+
+def profile_settings(profile: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Agent settings from a stored profile; values in `overrides` that are not
+    None (id, name, explicit traits) take precedence.
+    """
+    settings = {key: profile["traits"][key] for key in PROFILE_TRAITS if key in profile["traits"]}
+    if profile.get("name"):
+        settings["name"] = profile["name"]
+    for key, value in overrides.items():
+        if value is not None:
+            settings[key] = value
+    if overrides.get("risk_taking") is not None:
+        settings["risk"] = overrides["risk_taking"]  # as for settings built from scratch
+    return settings
+
+
+class ProfileStore:
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self._cache: Dict[Tuple[Path, str], Tuple[tuple, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def save(self, profile_id: str, profile: Dict[str, Any]):
+        """Store (or replace) one profile: {"name", "traits": {...}, "meta": {...}}."""
+        _check_id(profile_id)
+        raw = json.dumps({"profile_id": profile_id, **profile}, indent=2).encode("utf-8")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, self.directory / f"{profile_id}.json")
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if not isinstance(profile_id, str) or not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.json"
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        key = (self.directory, profile_id)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            profile = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._cache[key] = (stamp, profile)
+        return profile
+
+    def list_ids(self) -> List[str]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(path.stem for path in self.directory.glob("*.json"))
@@ -0,0 +1,97 @@
+# backend/services/profiling.py
+"""
+Optional per-phase timing for simulation runs.
+
+Exposes:
+ - PHASES: phase names, in loop order
+ - PhaseTimer: wall time + call counts per phase for one run
+ - phase_totals: process-wide accumulation of every timed run
+ - finish_timing(timer, **info) -> response metadata block (also feeds phase_totals)
+
+Usage inside an engine (timer is None when timing is off, so the cost of the
+disabled path is one truth test per phase per lap):
+
+    timer = PhaseTimer() if phase_timings else None
+    ...
+    if timer:
+        t = perf_counter()
+    decide(...)
+    if timer:
+        t = timer.lap("decisions", t, calls=n)
+
+Phases:
+ - decisions  agent_logic.decide_actions
+ - physics    lap-time and tyre-wear models (incl. pit stops)
+ - positions  sort by lap time and position assignment
+ - overtakes  services.overtakes.detect_overtakes
+ - events     per-agent state update and timeline / event construction
+ - prl        PRL trait updates
+ - summary    final summary
+"""
+
+import threading
+from time import perf_counter
+from typing import Dict, Any
+
+PHASES = ("decisions", "physics", "positions", "overtakes", "events", "prl", "summary")
+
+
+class PhaseTimer:
+    __slots__ = ("seconds", "calls", "_started")
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self._started = perf_counter()
+
+    def lap(self, phase: str, since: float, calls: int = 1) -> float:
+        """Charge the time since `since` to `phase`; returns now (the next `since`)."""
+        now = perf_counter()
+        self.seconds[phase] += now - since
+        self.calls[phase] += calls
+        return now
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": round(perf_counter() - self._started, 6),
+            "phases": {
+                phase: {"seconds": round(self.seconds[phase], 6), "calls": self.calls[phase]}
+                for phase in PHASES
+            },
+        }
+
+
+class PhaseTotals:
+    """Process-wide phase totals, added to once per timed run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seconds = dict.fromkeys(PHASES, 0.0)
+        self._calls = dict.fromkeys(PHASES, 0)
+        self._runs = 0
+
+    def add(self, timer: PhaseTimer):
+        with self._lock:
+            self._runs += 1
+            for phase in PHASES:
+                self._seconds[phase] += timer.seconds[phase]
+                self._calls[phase] += timer.calls[phase]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runs": self._runs,
+                "phases": {
+                    phase: {"seconds": self._seconds[phase], "calls": self._calls[phase]}
+                    for phase in PHASES
+                },
+            }
+
+
+phase_totals = PhaseTotals()
+
+
+def finish_timing(timer: PhaseTimer, **info) -> Dict[str, Any]:
+    """Record a finished run in phase_totals; returns its response metadata block."""
+    phase_totals.add(timer)
+    return {**info, "phase_timings": timer.report()}
@@ -0,0 +1,53 @@
+# backend/services/race_model.py
+"""
+Lap-time and tyre-wear model parameters shared by both engines, strategy
+search and the surrogate.
+
+Exposes:
+ - scalar parameters (BASE_LAP_TIME, PIT_LOSS, BASE_TYRE_WEAR, ...)
+ - LAP_TIME_MODIFIERS / TYRE_WEAR_MULTIPLIERS: per-action tables by name
+ - ACTION_LAP_OFFSET / ACTION_LAP_AGGRESSION / ACTION_WEAR_MULT: the same
+   tables as arrays indexed by agent_logic action code, for array code
+"""
+
+import numpy as np
+
+from services.agent_logic import ACTIONS, A_PIT
+
+BASE_LAP_TIME = 90.0  # Base lap time in seconds
+MIN_LAP_TIME = 10.0
+LAP_TIME_NOISE = 0.1  # uniform +/- seconds per lap
+TYRE_PENALTY_SCALE = 3.0
+BASE_TYRE_WEAR = 0.03  # 3% per lap baseline
+FRESH_TYRE_WEAR = 0.02
+PIT_LOSS = 22.0
+PIT_LOSS_JITTER = 1.5
+WEATHER_CHANGE_PROB = 0.1
+PRL_EXPECTED_WEAR = 0.04
+PRL_LEARNING_RATE = 0.02
+
+# Lap-time modifier per action: offset + aggression * coef (seconds)
+LAP_TIME_MODIFIERS = {
+    "push_hard": (-1.5, -0.5),
+    "push_medium": (-0.8, -0.3),
+    "maintain": (0.0, 0.0),
+    "conserve_low": (0.6, 0.0),
+    "conserve_medium": (1.2, 0.0),
+    "conserve_high": (2.2, 0.0),
+}
+
+TYRE_WEAR_MULTIPLIERS = {
+    "push_hard": 1.6,
+    "push_medium": 1.2,
+    "maintain": 1.0,
+    "conserve_low": 0.8,
+    "conserve_medium": 0.6,
+    "conserve_high": 0.45,
+}
+
+# Per-action-code tables (pit laps are driven at "maintain" pace)
+ACTION_LAP_OFFSET = np.array([LAP_TIME_MODIFIERS.get(a, (0.0, 0.0))[0] for a in ACTIONS])
+ACTION_LAP_AGGRESSION = np.array([LAP_TIME_MODIFIERS.get(a, (0.0, 0.0))[1] for a in ACTIONS])
+ACTION_WEAR_MULT = np.array([TYRE_WEAR_MULTIPLIERS.get(a, 1.0) for a in ACTIONS])
+ACTION_LAP_OFFSET[A_PIT] = 0.0
+ACTION_LAP_AGGRESSION[A_PIT] = 0.0
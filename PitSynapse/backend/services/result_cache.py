@@ -0,0 +1,136 @@
+# backend/services/result_cache.py
+"""
+Content-addressed cache for seeded simulation results.
+
+Exposes:
+ - cache_key(payload) -> str (sha256 of canonical JSON)
+ - ResultCache(max_bytes, disk_dir) with get(key) / put(key, result) / stats()
+
+Behavior:
+ - memory tier: LRU bounded by the serialized size of the stored results
+ - optional disk tier: one JSON file per key, survives restarts; disk hits are
+   promoted back into memory
+ - counts hits (per tier), misses, stores and evictions
+
+Cached results are shared between callers and must be treated as read-only.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Stable hash of a JSON-able payload (key order and whitespace independent)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: str | Path | None = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: "OrderedDict[str, tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    # ---------------- public API ---------------- #
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return entry[0]
+
+        raw = self._read_disk(key)
+        if raw is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        result = json.loads(raw)
+        with self._lock:
+            self._counters["disk_hits"] += 1
+            self._insert(key, result, len(raw))
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        raw = json.dumps(result, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._counters["stores"] += 1
+            self._insert(key, result, len(raw))
+        self._write_disk(key, raw)
+
+    def clear(self):
+        """Drop the memory tier (the disk tier is left in place)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": self.disk_dir is not None,
+            }
+
+    # ---------------- internals ---------------- #
+
+    def _insert(self, key: str, result: Dict[str, Any], size: int):
+        """Add to the memory tier and evict LRU entries over the byte bound. Caller holds the lock."""
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (result, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._counters["evictions"] += 1
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self.disk_dir is None:
+            return None
+        try:
+            return self._disk_path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, raw: bytes):
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(raw)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # disk tier is best-effort
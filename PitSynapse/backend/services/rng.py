@@ -0,0 +1,38 @@
+# backend/services/rng.py
+"""
+Per-run random streams.
+
+Exposes:
+ - make_rng(seed) -> random.Random owned by a single simulation run
+ - spawn_seeds(seed, n) -> n independent child seeds (numpy SeedSequence spawning)
+
+Simulations never touch the global `random` module state, so concurrent runs in
+threads, processes or batches cannot interleave draws, and a given seed always
+produces the same race.
+"""
+
+import random
+from typing import List
+
+import numpy as np
+
+
+def make_rng(seed: int | None = None) -> random.Random:
+    """
+    Create the generator for one run. `seed=None` draws fresh OS entropy.
+
+    random.Random(seed) yields the same stream as random.seed(seed) did on the
+    module RNG, so seeded results are unchanged from the global-state version.
+    """
+    return random.Random(seed)
+
+
+def spawn_seeds(seed: int | None, n: int) -> List[int]:
+    """
+    Derive `n` statistically independent 64-bit child seeds from one root seed.
+
+    Children are stable for a given (seed, index), regardless of how runs are later
+    split across workers.
+    """
+    root = np.random.SeedSequence(seed)
+    return [int(child.generate_state(1, dtype=np.uint64)[0]) for child in root.spawn(n)]
@@ -8,7 +8,7 @@ Exposes:
 Behavior:
  - creates agents from agent_settings
  - for each lap:
-     - decide action via agent_logic.decide_action
+     - decide actions for the field via agent_logic.decide_actions
      - simulate lap_time and tyre_wear
      - emit lap_complete, pit_stop, overtake, prl_update events
  - returns timeline + summary dict
@@ -17,7 +17,8 @@ Behavior:
 from pathlib import Path
 import json
 import random
-from typing import Dict, Any, List
+from time import perf_counter
+from typing import Callable, Dict, Any, List, Iterable
 import uuid
 
 # Pydantic event models
@@ -42,11 +43,40 @@ from models.events import (
 )
 
 # PRL and decision logic
-from prl_system import update_traits_prl, compute_performance_signal
-from services.agent_logic import decide_action, PIT
+from prl_system import update_traits_prl, update_traits_prl_batch, compute_performance_signal, PRL_TRAIT_KEYS
+from models.state import AgentProfile, AgentState, RaceState
+from services.agent_logic import decide_actions, PIT, ACTIONS, ACTION_CODES
+from services.overtakes import detect_overtakes, default_max_overtakes, OVERTAKE_SAMPLING
+from services.columnar import new_timeline, new_events, append_row, columnar_result
+from services.rng import make_rng
+from services.profiling import PhaseTimer, finish_timing
+from services.snapshots import RaceSnapshot, capture_python, restore_python
+from services.race_model import (
+    BASE_LAP_TIME,
+    MIN_LAP_TIME,
+    LAP_TIME_NOISE,
+    TYRE_PENALTY_SCALE,
+    BASE_TYRE_WEAR,
+    FRESH_TYRE_WEAR,
+    PIT_LOSS,
+    PIT_LOSS_JITTER,
+    WEATHER_CHANGE_PROB,
+    PRL_EXPECTED_WEAR,
+    PRL_LEARNING_RATE,
+    LAP_TIME_MODIFIERS,
+    TYRE_WEAR_MULTIPLIERS,
+)
 
 AGENT_PROFILES_PATH = Path(__file__).parent.parent.parent / "data" / "agent_profiles.json"
 
+ENGINES = ("python", "numpy")
+DECISION_TRAITS = ("aggression", "risk", "tyre_management", "pit_bias", "weather_sensitivity")
+LAYOUTS = ("records", "columnar")
+EVENT_TYPES = ("lap_complete", "pit_stop", "overtake", "prl_update")
+
+# Bump whenever a change alters seeded output (invalidates cached results)
+ENGINE_VERSION = "2"
+
 
 def _action_to_enum(action_str: str) -> ActionEnum:
     """Map string action to ActionEnum."""
@@ -62,85 +92,113 @@ def _action_to_enum(action_str: str) -> ActionEnum:
     return mapping.get(action_str, ActionEnum.maintain)
 
 
-def _simulate_lap_time(base_time: float, action: str, profile: Dict[str, Any], tyre_wear: float) -> float:
+def _expected_lap_time(base_time: float, action: str, profile: AgentProfile, tyre_wear: float) -> float:
     """
-    Optimized lap-time model with tyre wear penalty.
+    Noise-free part of the lap-time model (unrounded): base time, action
+    modifier and tyre wear penalty.
     """
     # Action modifiers
-    action_modifiers = {
-        "push_hard": -1.5 - (profile.get("aggression", 0.5) * 0.5),
-        "push_medium": -0.8 - (profile.get("aggression", 0.5) * 0.3),
-        "maintain": 0.0,
-        "conserve_low": 0.6,
-        "conserve_medium": 1.2,
-        "conserve_high": 2.2
-    }
-    modifier = action_modifiers.get(action, 0.0)
+    offset, aggression_coef = LAP_TIME_MODIFIERS.get(action, (0.0, 0.0))
+    modifier = offset + profile.aggression * aggression_coef
     
     # Tyre wear penalty (exponential degradation)
-    tyre_penalty = (tyre_wear ** 1.5) * 3.0  # More wear = slower
+    tyre_penalty = (tyre_wear ** 1.5) * TYRE_PENALTY_SCALE  # More wear = slower
     
+    return base_time + modifier + tyre_penalty
+
+
+def _simulate_lap_time(base_time: float, action: str, profile: AgentProfile, tyre_wear: float, rng: random.Random) -> float:
+    """
+    Optimized lap-time model with tyre wear penalty.
+    Noise is drawn from the run's own generator (see services.rng).
+    """
     # Small random noise
-    noise = random.uniform(-0.1, 0.1)
+    noise = rng.uniform(-LAP_TIME_NOISE, LAP_TIME_NOISE)
     
-    lap_time = base_time + modifier + tyre_penalty + noise
-    return max(10.0, round(lap_time, 2))
+    lap_time = _expected_lap_time(base_time, action, profile, tyre_wear) + noise
+    return max(MIN_LAP_TIME, round(lap_time, 2))
 
 
-def _simulate_tyre_wear(prev_wear: float, action: str, profile: Dict[str, Any]) -> float:
+def _simulate_tyre_wear(prev_wear: float, action: str, profile: AgentProfile) -> float:
     """
     Tyre wear per lap with management factor.
     """
-    base_inc = 0.03  # 3% per lap baseline
-    action_multipliers = {
-        "push_hard": 1.6,
-        "push_medium": 1.2,
-        "maintain": 1.0,
-        "conserve_low": 0.8,
-        "conserve_medium": 0.6,
-        "conserve_high": 0.45
-    }
-    action_mult = action_multipliers.get(action, 1.0)
+    action_mult = TYRE_WEAR_MULTIPLIERS.get(action, 1.0)
     
-    management = profile.get("tyre_management", 0.6)
-    wear = prev_wear + base_inc * action_mult * (1.0 - 0.4 * management)
+    management = profile.tyre_management
+    wear = prev_wear + BASE_TYRE_WEAR * action_mult * (1.0 - 0.4 * management)
     return round(min(1.0, wear), 4)
 
 
-def _detect_overtakes(lap_results: List[Dict], prev_positions: Dict[str, int], new_positions: Dict[str, int]) -> List[Dict]:
+def _build_profiles(agent_settings: List[Dict[str, Any]]) -> List[AgentProfile]:
     """
-    Detect overtakes based on position changes.
-    Returns list of overtake events.
+    Create mutable agent profiles from request settings.
+
+    Learned profiles (services.training) also carry "risk" (the decision
+    risk, otherwise equal to risk_taking) and "learning_rate".
     """
-    overtakes = []
-    for res in lap_results:
-        aid = res["agent_id"]
-        new_pos = new_positions.get(aid, prev_positions.get(aid, 1))
-        old_pos = prev_positions.get(aid, new_pos)
-        
-        if new_pos < old_pos:  # Gained position
-            # Find who was overtaken (agent at old_pos)
-            for other_res in lap_results:
-                other_aid = other_res["agent_id"]
-                other_new_pos = new_positions.get(other_aid, prev_positions.get(other_aid, 1))
-                if other_new_pos == old_pos and other_aid != aid:
-                    overtakes.append({
-                        "agent_id": aid,
-                        "agent_name": res["profile"].get("name", aid),
-                        "overtaken_agent_id": other_aid,
-                        "overtaken_agent_name": other_res["profile"].get("name", other_aid),
-                        "position_before": old_pos,
-                        "position_after": new_pos,
-                        "success": True
-                    })
-                    break
-    return overtakes
+    agents_ordered = []
+    for i, agent_setting in enumerate(agent_settings):
+        # Pydantic dumps unset optional fields as None, so fall back explicitly
+        agent_id = agent_setting.get("id") or f"agent_{i+1}"
+        risk_taking = float(agent_setting.get("risk_taking", 0.5))
+        risk = agent_setting.get("risk")
+        learning_rate = agent_setting.get("learning_rate")
+        profile = AgentProfile(
+            id=agent_id,
+            name=agent_setting.get("name") or f"Agent {i+1}",
+            aggression=float(agent_setting.get("aggression", 0.5)),
+            risk=risk_taking if risk is None else float(risk),
+            risk_taking=risk_taking,
+            tyre_management=float(agent_setting.get("tyre_management", 0.6)),
+            pit_bias=float(agent_setting.get("pit_bias", 0.5)),
+            weather_sensitivity=float(agent_setting.get("weather_sensitivity", 0.5)),
+            learning_rate=PRL_LEARNING_RATE if learning_rate is None else float(learning_rate)
+        )
+        agents_ordered.append(profile)
+    return agents_ordered
+
+
+def _wanted_events(event_types: Iterable[str] | None) -> tuple:
+    """Normalize an event-type selection (None = all) and reject unknown types."""
+    if event_types is None:
+        return EVENT_TYPES
+    wanted = set(event_types)
+    unknown = wanted.difference(EVENT_TYPES)
+    if unknown:
+        raise ValueError(f"unknown event types {sorted(unknown)}; allowed: {list(EVENT_TYPES)}")
+    return tuple(etype for etype in EVENT_TYPES if etype in wanted)
+
+
+def _override_codes(action_overrides: Dict[int, Dict[int, str]] | None) -> Dict[int, Dict[int, int]]:
+    """Validate {lap: {agent index: action}} overrides and map actions to codes."""
+    if not action_overrides:
+        return {}
+    codes = {}
+    for lap, by_agent in action_overrides.items():
+        for idx, action in by_agent.items():
+            if action not in ACTION_CODES:
+                raise ValueError(f"unknown action {action!r}; allowed: {list(ACTIONS)}")
+            codes.setdefault(int(lap), {})[int(idx)] = ACTION_CODES[action]
+    return codes
 
 
 def run_simulation(
     race_params: Dict[str, Any],
     agent_settings: List[Dict[str, Any]],
-    seed: int | None = None
+    seed: int | None = None,
+    engine: str = "python",
+    rng: random.Random | None = None,
+    layout: str = "records",
+    include_timeline: bool = True,
+    event_types: Iterable[str] | None = None,
+    max_overtakes: int | None = None,
+    overtake_sampling: str = "first",
+    phase_timings: bool = False,
+    progress: Callable[[int], None] | None = None,
+    snapshot_laps: Iterable[int] | None = None,
+    resume_from: RaceSnapshot | None = None,
+    action_overrides: Dict[int, Dict[int, str]] | None = None
 ) -> Dict[str, Any]:
     """
     Main simulation function.
@@ -149,6 +207,31 @@ def run_simulation(
         race_params: {total_laps, weather, track_id}
         agent_settings: List of {id, aggression, risk_taking, tyre_management, pit_bias}
         seed: Optional random seed
+        rng: Optional generator for the "python" engine; overrides seed.
+            Each run owns its generator, so concurrent runs stay reproducible.
+        engine: "python" (per-agent loop) or "numpy" (struct-of-arrays batch
+            engine in services.vector_engine, for large fields)
+        layout: "records" (list of dicts, below) or "columnar" (one list per
+            field, appended to directly; see services.columnar)
+        include_timeline: build the per-lap timeline (empty list when False)
+        event_types: event types to emit (None = all of EVENT_TYPES, empty =
+            none). Skipped outputs are never built; the summary is always returned.
+        max_overtakes: cap on overtake events per lap (None = default_max_overtakes
+            of the field size, i.e. max(100, 2 x agents))
+        overtake_sampling: passes kept when capped: "first" or "spread"
+            (see services.overtakes)
+        phase_timings: time each loop phase (see services.profiling) and add
+            a "metadata" block to the result; off by default
+        progress: optional callback, called with the number of laps completed
+            before every lap and once at the end. An exception raised by it
+            aborts the run (used for job cancellation).
+        snapshot_laps: laps after which to capture a RaceSnapshot (0 = before
+            the first lap); they are returned under result["snapshots"]
+        resume_from: continue a race from a RaceSnapshot (see
+            resume_simulation); race_params, agent_settings, seed and rng are
+            taken from the snapshot, and only the remaining laps are emitted
+        action_overrides: {lap: {agent index: action}} replacing the decided
+            action (one of agent_logic.ACTIONS, e.g. "pit_stop" to force a stop)
     
     Returns:
         {
@@ -157,13 +240,38 @@ def run_simulation(
                 "fastest_lap": float,
                 "avg_tyre_wear": float,
                 "pit_stops": Dict[str, int],
-                "winner": str
+                "winner": str,
+                "finishing_order": List[str]  # agent ids by total race time
             }
         }
     """
     
-    if seed is not None:
-        random.seed(seed)
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {list(ENGINES)}")
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {list(LAYOUTS)}")
+    if overtake_sampling not in OVERTAKE_SAMPLING:
+        raise ValueError(f"overtake_sampling must be one of {list(OVERTAKE_SAMPLING)}")
+    wanted_events = _wanted_events(event_types)
+    action_overrides = _override_codes(action_overrides)
+    if resume_from is not None:
+        if resume_from.engine != engine:
+            raise ValueError(f"snapshot was taken with engine {resume_from.engine!r}")
+        race_params = resume_from.race_params
+    if engine == "numpy":
+        from services.vector_engine import run_simulation_vectorized
+        return run_simulation_vectorized(
+            race_params, agent_settings, seed, layout=layout,
+            include_timeline=include_timeline, event_types=wanted_events,
+            max_overtakes=max_overtakes, overtake_sampling=overtake_sampling,
+            phase_timings=phase_timings, progress=progress,
+            snapshot_laps=snapshot_laps, resume_from=resume_from,
+            action_overrides=action_overrides
+        )
+    
+    if rng is None:
+        rng = make_rng(seed)
+    timer = PhaseTimer() if phase_timings else None
     
     # Extract race parameters
     total_laps = race_params.get("total_laps", 50)
@@ -171,45 +279,32 @@ def run_simulation(
     track_name = race_params.get("track_id", "default")
     race_id = str(uuid.uuid4())
     
-    # Create agent profiles from settings
-    agents_ordered = []
-    for i, agent_setting in enumerate(agent_settings):
-        agent_id = agent_setting.get("id", f"agent_{i+1}")
-        profile = {
-            "id": agent_id,
-            "name": agent_setting.get("name", f"Agent {i+1}"),
-            "aggression": float(agent_setting.get("aggression", 0.5)),
-            "risk": float(agent_setting.get("risk_taking", 0.5)),
-            "risk_taking": float(agent_setting.get("risk_taking", 0.5)),
-            "tyre_management": float(agent_setting.get("tyre_management", 0.6)),
-            "pit_bias": float(agent_setting.get("pit_bias", 0.5)),
-            "weather_sensitivity": float(agent_setting.get("weather_sensitivity", 0.5)),
-            "learning_rate": 0.02
-        }
-        agents_ordered.append(profile)
+    if resume_from is None:
+        # Create agent profiles from settings
+        agents_ordered = _build_profiles(agent_settings)
+        # Dynamic state: allocated once per race and mutated in place every lap
+        states = [AgentState(position=pos) for pos in range(1, len(agents_ordered) + 1)]
+    else:
+        agents_ordered, states, resumed_weather, resumed_elapsed, rng = restore_python(resume_from)
     
     total_agents = len(agents_ordered)
     if total_agents == 0:
         raise ValueError("At least one agent required")
+    if max_overtakes is None:
+        max_overtakes = default_max_overtakes(total_agents)
     
-    # Initialize dynamic state
-    dyn_state: Dict[str, Dict[str, Any]] = {}
-    base_lap_time = 90.0  # Base lap time in seconds
-    
-    for pos, profile in enumerate(agents_ordered, start=1):
-        aid = profile["id"]
-        dyn_state[aid] = {
-            "position": pos,
-            "tyre_wear": 0.0,
-            "tyre_age": 0,
-            "pit_next": False,
-            "last_lap_time": None,
-            "best_lap": None,
-            "pit_stops": 0,
-            "total_time": 0.0
-        }
+    race_state = RaceState(total_agents=total_agents)
+    base_lap_time = BASE_LAP_TIME
     
     # Timeline storage
+    emit_lap = "lap_complete" in wanted_events
+    emit_pit = "pit_stop" in wanted_events
+    emit_overtake = "overtake" in wanted_events
+    emit_prl = "prl_update" in wanted_events
+    columnar = layout == "columnar"
+    if columnar:
+        timeline_cols = new_timeline()
+        event_cols = new_events(wanted_events)
     timeline_entries = []
     all_events = []
     elapsed = 0.0
@@ -224,220 +319,312 @@ def run_simulation(
     if weather_mode in weather_map:
         current_weather = weather_map[weather_mode]
     
+    first_lap = 1
+    if resume_from is not None:
+        current_weather = WeatherEnum(resumed_weather)
+        elapsed = resumed_elapsed
+        first_lap = resume_from.lap + 1
+    snapshot_at = set(snapshot_laps or ())
+    snapshots = []
+    
     # Main simulation loop
-    for lap_num in range(1, total_laps + 1):
+    for lap_num in range(first_lap, total_laps + 2):
+        if progress:
+            progress(lap_num - 1)
+        if lap_num - 1 in snapshot_at:
+            snapshots.append(capture_python(
+                lap_num - 1, race_params, agents_ordered, states,
+                current_weather.value, elapsed, rng
+            ))
+        if lap_num > total_laps:
+            break
+        
         # Weather changes (simplified)
-        if random.random() < 0.1:  # 10% chance per lap
-            current_weather = random.choice([WeatherEnum.dry, WeatherEnum.light_rain])
+        if rng.random() < WEATHER_CHANGE_PROB:  # 10% chance per lap
+            current_weather = rng.choice([WeatherEnum.dry, WeatherEnum.light_rain])
         
-        laps_remaining = total_laps - lap_num
-        lap_results = []
-        prev_positions = {aid: dyn_state[aid]["position"] for aid in dyn_state}
+        race_state.laps_remaining = total_laps - lap_num
+        race_state.weather = current_weather.value
+        if timer:
+            t = perf_counter()
+        
+        # Decide actions for the whole field at once (same rules as decide_action)
+        action_codes = decide_actions(
+            {
+                "tyre_wear": [st.tyre_wear for st in states],
+                "position": [st.position for st in states],
+                "pit_next": [st.pit_next for st in states],
+            },
+            {key: [getattr(p, key) for p in agents_ordered] for key in DECISION_TRAITS},
+            race_state
+        ).tolist()
+        if action_overrides and lap_num in action_overrides:
+            for idx, code in action_overrides[lap_num].items():
+                action_codes[idx] = code
+        if timer:
+            t = timer.lap("decisions", t, total_agents)
         
         # Simulate lap for each agent
-        for profile in agents_ordered:
-            aid = profile["id"]
-            state = dyn_state[aid]
-            
-            race_state = {
-                "laps_remaining": laps_remaining,
-                "weather": current_weather.value,
-                "leader_position": 1,
-                "total_agents": total_agents
-            }
-            
-            # Decide action
-            action = decide_action(state, profile, race_state)
+        for profile, state, code in zip(agents_ordered, states, action_codes):
+            action = ACTIONS[code]
+            state.prev_position = state.position
+            state.action = action
             
             # Handle pit stop
-            pit_time = 0.0
             if action == PIT:
-                pit_time = 22.0 + random.uniform(-1.5, 1.5)
-                lap_time = _simulate_lap_time(base_lap_time, "maintain", profile, 0.0) + pit_time
-                tyre_wear = 0.02  # Fresh tyres
-                dyn_state[aid]["tyre_age"] = 0
-                did_pit = True
+                state.pit_time = PIT_LOSS + rng.uniform(-PIT_LOSS_JITTER, PIT_LOSS_JITTER)
+                state.lap_time = _simulate_lap_time(base_lap_time, "maintain", profile, 0.0, rng) + state.pit_time
+                state.lap_wear = FRESH_TYRE_WEAR  # Fresh tyres
+                state.tyre_age = 0
+                state.did_pit = True
             else:
-                lap_time = _simulate_lap_time(base_lap_time, action, profile, state["tyre_wear"])
-                tyre_wear = _simulate_tyre_wear(state["tyre_wear"], action, profile)
-                did_pit = False
-            
-            lap_results.append({
-                "agent_id": aid,
-                "profile": profile,
-                "action": action,
-                "lap_time": lap_time,
-                "tyre_wear": tyre_wear,
-                "did_pit": did_pit,
-                "pit_time": pit_time
-            })
-        
-        # Sort by lap time to determine positions
-        lap_results.sort(key=lambda r: r["lap_time"])
+                state.pit_time = 0.0
+                state.lap_time = _simulate_lap_time(base_lap_time, action, profile, state.tyre_wear, rng)
+                state.lap_wear = _simulate_tyre_wear(state.tyre_wear, action, profile)
+                state.did_pit = False
+        if timer:
+            t = timer.lap("physics", t, total_agents)
         
-        # Calculate new positions
-        new_positions = {}
-        for position_index, res in enumerate(lap_results, start=1):
-            new_positions[res["agent_id"]] = position_index
+        # Sort by lap time to determine positions (agent indices, by new position)
+        order = sorted(range(total_agents), key=lambda i: states[i].lap_time)
+        if timer:
+            t = timer.lap("positions", t)
         
-        # Detect overtakes
-        overtakes = _detect_overtakes(lap_results, prev_positions, new_positions)
+        # Detect overtakes (every pairwise pass, capped per lap)
+        overtakes = ()
+        if emit_overtake:
+            overtakes = zip(*(
+                column.tolist() for column in detect_overtakes(
+                    order, [st.prev_position for st in states], max_overtakes, overtake_sampling
+                )
+            ))
+            if timer:
+                t = timer.lap("overtakes", t)
         
         # Process lap results and create events
-        for position_index, res in enumerate(lap_results, start=1):
-            aid = res["agent_id"]
-            profile = res["profile"]
-            action = res["action"]
-            lap_time = res["lap_time"]
-            tyre_wear = res["tyre_wear"]
-            did_pit = res["did_pit"]
-            
-            prev_position = prev_positions[aid]
-            position = position_index
-            position_change = prev_position - position
+        for position, idx in enumerate(order, start=1):
+            profile = agents_ordered[idx]
+            state = states[idx]
+            action = state.action
+            lap_time = state.lap_time
+            tyre_wear = state.lap_wear
+            did_pit = state.did_pit
+            position_change = state.prev_position - position
             
             # Update state
-            dyn_state[aid]["position"] = position
-            dyn_state[aid]["tyre_wear"] = tyre_wear
+            state.position = position
+            state.tyre_wear = tyre_wear
             if not did_pit:
-                dyn_state[aid]["tyre_age"] += 1
-            dyn_state[aid]["last_lap_time"] = lap_time
-            dyn_state[aid]["total_time"] += lap_time
-            if dyn_state[aid]["best_lap"] is None or lap_time < dyn_state[aid]["best_lap"]:
-                dyn_state[aid]["best_lap"] = lap_time
+                state.tyre_age += 1
+            state.last_lap_time = lap_time
+            state.total_time += lap_time
+            if state.best_lap is None or lap_time < state.best_lap:
+                state.best_lap = lap_time
             if did_pit:
-                dyn_state[aid]["pit_stops"] += 1
-                dyn_state[aid]["tyre_wear"] = 0.02  # Reset after pit
+                state.pit_stops += 1
+                state.tyre_wear = FRESH_TYRE_WEAR  # Reset after pit
+            
+            if columnar:
+                stamp = round(elapsed, 2)
+                if did_pit and emit_pit:
+                    append_row(
+                        event_cols["pit_stop"], lap_num, idx, round(state.pit_time, 2),
+                        position, "strategy" if profile.pit_bias > 0.5 else "tyre_wear",
+                        position_change, stamp
+                    )
+                code = ACTION_CODES.get(action, ACTION_CODES["maintain"])
+                if emit_lap:
+                    append_row(
+                        event_cols["lap_complete"], lap_num, idx, code, round(lap_time, 2), position,
+                        position_change, round(tyre_wear, 4), state.tyre_age, stamp
+                    )
+                if include_timeline:
+                    append_row(
+                        timeline_cols, lap_num, idx, position, round(lap_time, 2),
+                        round(tyre_wear * 100, 2), code
+                    )
+                elapsed += lap_time / total_agents
+                continue
             
             # Create pit stop event
-            if did_pit:
+            if did_pit and emit_pit:
                 pit_event = {
                     "event_type": "pit_stop",
-                    "agent_id": aid,
-                    "agent_name": profile.get("name", aid),
-                    "pit_stop_time": round(res.get("pit_time", 22.0), 2),
+                    "agent_id": profile.id,
+                    "agent_name": profile.name,
+                    "pit_stop_time": round(state.pit_time, 2),
                     "position": position,
-                    "pit_reason": "strategy" if profile.get("pit_bias", 0.5) > 0.5 else "tyre_wear",
+                    "pit_reason": "strategy" if profile.pit_bias > 0.5 else "tyre_wear",
                     "position_change": position_change,
                     "timestamp": round(elapsed, 2)
                 }
                 all_events.append(pit_event)
             
+            if not (emit_lap or include_timeline):
+                elapsed += lap_time / total_agents
+                continue
+            
             # Create lap complete event
             action_enum = _action_to_enum(action)
-            lap_event = {
-                "event_type": "lap_complete",
-                "agent_id": aid,
-                "agent_name": profile.get("name", aid),
-                "action": action_enum.value if isinstance(action_enum, ActionEnum) else action,
-                "lap_time": round(lap_time, 2),
-                "position": position,
-                "position_change": position_change,
-                "tyre_wear": round(tyre_wear, 4),
-                "tyre_age": dyn_state[aid]["tyre_age"],
-                "timestamp": round(elapsed, 2)
-            }
-            all_events.append(lap_event)
+            if emit_lap:
+                lap_event = {
+                    "event_type": "lap_complete",
+                    "agent_id": profile.id,
+                    "agent_name": profile.name,
+                    "action": action_enum.value if isinstance(action_enum, ActionEnum) else action,
+                    "lap_time": round(lap_time, 2),
+                    "position": position,
+                    "position_change": position_change,
+                    "tyre_wear": round(tyre_wear, 4),
+                    "tyre_age": state.tyre_age,
+                    "timestamp": round(elapsed, 2)
+                }
+                all_events.append(lap_event)
             
             # Create timeline entry
-            timeline_entry = {
-                "lap": lap_num,
-                "agent_id": aid,
-                "position": position,
-                "lap_time": round(lap_time, 2),
-                "tyre_wear": round(tyre_wear * 100, 2),  # Convert to percentage
-                "action": action_enum.value if isinstance(action_enum, ActionEnum) else action
-            }
-            timeline_entries.append(timeline_entry)
+            if include_timeline:
+                timeline_entry = {
+                    "lap": lap_num,
+                    "agent_id": profile.id,
+                    "position": position,
+                    "lap_time": round(lap_time, 2),
+                    "tyre_wear": round(tyre_wear * 100, 2),  # Convert to percentage
+                    "action": action_enum.value if isinstance(action_enum, ActionEnum) else action
+                }
+                timeline_entries.append(timeline_entry)
             
             elapsed += lap_time / total_agents
         
         # Create overtake events
-        for overtake in overtakes:
+        for idx, other_idx, position_before, position_after in overtakes:
+            if columnar:
+                append_row(
+                    event_cols["overtake"], lap_num, idx, other_idx,
+                    position_before, position_after, round(elapsed, 2)
+                )
+                continue
             overtake_event = {
                 "event_type": "overtake",
-                "agent_id": overtake["agent_id"],
-                "agent_name": overtake["agent_name"],
-                "overtaken_agent_id": overtake["overtaken_agent_id"],
-                "overtaken_agent_name": overtake["overtaken_agent_name"],
-                "overtake_success": overtake["success"],
-                "position_before": overtake["position_before"],
-                "position_after": overtake["position_after"],
+                "agent_id": agents_ordered[idx].id,
+                "agent_name": agents_ordered[idx].name,
+                "overtaken_agent_id": agents_ordered[other_idx].id,
+                "overtaken_agent_name": agents_ordered[other_idx].name,
+                "overtake_success": True,
+                "position_before": position_before,
+                "position_after": position_after,
                 "timestamp": round(elapsed, 2)
             }
             all_events.append(overtake_event)
+        if timer:
+            t = timer.lap("events", t, total_agents)
         
         # PRL updates
-        for res in lap_results:
-            aid = res["agent_id"]
-            profile = res["profile"]
-            state = dyn_state[aid]
-            
-            if lap_num == 1:
-                continue  # Skip PRL on first lap
-            
-            perf_data = {
-                "current_lap_time": res["lap_time"],
-                "best_lap_time": state.get("best_lap", res["lap_time"]),
-                "tyre_wear_increase": max(0.0, res["tyre_wear"] - (state.get("tyre_wear", 0.0) - 0.03)),
-                "expected_wear": 0.04,
-                "position_before": prev_positions.get(aid, state["position"]),
-                "position_after": state["position"],
-                "total_cars": total_agents,
-                "pitted_this_lap": res["did_pit"],
-                "lap_number": lap_num
-            }
-            
-            prl_result = update_traits_prl(
-                {
-                    "aggression": profile.get("aggression", 0.5),
-                    "tyre_management": profile.get("tyre_management", 0.6),
-                    "risk_taking": profile.get("risk_taking", profile.get("risk", 0.5)),
-                    "pit_bias": profile.get("pit_bias", 0.5)
-                },
-                perf_data,
-                learning_rate=profile.get("learning_rate", 0.02)
-            )
-            
-            # Update profile traits
-            trait_changes = prl_result.get("changes", {})
-            for key, delta in trait_changes.items():
-                new_val = float(profile.get(key, 0.5)) + float(delta)
-                profile[key] = max(0.0, min(1.0, new_val))
-            
-            prl_event = {
-                "event_type": "prl_update",
-                "agent_id": aid,
-                "agent_name": profile.get("name", aid),
-                "prl_reward": round(prl_result.get("reward_signal", 0.0), 3),
-                "trait_deltas": {
-                    "aggression": round(trait_changes.get("aggression", 0.0), 4),
-                    "tyre_management": round(trait_changes.get("tyre_management", 0.0), 4),
-                    "risk_taking": round(trait_changes.get("risk_taking", 0.0), 4),
-                    "pit_bias": round(trait_changes.get("pit_bias", 0.0), 4)
-                },
-                "timestamp": round(elapsed, 2)
-            }
-            all_events.append(prl_event)
+        if lap_num == 1:
+            continue  # Skip PRL on first lap
+        
+        # One batched update for the whole field (same values as update_traits_prl)
+        prl_result = update_traits_prl_batch(
+            {key: [getattr(p, key) for p in agents_ordered] for key in PRL_TRAIT_KEYS},
+            [st.lap_time for st in states],
+            [st.best_lap for st in states],
+            [max(0.0, st.lap_wear - (st.tyre_wear - BASE_TYRE_WEAR)) for st in states],
+            [st.prev_position for st in states],
+            [st.position for st in states],
+            total_agents,
+            [st.did_pit for st in states],
+            PRL_EXPECTED_WEAR,
+            [p.learning_rate for p in agents_ordered],
+        )
+        rewards = prl_result["reward_signal"].tolist()
+        trait_changes = {key: delta.tolist() for key, delta in prl_result["changes"].items()}
+        
+        # Update profile traits
+        for key, deltas in trait_changes.items():
+            for profile, delta in zip(agents_ordered, deltas):
+                new_val = getattr(profile, key) + delta
+                setattr(profile, key, max(0.0, min(1.0, new_val)))
+        
+        if emit_prl:
+            for idx in order:
+                profile = agents_ordered[idx]
+                
+                if columnar:
+                    append_row(
+                        event_cols["prl_update"], lap_num, idx,
+                        round(rewards[idx], 3),
+                        round(trait_changes["aggression"][idx], 4),
+                        round(trait_changes["tyre_management"][idx], 4),
+                        round(trait_changes["risk_taking"][idx], 4),
+                        round(trait_changes["pit_bias"][idx], 4),
+                        round(elapsed, 2)
+                    )
+                    continue
+                
+                prl_event = {
+                    "event_type": "prl_update",
+                    "agent_id": profile.id,
+                    "agent_name": profile.name,
+                    "prl_reward": round(rewards[idx], 3),
+                    "trait_deltas": {
+                        "aggression": round(trait_changes["aggression"][idx], 4),
+                        "tyre_management": round(trait_changes["tyre_management"][idx], 4),
+                        "risk_taking": round(trait_changes["risk_taking"][idx], 4),
+                        "pit_bias": round(trait_changes["pit_bias"][idx], 4)
+                    },
+                    "timestamp": round(elapsed, 2)
+                }
+                all_events.append(prl_event)
+        if timer:
+            timer.lap("prl", t, total_agents)
     
     # Calculate summary
-    fastest_lap = min((dyn_state[aid]["best_lap"] for aid in dyn_state if dyn_state[aid]["best_lap"]), default=0.0)
-    avg_tyre_wear = sum(dyn_state[aid]["tyre_wear"] for aid in dyn_state) / total_agents
-    pit_stops = {aid: dyn_state[aid]["pit_stops"] for aid in dyn_state}
+    if timer:
+        t = perf_counter()
+    fastest_lap = min((st.best_lap for st in states if st.best_lap), default=0.0)
+    avg_tyre_wear = sum(st.tyre_wear for st in states) / total_agents
+    pit_stops = {p.id: st.pit_stops for p, st in zip(agents_ordered, states)}
     
     # Winner is agent with lowest total time
-    winner_id = min(dyn_state.keys(), key=lambda aid: dyn_state[aid]["total_time"])
-    winner_name = next((p["name"] for p in agents_ordered if p["id"] == winner_id), winner_id)
+    by_total_time = sorted(range(total_agents), key=lambda i: states[i].total_time)
+    winner_name = agents_ordered[by_total_time[0]].name
+    finishing_order = [agents_ordered[i].id for i in by_total_time]
     
     summary = {
         "fastest_lap": round(fastest_lap, 2),
         "avg_tyre_wear": round(avg_tyre_wear * 100, 2),  # Convert to percentage
         "pit_stops": pit_stops,
-        "winner": winner_name
+        "winner": winner_name,
+        "finishing_order": finishing_order
     }
     
-    return {
-        "timeline": timeline_entries,
-        "summary": summary,
-        "events": all_events  # Include all events for frontend
-    }
+    if columnar:
+        result = columnar_result(agents_ordered, timeline_cols, summary, event_cols)
+    else:
+        result = {
+            "timeline": timeline_entries,
+            "summary": summary,
+            "events": all_events  # Include all events for frontend
+        }
+    
+    if snapshot_laps is not None:
+        result["snapshots"] = snapshots
+    
+    if timer:
+        timer.lap("summary", t)
+        result["metadata"] = finish_timing(
+            timer, engine=engine, agents=total_agents, laps=total_laps
+        )
+    return result
+
+
+def resume_simulation(snapshot: RaceSnapshot, **options) -> Dict[str, Any]:
+    """
+    Continue a race from a RaceSnapshot (taken with run_simulation's
+    snapshot_laps). Runs laps snapshot.lap+1 .. total_laps with the snapshot's
+    engine; `options` are the other run_simulation keyword arguments (layout,
+    outputs, snapshot_laps, ...). The timeline and events cover only the
+    resumed laps; the summary covers the whole race.
+    """
+    return run_simulation(
+        snapshot.race_params, [], engine=snapshot.engine, resume_from=snapshot, **options
+    )
@@ -0,0 +1,235 @@
+# backend/services/snapshots.py
+"""
+Race state snapshots for resuming a simulation part-way through.
+
+Exposes:
+ - RaceSnapshot: complete race state after `lap` laps, array-packed
+     to_bytes() / RaceSnapshot.from_bytes(raw): NumPy .npz encoding
+     nbytes: in-memory size of the packed arrays
+ - capture_python / restore_python: for the per-agent runner (AgentProfile,
+   AgentState lists, random.Random)
+ - capture_vector / restore_vector: for the numpy engine (column arrays,
+   numpy Generator)
+ - snapshot_profiles(snapshot) -> AgentProfile list with the learned traits
+ - with_traits(snapshot, {agent index: {trait: value}}) -> copy with edited profiles
+
+Packing:
+ - profiles: float64 (agents x PROFILE_COLUMNS), learned traits included
+ - state: float64 (agents x STATE_COLUMNS); NaN marks "not set yet"
+   (best_lap / last_lap_time before the first lap)
+ - rng: the python engine's Mersenne Twister words as one uint32 array, or
+   the numpy engine's bit generator state
+ - weather, elapsed time, laps completed and race params as scalars
+
+A snapshot taken after lap k and resumed with the same engine reproduces
+laps k+1.. of the uninterrupted run exactly.
+"""
+
+from dataclasses import dataclass, replace
+import io
+import json
+import random
+from typing import Any, Dict, List
+
+import numpy as np
+
+from models.state import AgentProfile, AgentState
+
+PROFILE_COLUMNS = (
+    "aggression", "risk", "risk_taking", "tyre_management", "pit_bias",
+    "weather_sensitivity", "learning_rate",
+)
+STATE_COLUMNS = (
+    "position", "tyre_wear", "tyre_age", "pit_next", "gap_ahead",
+    "last_lap_time", "best_lap", "pit_stops", "total_time",
+)
+_COL = {name: i for i, name in enumerate(STATE_COLUMNS)}
+
+
+@dataclass(slots=True)
+class RaceSnapshot:
+    engine: str
+    lap: int  # laps completed
+    race_params: Dict[str, Any]
+    agent_ids: List[str]
+    agent_names: List[str]
+    profiles: np.ndarray
+    state: np.ndarray
+    weather: str
+    elapsed: float
+    rng_state: Any  # python: (version, uint32 words, gauss_next); numpy: bit generator state dict
+
+    @property
+    def nbytes(self) -> int:
+        words = self.rng_state[1].nbytes if self.engine == "python" else 0
+        return self.profiles.nbytes + self.state.nbytes + words
+
+    def to_bytes(self) -> bytes:
+        meta = {
+            "engine": self.engine,
+            "lap": self.lap,
+            "race_params": self.race_params,
+            "agent_ids": self.agent_ids,
+            "agent_names": self.agent_names,
+            "weather": self.weather,
+            "elapsed": self.elapsed,
+        }
+        arrays = {"profiles": self.profiles, "state": self.state}
+        if self.engine == "python":
+            version, words, gauss_next = self.rng_state
+            meta["rng"] = {"version": version, "gauss_next": gauss_next}
+            arrays["rng_words"] = words
+        else:
+            meta["rng"] = self.rng_state
+        buffer = io.BytesIO()
+        np.savez(buffer, meta=np.array(json.dumps(meta)), **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "RaceSnapshot":
+        with np.load(io.BytesIO(raw)) as archive:
+            meta = json.loads(str(archive["meta"]))
+            if meta["engine"] == "python":
+                rng_state = (meta["rng"]["version"], archive["rng_words"], meta["rng"]["gauss_next"])
+            else:
+                rng_state = meta["rng"]
+            return cls(
+                engine=meta["engine"],
+                lap=meta["lap"],
+                race_params=meta["race_params"],
+                agent_ids=meta["agent_ids"],
+                agent_names=meta["agent_names"],
+                profiles=archive["profiles"],
+                state=archive["state"],
+                weather=meta["weather"],
+                elapsed=meta["elapsed"],
+                rng_state=rng_state,
+            )
+
+
+def with_traits(snapshot: RaceSnapshot, changes: Dict[int, Dict[str, float]]) -> RaceSnapshot:
+    """
+    Copy of `snapshot` with some profile values replaced. Only the profile
+    matrix is copied; state and RNG are shared (restoring copies them anyway).
+    """
+    if not changes:
+        return snapshot
+    profiles = snapshot.profiles.copy()
+    for idx, traits in changes.items():
+        for key, value in traits.items():
+            profiles[idx, PROFILE_COLUMNS.index(key)] = value
+    return replace(snapshot, profiles=profiles)
+
+
+def _none_to_nan(value):
+    return np.nan if value is None else value
+
+
+def _nan_to_none(value: float):
+    return None if np.isnan(value) else value
+
+
+# ---------------- per-agent runner ---------------- #
+
+def capture_python(
+    lap: int,
+    race_params: Dict[str, Any],
+    profiles: List[AgentProfile],
+    states: List[AgentState],
+    weather: str,
+    elapsed: float,
+    rng: random.Random,
+) -> RaceSnapshot:
+    version, words, gauss_next = rng.getstate()
+    return RaceSnapshot(
+        engine="python",
+        lap=lap,
+        race_params=dict(race_params),
+        agent_ids=[p.id for p in profiles],
+        agent_names=[p.name for p in profiles],
+        profiles=np.array([[getattr(p, key) for key in PROFILE_COLUMNS] for p in profiles], dtype=float),
+        state=np.array(
+            [[_none_to_nan(getattr(st, key)) for key in STATE_COLUMNS] for st in states], dtype=float
+        ),
+        weather=weather,
+        elapsed=elapsed,
+        rng_state=(version, np.array(words, dtype=np.uint32), gauss_next),
+    )
+
+
+def snapshot_profiles(snapshot: RaceSnapshot) -> List[AgentProfile]:
+    """The snapshot's profiles, learned traits included."""
+    return [
+        AgentProfile(id=aid, name=name, **dict(zip(PROFILE_COLUMNS, row)))
+        for aid, name, row in zip(snapshot.agent_ids, snapshot.agent_names, snapshot.profiles.tolist())
+    ]
+
+
+def restore_python(snapshot: RaceSnapshot):
+    """(profiles, states, weather, elapsed, rng) for simulation_runner."""
+    profiles = snapshot_profiles(snapshot)
+    states = []
+    for row in snapshot.state.tolist():
+        values = dict(zip(STATE_COLUMNS, row))
+        states.append(AgentState(
+            position=int(values["position"]),
+            tyre_wear=values["tyre_wear"],
+            tyre_age=int(values["tyre_age"]),
+            pit_next=bool(values["pit_next"]),
+            gap_ahead=values["gap_ahead"],
+            last_lap_time=_nan_to_none(values["last_lap_time"]),
+            best_lap=_nan_to_none(values["best_lap"]),
+            pit_stops=int(values["pit_stops"]),
+            total_time=values["total_time"],
+        ))
+    version, words, gauss_next = snapshot.rng_state
+    rng = random.Random()
+    rng.setstate((version, tuple(int(w) for w in words), gauss_next))
+    return profiles, states, snapshot.weather, snapshot.elapsed, rng
+
+
+# ---------------- numpy engine ---------------- #
+
+def capture_vector(
+    lap: int,
+    race_params: Dict[str, Any],
+    ids: List[str],
+    names: List[str],
+    profile_columns: Dict[str, np.ndarray],
+    state_columns: Dict[str, np.ndarray],
+    weather: str,
+    elapsed: float,
+    rng: np.random.Generator,
+) -> RaceSnapshot:
+    """profile_columns / state_columns: arrays keyed by column name; missing state columns take AgentState defaults."""
+    n = len(ids)
+    state = np.empty((n, len(STATE_COLUMNS)))
+    defaults = AgentState(position=0)
+    for i, key in enumerate(STATE_COLUMNS):
+        state[:, i] = state_columns[key] if key in state_columns else _none_to_nan(getattr(defaults, key))
+    best = state[:, _COL["best_lap"]]
+    best[np.isinf(best)] = np.nan  # the engine marks "no lap yet" with inf
+    return RaceSnapshot(
+        engine="numpy",
+        lap=lap,
+        race_params=dict(race_params),
+        agent_ids=list(ids),
+        agent_names=list(names),
+        profiles=np.column_stack([profile_columns[key] for key in PROFILE_COLUMNS]).astype(float),
+        state=state,
+        weather=weather,
+        elapsed=elapsed,
+        rng_state=rng.bit_generator.state,
+    )
+
+
+def restore_vector(snapshot: RaceSnapshot):
+    """(profiles, state columns, weather, elapsed, rng) for vector_engine."""
+    state_columns = {key: snapshot.state[:, i].copy() for i, key in enumerate(STATE_COLUMNS)}
+    for key in ("position", "tyre_age", "pit_stops"):
+        state_columns[key] = state_columns[key].astype(np.int64)
+    best = state_columns["best_lap"]
+    best[np.isnan(best)] = np.inf
+    rng = np.random.default_rng()
+    rng.bit_generator.state = snapshot.rng_state
+    return snapshot_profiles(snapshot), state_columns, snapshot.weather, snapshot.elapsed, rng
@@ -0,0 +1,292 @@
+# backend/services/strategy.py
+"""
+Pit-strategy optimizer for one agent.
+
+Exposes:
+ - optimize_strategy(race_params, agent_settings, agent_id, ...) -> Dict of ranked strategies
+ - candidate_plans(total_laps, stops, min_stint) -> list of pit-lap arrays
+ - MAX_CANDIDATES, MAX_ENUMERATED, MAX_STOPS
+
+Model:
+ - a strategy is the set of laps the agent pits on; every other lap is driven
+   at one fixed `pace` action
+ - lap times and tyre wear follow run_simulation's models (_expected_lap_time,
+   _simulate_tyre_wear, PIT_LOSS / PIT_LOSS_JITTER, FRESH_TYRE_WEAR): a pit
+   lap is a "maintain" lap on new tyres plus the pit loss, and the next lap
+   starts on FRESH_TYRE_WEAR
+ - Monte Carlo samples draw the lap noise and pit-loss jitter; lap times only
+   depend on the agent's own tyres, so the rest of the field is not simulated
+
+Search (successive halving):
+ - optionally, `prescreen` keeps only the best candidates by noise-free race
+   time (services.surrogate) before any sampling; searches enumerating more
+   than MAX_CANDIDATES pit-lap sets are always prescreened down to it
+ - every candidate first gets `initial_samples` samples
+ - each round the better half by mean total time survives (never fewer than
+   `top_k`) and the sample count doubles, up to `max_samples`; earlier samples
+   are kept, so a round only draws the new ones
+ - candidates are evaluated in fixed-size chunks, each with its own child
+   seed, on the ensemble process pool; results do not depend on `workers`
+ - returned strategies carry mean, standard deviation and a 95% normal
+   confidence interval of the agent's race time
+"""
+
+from itertools import combinations
+from math import comb
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.agent_logic import ACTIONS, MAINTAIN, PIT
+from services.process_pool import get_pool, pool_workers
+from services.rng import spawn_seeds
+from services.race_model import (
+    BASE_LAP_TIME, FRESH_TYRE_WEAR, LAP_TIME_NOISE, MIN_LAP_TIME, PIT_LOSS, PIT_LOSS_JITTER,
+)
+from services.simulation_runner import _build_profiles, _expected_lap_time, _simulate_tyre_wear
+from services.surrogate import expected_race_time, pit_plan
+
+MAX_STOPS = 3
+MAX_CANDIDATES = 50_000  # candidates entering the Monte Carlo rounds
+MAX_ENUMERATED = 2_000_000  # pit-lap sets scored by the surrogate
+
+# Lap draws per evaluation chunk (candidates x new samples x laps)
+CHUNK_ELEMENTS = 1 << 20
+
+Z_95 = 1.96
+
+
+def candidate_plans(total_laps: int, stops: Sequence[int], min_stint: int = 1) -> List[np.ndarray]:
+    """
+    Every pit-lap set with a stop count in `stops` whose stints (before the
+    first pit, between pits and after the last) are at least `min_stint` laps.
+    Returns one (plans x stops) int array of 1-based laps per stop count.
+    """
+    plans = []
+    for k in sorted(set(stops)):
+        if not 1 <= k <= MAX_STOPS:
+            raise ValueError(f"stops must be between 1 and {MAX_STOPS}")
+        # Shrink each gap by min_stint - 1 so plain combinations enumerate exactly the valid sets
+        span = total_laps - 2 * min_stint - (k - 1) * (min_stint - 1)
+        if span < k:
+            plans.append(np.empty((0, k), dtype=np.int64))
+            continue
+        chosen = np.array(list(combinations(range(span), k)), dtype=np.int64).reshape(-1, k)
+        plans.append(chosen + np.arange(k) * (min_stint - 1) + min_stint + 1)
+    return plans
+
+
+def _count_plans(total_laps: int, stops: Sequence[int], min_stint: int) -> int:
+    count = 0
+    for k in set(stops):
+        span = total_laps - 2 * min_stint - (k - 1) * (min_stint - 1)
+        count += comb(span, k) if span >= k else 0
+    return count
+
+
+def _stint_laps(profile, pace: str, start_wear: float, total_laps: int) -> np.ndarray:
+    """Noise-free lap time for each lap of a stint starting on `start_wear` tyres."""
+    times = np.empty(total_laps)
+    wear = start_wear
+    for age in range(total_laps):
+        times[age] = _expected_lap_time(BASE_LAP_TIME, pace, profile, wear)
+        wear = _simulate_tyre_wear(wear, pace, profile)
+    return times
+
+
+def _plan_laps(pit_laps: np.ndarray, first_stint: np.ndarray, fresh_stint: np.ndarray, pit_lap: float) -> np.ndarray:
+    """(plans x stops) pit laps -> (plans x laps) noise-free lap times."""
+    total_laps = len(first_stint)
+    lap_idx = np.arange(total_laps)
+    is_pit = np.zeros((len(pit_laps), total_laps), dtype=bool)
+    np.put_along_axis(is_pit, pit_laps - 1, True, axis=1)
+    # Index of the most recent pit lap (-1 before the first stop)
+    last_pit = np.maximum.accumulate(np.where(is_pit, lap_idx, -1), axis=1)
+    laps = np.where(
+        last_pit < 0,
+        first_stint[lap_idx],
+        fresh_stint[np.maximum(lap_idx - last_pit - 1, 0)],
+    )
+    laps[is_pit] = pit_lap
+    return laps
+
+
+def _keep_best(scores: List[np.ndarray], alive: List[np.ndarray], keep: int) -> List[np.ndarray]:
+    """The `keep` lowest-scoring candidates; scores[g][i] belongs to alive[g][i]."""
+    flat = np.concatenate(alive)
+    owner = np.concatenate([np.full(len(a), g) for g, a in enumerate(alive)])
+    best = np.argsort(np.concatenate(scores), kind="stable")[:keep]
+    return [np.sort(flat[best[owner[best] == g]]) for g in range(len(alive))]
+
+
+def _expected_totals(profile, plans: np.ndarray, total_laps: int, pace: str) -> np.ndarray:
+    """Noise-free race time of every plan (services.surrogate), in bounded chunks."""
+    per_chunk = max(1, CHUNK_ELEMENTS // total_laps)
+    return np.concatenate([
+        expected_race_time(profile, pit_plan(total_laps, plans[start:start + per_chunk], pace))
+        for start in range(0, len(plans), per_chunk)
+    ])
+
+
+def _evaluate(pit_laps: np.ndarray, first_stint: np.ndarray, fresh_stint: np.ndarray,
+              pit_lap: float, samples: int, seed: int) -> tuple:
+    """
+    Worker entry point: `samples` race times for each plan in one chunk.
+    Returns (sum, sum of squares) per plan.
+    """
+    rng = np.random.default_rng(seed)
+    expected = _plan_laps(pit_laps, first_stint, fresh_stint, pit_lap)
+    n_plans, total_laps = expected.shape
+    noise = rng.uniform(-LAP_TIME_NOISE, LAP_TIME_NOISE, (n_plans, samples, total_laps))
+    laps = np.maximum(MIN_LAP_TIME, np.round(expected[:, None, :] + noise, 2))
+    stops = pit_laps.shape[1]
+    jitter = rng.uniform(-PIT_LOSS_JITTER, PIT_LOSS_JITTER, (n_plans, samples, stops))
+    totals = laps.sum(axis=2) + stops * PIT_LOSS + jitter.sum(axis=2)
+    return totals.sum(axis=1), np.square(totals).sum(axis=1)
+
+
+def optimize_strategy(
+    race_params: Dict[str, Any],
+    agent_settings: List[Dict[str, Any]],
+    agent_id: str,
+    stops: Sequence[int] = (1, 2, 3),
+    min_stint: int = 1,
+    pace: str = MAINTAIN,
+    top_k: int = 5,
+    initial_samples: int = 8,
+    max_samples: int = 512,
+    prescreen: Optional[int] = None,
+    seed: int | None = None,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Rank pit-lap sets for `agent_id` by expected race time.
+
+    Args:
+        race_params / agent_settings / seed: as for run_simulation
+        agent_id: the agent whose strategy is optimized
+        stops: stop counts to search (each 1..MAX_STOPS)
+        min_stint: shortest allowed stint, in laps
+        pace: action driven on every non-pit lap
+        top_k: strategies returned
+        initial_samples / max_samples: Monte Carlo samples in the first / last round
+        prescreen: if set, only the best `prescreen` candidates by the
+            noise-free surrogate (services.surrogate) enter the Monte Carlo rounds;
+            capped at (and defaulting to, for bigger searches) MAX_CANDIDATES
+        workers: evaluation parallelism (1 runs inline); defaults to the pool size
+
+    Returns:
+        {
+            "agent_id": str,
+            "candidates": int,                 # pit-lap sets searched
+            "prescreened": int | None,         # candidates kept by the surrogate
+            "evaluations": int,                # race samples drawn in total
+            "rounds": [{"candidates": int, "samples": int}],
+            "strategies": [{
+                "pit_laps": [int], "stops": int, "samples": int,
+                "mean_time": float, "std": float, "ci95": [low, high]
+            }]                                 # best first
+        }
+    """
+    total_laps = race_params.get("total_laps", 50)
+    if pace not in ACTIONS or pace == PIT:
+        raise ValueError(f"pace must be one of {[a for a in ACTIONS if a != PIT]}")
+    if not stops or any(not 1 <= k <= MAX_STOPS for k in stops):
+        raise ValueError(f"stops must be between 1 and {MAX_STOPS}")
+    if min_stint < 1:
+        raise ValueError("min_stint must be at least 1")
+    if not 1 <= initial_samples <= max_samples:
+        raise ValueError("initial_samples must be between 1 and max_samples")
+
+    profiles = _build_profiles(agent_settings)
+    profile = next((p for p in profiles if p.id == agent_id), None)
+    if profile is None:
+        raise ValueError(f"unknown agent_id {agent_id!r}")
+
+    count = _count_plans(total_laps, stops, min_stint)
+    if count > MAX_ENUMERATED:
+        raise ValueError(
+            f"{count} candidate strategies exceed the limit of {MAX_ENUMERATED}; "
+            "raise min_stint or search fewer stop counts"
+        )
+    if count == 0:
+        raise ValueError("no pit strategy fits the race with this min_stint")
+    if count > MAX_CANDIDATES:
+        prescreen = min(prescreen or MAX_CANDIDATES, MAX_CANDIDATES)
+
+    first_stint = _stint_laps(profile, pace, 0.0, total_laps)
+    fresh_stint = _stint_laps(profile, pace, FRESH_TYRE_WEAR, total_laps)
+    pit_lap = _expected_lap_time(BASE_LAP_TIME, MAINTAIN, profile, 0.0)
+
+    # Candidates are grouped by stop count (pit-lap arrays share a width)
+    groups = [plans for plans in candidate_plans(total_laps, stops, min_stint) if len(plans)]
+    sums = [np.zeros(len(plans)) for plans in groups]
+    squares = [np.zeros(len(plans)) for plans in groups]
+    alive = [np.arange(len(plans)) for plans in groups]
+    if prescreen is not None and prescreen < count:
+        expected = [_expected_totals(profile, plans, total_laps, pace) for plans in groups]
+        alive = _keep_best(expected, alive, max(prescreen, top_k))
+
+    workers = workers or pool_workers()
+    executor = get_pool() if workers > 1 else None
+    rounds = []
+    drawn = evaluations = 0
+    target = initial_samples
+    round_seeds = iter(spawn_seeds(seed, 64))
+    while True:
+        # Draw the samples each surviving candidate is missing
+        new = target - drawn
+        tasks = []
+        for g, plans in enumerate(groups):
+            per_chunk = max(1, CHUNK_ELEMENTS // (new * total_laps))
+            for start in range(0, len(alive[g]), per_chunk):
+                tasks.append((g, alive[g][start:start + per_chunk]))
+        seeds = spawn_seeds(next(round_seeds), len(tasks))
+        args = [
+            (groups[g][idx], first_stint, fresh_stint, pit_lap, new, s)
+            for (g, idx), s in zip(tasks, seeds)
+        ]
+        if executor is None or len(args) == 1:
+            outcomes = [_evaluate(*a) for a in args]
+        else:
+            outcomes = [f.result() for f in [executor.submit(_evaluate, *a) for a in args]]
+        for (g, idx), (total, square) in zip(tasks, outcomes):
+            sums[g][idx] += total
+            squares[g][idx] += square
+        drawn = target
+        survivors = sum(len(a) for a in alive)
+        evaluations += survivors * new
+        rounds.append({"candidates": survivors, "samples": drawn})
+
+        if survivors <= top_k or drawn >= max_samples:
+            break
+        # Keep the better half by mean race time
+        keep = max(top_k, (survivors + 1) // 2)
+        alive = _keep_best([sums[g][a] / drawn for g, a in enumerate(alive)], alive, keep)
+        target = min(max_samples, drawn * 2)
+
+    ranked = []
+    for g, idx in enumerate(alive):
+        mean = sums[g][idx] / drawn
+        var = np.maximum(squares[g][idx] / drawn - mean ** 2, 0.0) * drawn / max(drawn - 1, 1)
+        std = np.sqrt(var)
+        half = Z_95 * std / np.sqrt(drawn)
+        for plan, m, sd, h in zip(groups[g][idx].tolist(), mean.tolist(), std.tolist(), half.tolist()):
+            ranked.append({
+                "pit_laps": plan,
+                "stops": len(plan),
+                "samples": drawn,
+                "mean_time": round(m, 3),
+                "std": round(sd, 3),
+                "ci95": [round(m - h, 3), round(m + h, 3)],
+            })
+    ranked.sort(key=lambda s: s["mean_time"])
+
+    return {
+        "agent_id": agent_id,
+        "candidates": count,
+        "prescreened": rounds[0]["candidates"] if prescreen is not None else None,
+        "evaluations": evaluations,
+        "rounds": rounds,
+        "strategies": ranked[:top_k],
+    }
@@ -0,0 +1,103 @@
+# backend/services/surrogate.py
+"""
+Deterministic expected-value evaluator for action / pit plans.
+
+Exposes:
+ - expected_lap_times(profile, plans, start_wear) -> (plans x laps) lap times
+ - expected_race_time(profile, plans, start_wear) -> race time per plan
+ - pit_plan(total_laps, pit_laps, pace) -> action-code plan(s)
+ - plan_codes(plan) -> action codes from names or codes
+
+A plan is one action per lap (agent_logic action names or ACTION_CODES),
+pits included; a batch is a (plans x laps) array. Plans are scored for one
+agent profile (AgentProfile, or a dict as for decide_action).
+
+Model (services.race_model, as in simulation_runner / vector_engine):
+ - random terms are replaced by their expectations: lap noise and pit-loss
+   jitter are zero-mean, so a pit costs PIT_LOSS; weather changes only move
+   decisions, and a plan fixes every decision, so weather drops out
+ - tyre wear within a stint is the cumulative sum of per-lap wear, capped at
+   1.0; a pit lap is a "maintain" lap on new tyres and the next lap starts on
+   FRESH_TYRE_WEAR
+ - whole batches are computed with array operations over plans and laps (no
+   per-lap loop)
+
+The stochastic engines round wear to 4 decimals and lap times to 2 after
+every lap; the surrogate does not, so its race times differ from the
+noise-free engine by a few hundredths of a second over a race.
+"""
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from models.state import AgentProfile
+from services.agent_logic import ACTION_CODES, A_PIT, MAINTAIN
+from services.race_model import (
+    BASE_LAP_TIME, BASE_TYRE_WEAR, FRESH_TYRE_WEAR, MIN_LAP_TIME, PIT_LOSS, TYRE_PENALTY_SCALE,
+    ACTION_LAP_OFFSET, ACTION_LAP_AGGRESSION, ACTION_WEAR_MULT,
+)
+
+
+def plan_codes(plan: Any) -> np.ndarray:
+    """Action names or codes (one plan or a batch) -> int action-code array."""
+    codes = np.asarray(plan)
+    if codes.dtype.kind in "US":
+        unknown = set(codes.ravel().tolist()).difference(ACTION_CODES)
+        if unknown:
+            raise ValueError(f"unknown actions {sorted(unknown)}")
+        codes = np.vectorize(ACTION_CODES.__getitem__, otypes=[np.int64])(codes)
+    codes = codes.astype(np.int64, copy=False)
+    if codes.size and not (0 <= codes.min() and codes.max() < len(ACTION_CODES)):
+        raise ValueError("action codes must index agent_logic.ACTIONS")
+    return codes
+
+
+def pit_plan(total_laps: int, pit_laps: Sequence[int] | np.ndarray, pace: str = MAINTAIN) -> np.ndarray:
+    """
+    Plan that drives `pace` on every lap and pits on `pit_laps` (1-based).
+    A (plans x stops) array of pit laps gives a (plans x laps) batch.
+    """
+    pits = np.asarray(pit_laps, dtype=np.int64)
+    if pits.size and not (1 <= pits.min() and pits.max() <= total_laps):
+        raise ValueError(f"pit laps must be in [1, {total_laps}]")
+    batch = np.atleast_2d(pits)
+    plans = np.full((len(batch), total_laps), ACTION_CODES[pace], dtype=np.int64)
+    np.put_along_axis(plans, batch - 1, A_PIT, axis=1)
+    return plans if pits.ndim == 2 else plans[0]
+
+
+def expected_lap_times(profile: AgentProfile | Dict[str, Any], plans: Any, start_wear: float = 0.0) -> np.ndarray:
+    """
+    Expected lap time of every lap of every plan, pit loss included on pit laps.
+    Returns an array shaped like the plan(s).
+    """
+    if isinstance(profile, dict):
+        profile = AgentProfile.from_dict(profile)
+    codes = plan_codes(plans)
+    batch = np.atleast_2d(codes)
+    is_pit = batch == A_PIT
+
+    # Wear gained on each lap; zero on pit laps, whose wear is reset instead
+    gain = BASE_TYRE_WEAR * ACTION_WEAR_MULT[batch] * (1.0 - 0.4 * profile.tyre_management)
+    gain[is_pit] = 0.0
+    accrued = np.cumsum(gain, axis=1) - gain  # wear gained before each lap
+
+    # Start of the current stint: the last pit lap (-1 = race start)
+    lap_idx = np.arange(batch.shape[1])
+    last_pit = np.maximum.accumulate(np.where(is_pit, lap_idx, -1), axis=1)
+    stint_start = np.take_along_axis(accrued, np.maximum(last_pit, 0), axis=1)
+    wear = np.where(last_pit < 0, start_wear + accrued, FRESH_TYRE_WEAR + accrued - stint_start)
+    wear = np.minimum(wear, 1.0)
+    wear[is_pit] = 0.0
+
+    modifier = ACTION_LAP_OFFSET[batch] + profile.aggression * ACTION_LAP_AGGRESSION[batch]
+    laps = np.maximum(MIN_LAP_TIME, BASE_LAP_TIME + modifier + wear ** 1.5 * TYRE_PENALTY_SCALE)
+    laps[is_pit] += PIT_LOSS
+    return laps.reshape(codes.shape)
+
+
+def expected_race_time(profile: AgentProfile | Dict[str, Any], plans: Any, start_wear: float = 0.0) -> np.ndarray | float:
+    """Expected total race time per plan (a float for a single plan)."""
+    totals = expected_lap_times(profile, plans, start_wear).sum(axis=-1)
+    return float(totals) if np.ndim(totals) == 0 else totals
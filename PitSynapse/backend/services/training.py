@@ -0,0 +1,179 @@
+# backend/services/training.py
+"""
+Multi-race PRL training: seasons of races that carry learned traits forward.
+
+Exposes:
+ - train_profiles(race_params, agent_settings, races, seeds, seed, engine, workers, store, name) -> Dict
+ - TRAINED_TRAITS
+
+Behavior:
+ - a season is `races` consecutive races of the same field; every race
+   starts from the traits the previous one ended with (PRL updates
+   accumulate instead of resetting with each run_simulation call)
+ - `seeds` independent seasons run in parallel on the ensemble process pool;
+   season i draws its race seeds from child stream i of the root seed, so
+   seeded training is reproducible for any worker count
+ - the learned profile of each agent is the mean over seasons of its final
+   traits; the spread (standard deviation) over seasons is reported with it
+ - with a ProfileStore, every learned profile is saved under
+   "<name or training id>.<agent id>", which /api/simulate agents can then
+   reference with `profile_id`
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+import uuid
+
+import numpy as np
+
+from prl_system import PRL_TRAIT_KEYS
+from services.process_pool import get_pool, pool_workers
+from services.profile_store import ProfileStore, PROFILE_ID_PATTERN
+from services.result_cache import cache_key
+from services.rng import spawn_seeds
+from services.simulation_runner import run_simulation, _build_profiles, ENGINE_VERSION
+from services.snapshots import PROFILE_COLUMNS
+
+# Traits PRL changes (the rest of a profile is carried unchanged)
+TRAINED_TRAITS = PRL_TRAIT_KEYS
+
+
+def _carried_settings(agent_ids: List[str], agent_names: List[str], profiles: np.ndarray) -> List[Dict[str, Any]]:
+    """Agent settings that rebuild exactly the given profile rows (learned traits included)."""
+    return [
+        {"id": aid, "name": name, **dict(zip(PROFILE_COLUMNS, row))}
+        for aid, name, row in zip(agent_ids, agent_names, profiles.tolist())
+    ]
+
+
+def _run_season(
+    race_params: Dict[str, Any],
+    agent_settings: List[Dict[str, Any]],
+    race_seeds: List[int],
+    engine: str
+) -> Dict[str, Any]:
+    """
+    Worker entry point: one season. Returns the final profile matrix
+    (agents x PROFILE_COLUMNS) and each race's finishing positions (0 = P1).
+    """
+    total_laps = race_params.get("total_laps", 50)
+    settings = agent_settings
+    positions = []
+    for race_seed in race_seeds:
+        result = run_simulation(
+            race_params, settings, seed=race_seed, engine=engine,
+            include_timeline=False, event_types=(), snapshot_laps=[total_laps],
+        )
+        final = result["snapshots"][0]
+        rank = {aid: pos for pos, aid in enumerate(result["summary"]["finishing_order"])}
+        positions.append([rank[aid] for aid in final.agent_ids])
+        settings = _carried_settings(final.agent_ids, final.agent_names, final.profiles)
+    return {"profiles": final.profiles, "positions": positions}
+
+
+def train_profiles(
+    race_params: Dict[str, Any],
+    agent_settings: List[Dict[str, Any]],
+    races: int,
+    seeds: int = 1,
+    seed: int | None = None,
+    engine: str = "python",
+    workers: Optional[int] = None,
+    store: Optional[ProfileStore] = None,
+    name: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Train the field's personalities over `seeds` seasons of `races` races.
+
+    Args:
+        race_params / agent_settings / engine: as for run_simulation
+        races: races per season (traits carry over between them)
+        seeds: independent seasons, averaged into the learned profiles
+        seed: root seed (fresh entropy if None)
+        workers: season parallelism (1 runs inline); defaults to the pool size
+        store: where learned profiles are saved (not saved if None)
+        name: profile id prefix; defaults to the training id
+
+    Returns:
+        {
+            "training_id": str,
+            "races": int, "seeds": int,
+            "profiles": {agent_id: {"profile_id": str,
+                                    "traits": {trait: float},   # learned (mean over seasons)
+                                    "spread": {trait: float}}}, # std over seasons
+            "mean_position": {agent_id: [float per race]}       # 1 = P1, mean over seasons
+        }
+    """
+    if races < 1:
+        raise ValueError("races must be >= 1")
+    if seeds < 1:
+        raise ValueError("seeds must be >= 1")
+    if not agent_settings:
+        raise ValueError("At least one agent required")
+
+    profiles = _build_profiles(agent_settings)
+    agent_ids = [p.id for p in profiles]
+    if len(set(agent_ids)) != len(agent_ids):
+        raise ValueError("agent ids must be unique")
+
+    if seed is None:
+        training_id = uuid.uuid4().hex[:12]
+    else:
+        training_id = cache_key({
+            "engine_version": ENGINE_VERSION, "race": race_params, "agents": agent_settings,
+            "races": races, "seeds": seeds, "seed": seed, "engine": engine,
+        })[:12]
+    prefix = name or training_id
+    profile_ids = {aid: f"{prefix}.{aid}" for aid in agent_ids}
+    for profile_id in profile_ids.values():
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            raise ValueError(f"invalid profile_id {profile_id!r}; use letters, digits, '_', '.' or '-'")
+
+    season_seeds = [spawn_seeds(s, races) for s in spawn_seeds(seed, seeds)]
+    workers = workers or pool_workers()
+    if seeds == 1 or workers == 1:
+        seasons = [_run_season(race_params, agent_settings, s, engine) for s in season_seeds]
+    else:
+        executor = get_pool()
+        futures = [executor.submit(_run_season, race_params, agent_settings, s, engine) for s in season_seeds]
+        seasons = [f.result() for f in futures]
+
+    final = np.stack([s["profiles"] for s in seasons])  # seasons x agents x columns
+    learned = final.mean(axis=0)
+    spread = final.std(axis=0)
+    positions = np.array([s["positions"] for s in seasons], dtype=float).mean(axis=0) + 1  # races x agents
+
+    trained = [PROFILE_COLUMNS.index(key) for key in TRAINED_TRAITS]
+    result_profiles = {}
+    for i, profile in enumerate(profiles):
+        traits = dict(zip(PROFILE_COLUMNS, learned[i].tolist()))
+        result_profiles[profile.id] = {
+            "profile_id": profile_ids[profile.id],
+            "traits": {key: round(value, 4) for key, value in traits.items()},
+            "spread": {key: round(float(spread[i, col]), 4) for key, col in zip(TRAINED_TRAITS, trained)},
+        }
+        if store is not None:
+            store.save(profile_ids[profile.id], {
+                "name": profile.name,
+                "traits": traits,
+                "meta": {
+                    "training_id": training_id,
+                    "agent_id": profile.id,
+                    "races": races,
+                    "seeds": seeds,
+                    "seed": seed,
+                    "engine": engine,
+                    "race": race_params,
+                    "created": time.time(),
+                },
+            })
+
+    return {
+        "training_id": training_id,
+        "races": races,
+        "seeds": seeds,
+        "profiles": result_profiles,
+        "mean_position": {
+            aid: np.round(positions[:, i], 3).tolist() for i, aid in enumerate(agent_ids)
+        },
+    }
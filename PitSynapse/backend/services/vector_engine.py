@@ -0,0 +1,438 @@
+# backend/services/vector_engine.py
+"""
+Struct-of-arrays batch engine for large fields.
+
+Exposes:
+ - run_simulation_vectorized(race_params, agent_settings, seed) -> Dict with timeline and summary
+
+Behavior:
+ - keeps the whole field as NumPy arrays (traits, tyre_wear, tyre_age, total_time, best_lap)
+ - for each lap, runs decisions, lap-time model, tyre-wear model, positions,
+   overtakes and PRL updates as array operations
+ - returns the same timeline / summary / events shape as simulation_runner.run_simulation
+
+The rules mirror services.simulation_runner, services.agent_logic and prl_system, with
+the parameters from services.race_model. Random draws come from a numpy Generator, so seeded results are reproducible
+but not identical to the "python" engine.
+"""
+
+from time import perf_counter
+from typing import Callable, Dict, Any, List, Iterable
+
+import numpy as np
+
+from services.agent_logic import ACTIONS, A_PIT, decide_actions
+from services.race_model import (
+    BASE_LAP_TIME,
+    MIN_LAP_TIME,
+    LAP_TIME_NOISE,
+    TYRE_PENALTY_SCALE,
+    BASE_TYRE_WEAR,
+    FRESH_TYRE_WEAR,
+    PIT_LOSS,
+    PIT_LOSS_JITTER,
+    WEATHER_CHANGE_PROB,
+    PRL_EXPECTED_WEAR,
+    ACTION_LAP_OFFSET,
+    ACTION_LAP_AGGRESSION,
+    ACTION_WEAR_MULT,
+)
+from services.simulation_runner import EVENT_TYPES, _build_profiles
+from services.overtakes import detect_overtakes, default_max_overtakes
+from prl_system import update_traits_prl_batch
+from services.profiling import PhaseTimer, finish_timing
+from services.snapshots import RaceSnapshot, capture_vector, restore_vector
+from services.columnar import new_timeline, new_events, append_row, concat_chunks, columnar_result
+from models.events import WeatherEnum
+
+def run_simulation_vectorized(
+    race_params: Dict[str, Any],
+    agent_settings: List[Dict[str, Any]],
+    seed: int | None = None,
+    layout: str = "records",
+    include_timeline: bool = True,
+    event_types: Iterable[str] = EVENT_TYPES,
+    max_overtakes: int | None = None,
+    overtake_sampling: str = "first",
+    phase_timings: bool = False,
+    progress: Callable[[int], None] | None = None,
+    snapshot_laps: Iterable[int] | None = None,
+    resume_from: RaceSnapshot | None = None,
+    action_overrides: Dict[int, Dict[int, int]] | None = None
+) -> Dict[str, Any]:
+    """
+    Batch simulation over the whole field. Same arguments and return shape as
+    simulation_runner.run_simulation.
+
+    action_overrides arrive as action codes (run_simulation maps the names).
+
+    With layout="columnar" the per-lap arrays are kept as column chunks and
+    joined once at the end, so no per-row dicts are created. Outputs that are
+    not requested (include_timeline / event_types) are never materialized.
+    """
+    rng = np.random.default_rng(seed)
+    timer = PhaseTimer() if phase_timings else None
+
+    total_laps = race_params.get("total_laps", 50)
+    weather_mode = race_params.get("weather", "dry")
+
+    if resume_from is None:
+        agents_ordered = _build_profiles(agent_settings)
+    else:
+        agents_ordered, resumed, resumed_weather, resumed_elapsed, rng = restore_vector(resume_from)
+    n = len(agents_ordered)
+    if n == 0:
+        raise ValueError("At least one agent required")
+    if max_overtakes is None:
+        max_overtakes = default_max_overtakes(n)
+
+    ids = np.array([p.id for p in agents_ordered], dtype=object)
+    names = np.array([p.name for p in agents_ordered], dtype=object)
+
+    # Trait vectors (mutated by PRL)
+    traits = {
+        key: np.array([getattr(p, key) for p in agents_ordered], dtype=float)
+        for key in ("aggression", "risk_taking", "tyre_management", "pit_bias")
+    }
+    # decide_action reads "risk", which PRL does not update
+    risk = np.array([p.risk for p in agents_ordered], dtype=float)
+    weather_sensitivity = np.array([p.weather_sensitivity for p in agents_ordered], dtype=float)
+    learning_rate = np.array([p.learning_rate for p in agents_ordered], dtype=float)
+
+    # Dynamic state
+    position = np.arange(1, n + 1)
+    tyre_wear = np.zeros(n)
+    tyre_age = np.zeros(n, dtype=np.int64)
+    total_time = np.zeros(n)
+    best_lap = np.full(n, np.inf)
+    pit_stops = np.zeros(n, dtype=np.int64)
+    positions_range = np.arange(1, n + 1)
+
+    emit_lap = "lap_complete" in event_types
+    emit_pit = "pit_stop" in event_types
+    emit_overtake = "overtake" in event_types
+    emit_prl = "prl_update" in event_types
+    columnar = layout == "columnar"
+    if columnar:
+        timeline_cols = new_timeline()
+        event_cols = new_events(event_types)
+    timeline_entries = []
+    all_events = []
+    elapsed = 0.0
+
+    weather_map = {
+        "dry": WeatherEnum.dry,
+        "rain": WeatherEnum.light_rain,
+        "mixed": WeatherEnum.mixed
+    }
+    current_weather = weather_map.get(weather_mode, WeatherEnum.dry)
+
+    first_lap = 1
+    if resume_from is not None:
+        position, tyre_wear, tyre_age, total_time, best_lap, pit_stops = (
+            resumed[key] for key in
+            ("position", "tyre_wear", "tyre_age", "total_time", "best_lap", "pit_stops")
+        )
+        current_weather = WeatherEnum(resumed_weather)
+        elapsed = resumed_elapsed
+        first_lap = resume_from.lap + 1
+    snapshot_at = set(snapshot_laps or ())
+    snapshots = []
+
+    for lap_num in range(first_lap, total_laps + 2):
+        if progress:
+            progress(lap_num - 1)
+        if lap_num - 1 in snapshot_at:
+            snapshots.append(capture_vector(
+                lap_num - 1, race_params, ids.tolist(), names.tolist(),
+                {**traits, "risk": risk, "weather_sensitivity": weather_sensitivity,
+                 "learning_rate": learning_rate},
+                {"position": position, "tyre_wear": tyre_wear, "tyre_age": tyre_age,
+                 "total_time": total_time, "best_lap": best_lap, "pit_stops": pit_stops},
+                current_weather.value, elapsed, rng,
+            ))
+        if lap_num > total_laps:
+            break
+        if rng.random() < WEATHER_CHANGE_PROB:
+            current_weather = (WeatherEnum.dry, WeatherEnum.light_rain)[rng.integers(2)]
+
+        laps_remaining = total_laps - lap_num
+        prev_position = position
+        if timer:
+            t = perf_counter()
+
+        # Decisions
+        actions = decide_actions(
+            {"tyre_wear": tyre_wear, "position": position},
+            {
+                "aggression": traits["aggression"],
+                "risk": risk,
+                "tyre_management": traits["tyre_management"],
+                "pit_bias": traits["pit_bias"],
+                "weather_sensitivity": weather_sensitivity,
+            },
+            {"laps_remaining": laps_remaining, "weather": current_weather.value},
+        )
+        if action_overrides and lap_num in action_overrides:
+            forced = action_overrides[lap_num]
+            actions[list(forced)] = list(forced.values())
+        did_pit = actions == A_PIT
+        if timer:
+            t = timer.lap("decisions", t, n)
+
+        # Lap-time model (pit laps run on fresh tyres at maintain pace, plus pit loss)
+        modifier = ACTION_LAP_OFFSET[actions] + traits["aggression"] * ACTION_LAP_AGGRESSION[actions]
+        wear_for_pace = np.where(did_pit, 0.0, tyre_wear)
+        noise = rng.uniform(-LAP_TIME_NOISE, LAP_TIME_NOISE, n)
+        lap_time = np.maximum(
+            MIN_LAP_TIME,
+            np.round(BASE_LAP_TIME + modifier + wear_for_pace ** 1.5 * TYRE_PENALTY_SCALE + noise, 2),
+        )
+        pit_time = np.zeros(n)
+        n_pits = int(did_pit.sum())
+        if n_pits:
+            pit_time[did_pit] = PIT_LOSS + rng.uniform(-PIT_LOSS_JITTER, PIT_LOSS_JITTER, n_pits)
+            lap_time = lap_time + pit_time
+
+        # Tyre-wear model
+        worn = np.round(
+            np.minimum(
+                1.0,
+                tyre_wear + BASE_TYRE_WEAR * ACTION_WEAR_MULT[actions] * (1.0 - 0.4 * traits["tyre_management"]),
+            ),
+            4,
+        )
+        new_wear = np.where(did_pit, FRESH_TYRE_WEAR, worn)
+        if timer:
+            t = timer.lap("physics", t, n)
+
+        # Positions by lap time (stable, ties keep grid order)
+        order = np.argsort(lap_time, kind="stable")
+        position = np.empty(n, dtype=np.int64)
+        position[order] = positions_range
+        position_change = prev_position - position
+
+        # State update
+        tyre_wear = new_wear
+        tyre_age = np.where(did_pit, 0, tyre_age + 1)
+        total_time = total_time + lap_time
+        best_lap = np.minimum(best_lap, lap_time)
+        pit_stops = pit_stops + did_pit
+
+        # Timestamps: elapsed advances by lap_time / n per car in finishing order
+        stamps = np.cumsum(np.concatenate(([elapsed], lap_time[order] / n)))
+        elapsed = float(stamps[-1])
+        stamp_at = np.empty(n)
+        stamp_at[order] = stamps[:-1]
+        lap_stamp = round(elapsed, 2)
+        if timer:
+            t = timer.lap("positions", t)
+
+        # Overtakes: every pairwise pass implied by the reordering
+        if emit_overtake:
+            passer, overtaken, pass_before, pass_after = detect_overtakes(
+                order, prev_position, max_overtakes, overtake_sampling
+            )
+            if timer:
+                t = timer.lap("overtakes", t)
+
+        # PRL updates (skipped on lap 1, no baseline)
+        prl = None
+        if lap_num > 1:
+            prl = update_traits_prl_batch(
+                traits,
+                lap_time,
+                best_lap,
+                np.maximum(0.0, new_wear - (tyre_wear - BASE_TYRE_WEAR)),
+                prev_position,
+                position,
+                n,
+                did_pit,
+                PRL_EXPECTED_WEAR,
+                learning_rate,
+            )
+
+        # Pit reasons use the traits this lap was driven with
+        lap_traits = traits
+        if prl is not None:
+            changes = prl["changes"]
+            traits = {
+                key: np.clip(value + changes[key], 0.0, 1.0) if key in changes else value
+                for key, value in traits.items()
+            }
+            if timer:
+                t = timer.lap("prl", t, n)
+
+        if columnar:
+            lap_col = np.full(n, lap_num)
+            o_codes = actions[order]
+            o_lap_time = np.round(lap_time[order], 2)
+            if include_timeline:
+                append_row(
+                    timeline_cols, lap_col, order, positions_range, o_lap_time,
+                    np.round(new_wear[order] * 100, 2), o_codes,
+                )
+            pitted = order[did_pit[order]]
+            if emit_pit and pitted.size:
+                append_row(
+                    event_cols["pit_stop"], lap_col[:pitted.size], pitted,
+                    np.round(pit_time[pitted], 2), position[pitted],
+                    np.where(lap_traits["pit_bias"][pitted] > 0.5, "strategy", "tyre_wear"),
+                    position_change[pitted], np.round(stamp_at[pitted], 2),
+                )
+            if emit_lap:
+                append_row(
+                    event_cols["lap_complete"], lap_col, order, o_codes, o_lap_time, positions_range,
+                    position_change[order], np.round(new_wear[order], 4), tyre_age[order],
+                    np.round(stamp_at[order], 2),
+                )
+            if emit_overtake and passer.size:
+                append_row(
+                    event_cols["overtake"], np.full(passer.size, lap_num), passer, overtaken,
+                    pass_before, pass_after, np.full(passer.size, lap_stamp),
+                )
+            if emit_prl and prl is not None:
+                append_row(
+                    event_cols["prl_update"], lap_col, order,
+                    np.round(prl["reward_signal"][order], 3),
+                    np.round(changes["aggression"][order], 4),
+                    np.round(changes["tyre_management"][order], 4),
+                    np.round(changes["risk_taking"][order], 4),
+                    np.round(changes["pit_bias"][order], 4),
+                    np.full(n, lap_stamp),
+                )
+            if timer:
+                timer.lap("events", t, n)
+            continue
+
+        # Timeline + lap / pit events (in finishing order)
+        if include_timeline or emit_lap or emit_pit:
+            o_ids = ids[order].tolist()
+            o_names = names[order].tolist()
+            o_actions = [ACTIONS[a] for a in actions[order].tolist()]
+            o_lap_time = np.round(lap_time[order], 2).tolist()
+            o_change = position_change[order].tolist()
+            o_stamp = np.round(stamp_at[order], 2).tolist()
+
+        if emit_pit:
+            o_pit = did_pit[order].tolist()
+            o_pit_time = np.round(pit_time[order], 2).tolist()
+            o_strategy = (lap_traits["pit_bias"][order] > 0.5).tolist()
+        if emit_lap:
+            o_wear = np.round(new_wear[order], 4).tolist()
+            o_age = tyre_age[order].tolist()
+        if include_timeline:
+            o_wear_pct = np.round(new_wear[order] * 100, 2).tolist()
+
+        if include_timeline or emit_lap or emit_pit:
+            for idx in range(n):
+                pos = idx + 1
+                aid = o_ids[idx]
+                if emit_pit and o_pit[idx]:
+                    all_events.append({
+                        "event_type": "pit_stop",
+                        "agent_id": aid,
+                        "agent_name": o_names[idx],
+                        "pit_stop_time": o_pit_time[idx],
+                        "position": pos,
+                        "pit_reason": "strategy" if o_strategy[idx] else "tyre_wear",
+                        "position_change": o_change[idx],
+                        "timestamp": o_stamp[idx]
+                    })
+                if emit_lap:
+                    all_events.append({
+                        "event_type": "lap_complete",
+                        "agent_id": aid,
+                        "agent_name": o_names[idx],
+                        "action": o_actions[idx],
+                        "lap_time": o_lap_time[idx],
+                        "position": pos,
+                        "position_change": o_change[idx],
+                        "tyre_wear": o_wear[idx],
+                        "tyre_age": o_age[idx],
+                        "timestamp": o_stamp[idx]
+                    })
+                if include_timeline:
+                    timeline_entries.append({
+                        "lap": lap_num,
+                        "agent_id": aid,
+                        "position": pos,
+                        "lap_time": o_lap_time[idx],
+                        "tyre_wear": o_wear_pct[idx],
+                        "action": o_actions[idx]
+                    })
+
+        if emit_overtake and passer.size:
+            for g, o, before, after in zip(
+                passer.tolist(), overtaken.tolist(), pass_before.tolist(), pass_after.tolist()
+            ):
+                all_events.append({
+                    "event_type": "overtake",
+                    "agent_id": ids[g],
+                    "agent_name": names[g],
+                    "overtaken_agent_id": ids[o],
+                    "overtaken_agent_name": names[o],
+                    "overtake_success": True,
+                    "position_before": before,
+                    "position_after": after,
+                    "timestamp": lap_stamp
+                })
+
+        if emit_prl and prl is not None:
+            o_prl_ids = ids[order].tolist()
+            o_prl_names = names[order].tolist()
+            o_reward = np.round(prl["reward_signal"][order], 3).tolist()
+            o_deltas = {key: np.round(delta[order], 4).tolist() for key, delta in changes.items()}
+            for idx in range(n):
+                all_events.append({
+                    "event_type": "prl_update",
+                    "agent_id": o_prl_ids[idx],
+                    "agent_name": o_prl_names[idx],
+                    "prl_reward": o_reward[idx],
+                    "trait_deltas": {
+                        "aggression": o_deltas["aggression"][idx],
+                        "tyre_management": o_deltas["tyre_management"][idx],
+                        "risk_taking": o_deltas["risk_taking"][idx],
+                        "pit_bias": o_deltas["pit_bias"][idx]
+                    },
+                    "timestamp": lap_stamp
+                })
+        if timer:
+            timer.lap("events", t, n)
+
+    # Summary
+    if timer:
+        t = perf_counter()
+    finite_best = best_lap[np.isfinite(best_lap) & (best_lap > 0)]
+    fastest_lap = float(finite_best.min()) if finite_best.size else 0.0
+    winner_idx = int(np.argmin(total_time))
+
+    summary = {
+        "fastest_lap": round(fastest_lap, 2),
+        "avg_tyre_wear": round(float(tyre_wear.mean()) * 100, 2),
+        "pit_stops": dict(zip(ids.tolist(), pit_stops.tolist())),
+        "winner": names[winner_idx],
+        "finishing_order": ids[np.argsort(total_time, kind="stable")].tolist()
+    }
+
+    if columnar:
+        result = columnar_result(
+            agents_ordered,
+            concat_chunks(timeline_cols),
+            summary,
+            {etype: concat_chunks(table) for etype, table in event_cols.items()},
+        )
+    else:
+        result = {
+            "timeline": timeline_entries,
+            "summary": summary,
+            "events": all_events
+        }
+
+    if snapshot_laps is not None:
+        result["snapshots"] = snapshots
+
+    if timer:
+        timer.lap("summary", t)
+        result["metadata"] = finish_timing(timer, engine="numpy", agents=n, laps=total_laps)
+    return result
@@ -0,0 +1,525 @@
+"""
+Benchmark suite for the simulation and API hot paths.
+Run from project root:
+
+    python benchmarks/run_benchmarks.py                      # quick grid
+    python benchmarks/run_benchmarks.py --grid full -o bench.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+
+Benchmarks (each over a grid of field sizes x race lengths):
+ - run_simulation          per engine; agent-laps/s and peak memory
+ - decide_action           scalar decisions/s over a whole field
+ - decide_actions          batched decisions/s
+ - update_traits_prl       scalar PRL updates/s over a whole field
+ - update_traits_prl_batch batched PRL updates/s
+ - detect_overtakes        one lap's pairwise overtake detection (typical
+                           lap, and a fully reversed field under the cap)
+ - expected_race_time      noise-free surrogate scoring of a batch of
+                           pit plans (plans/s per race length)
+ - serialize_response      response body encoding as served ("fast") and
+                           through SimulationResponse validation
+                           ("validated"), plus payload bytes per format
+ - simulate_endpoint       end-to-end POST /api/simulate latency, with debug
+                           response validation off and on
+ - execution               concurrent runs through the thread and process
+                           execution modes (quick and full grids)
+Cells over RECORDS_CELL_LIMIT agent-laps run with the columnar layout (the
+layout is part of each result's params).
+
+Results are written as JSON. With --baseline, every result is compared to
+the baseline entry with the same (bench, params) key; a throughput drop or
+memory growth beyond the thresholds is a regression (exit status 1).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add backend and the shared fixtures to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from agent_fixtures import make_agents
+from models.state import AgentProfile, AgentState, RaceState
+from prl_system import PRL_TRAIT_KEYS, update_traits_prl, update_traits_prl_batch
+from routes.simulation import SimulationResponse
+from services.agent_logic import decide_action, decide_actions
+from services.columnar import to_npz_bytes
+from services.encoding import dumps
+from services.execution import SimulationExecutor, records_body
+from services.overtakes import detect_overtakes, default_max_overtakes
+from services.simulation_runner import run_simulation, ENGINE_VERSION, DECISION_TRAITS
+from services.strategy import candidate_plans
+from services.surrogate import expected_race_time, pit_plan
+
+GRIDS = {
+    "smoke": {"agents": (3, 20), "laps": (10,), "execution": None},
+    "quick": {"agents": (3, 20, 200), "laps": (10, 50), "execution": (20, 50)},
+    "full": {"agents": (3, 20, 200, 2000), "laps": (10, 50, 200), "execution": (200, 50)},
+}
+
+# Default regression thresholds (fractions)
+THROUGHPUT_DROP = 0.20
+MEMORY_GROWTH = 0.25
+
+# Overtakes grow with the square of the field, so big grids cap them per lap
+MAX_OVERTAKES = 200
+
+# Above this many agent-laps a records (list of dicts) result runs to
+# gigabytes, so bigger cells benchmark the columnar layout instead
+RECORDS_CELL_LIMIT = 100_000
+
+
+def _best_time(fn, repeat):
+    """Best wall time over `repeat` calls; returns (seconds, last return value)."""
+    best, value = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def _traced_peak(fn):
+    """Peak Python-heap allocation of one call (tracemalloc; includes NumPy buffers)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _rss_high_water():
+    """Peak RSS of this process in bytes."""
+    try:
+        # Linux: VmHWM is reset on exec, unlike ru_maxrss which a child
+        # inherits from its (possibly much larger) parent
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource  # Unix only
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _rss_peak_child(engine, agents, laps, layout):
+    """Entry point of the --rss-peak child: peak RSS growth of one run, in bytes."""
+    race_params = {"total_laps": laps, "weather": "mixed"}
+    settings = make_agents(agents)
+    start = _rss_high_water()
+    run_simulation(race_params, settings, seed=1, engine=engine, layout=layout,
+                   max_overtakes=MAX_OVERTAKES)
+    return _rss_high_water() - start
+
+
+def _simulation_peak(run, engine, agents, laps, layout):
+    """
+    Peak memory of one run_simulation call; returns (bytes, method).
+    tracemalloc slows big runs by an order of magnitude, so cells over
+    RECORDS_CELL_LIMIT run once in a fresh interpreter and report its peak RSS
+    growth instead (Unix only).
+    """
+    if agents * laps <= RECORDS_CELL_LIMIT or sys.platform == "win32":
+        return _traced_peak(run), "tracemalloc"
+    out = subprocess.run(
+        [sys.executable, __file__, "--rss-peak", engine, str(agents), str(laps), layout],
+        check=True, capture_output=True, text=True,
+    )
+    return int(out.stdout.strip()), "rss"
+
+
+def _repeat_for(work, repeat):
+    """Fewer repeats for the large cells, so a full grid finishes in minutes."""
+    return 1 if work >= 100_000 else repeat
+
+
+def _layout_for(work):
+    return "records" if work <= RECORDS_CELL_LIMIT else "columnar"
+
+
+# ---------------- benchmarks ---------------- #
+
+def bench_run_simulation(agents, laps, repeat):
+    race_params = {"total_laps": laps, "weather": "mixed"}
+    settings = make_agents(agents)
+    layout = _layout_for(agents * laps)
+    results = []
+    for engine in ("python", "numpy"):
+        def run():
+            return run_simulation(race_params, settings, seed=1, engine=engine, layout=layout,
+                                  max_overtakes=MAX_OVERTAKES)
+        seconds, _ = _best_time(run, _repeat_for(agents * laps, repeat))
+        peak, method = _simulation_peak(run, engine, agents, laps, layout)
+        results.append({
+            "bench": "run_simulation",
+            "params": {"engine": engine, "agents": agents, "laps": laps, "layout": layout},
+            "seconds": seconds,
+            "agent_laps_per_s": agents * laps / seconds,
+            "peak_bytes": peak,
+            "peak_method": method,
+        })
+    return results
+
+
+def bench_decide_action(agents, repeat):
+    rng = random.Random(2)
+    states = [AgentState(position=i + 1, tyre_wear=rng.random()) for i in range(agents)]
+    profiles = [AgentProfile.from_dict(a) for a in make_agents(agents)]
+    race_state = RaceState(laps_remaining=10, weather="dry", total_agents=agents)
+    calls = max(1, 20_000 // agents)
+
+    def scalar():
+        for _ in range(calls):
+            for state, profile in zip(states, profiles):
+                decide_action(state, profile, race_state)
+
+    columns = {"tyre_wear": [s.tyre_wear for s in states], "position": [s.position for s in states]}
+    traits = {key: [getattr(p, key) for p in profiles] for key in DECISION_TRAITS}
+
+    def batched():
+        for _ in range(calls):
+            decide_actions(columns, traits, race_state)
+
+    results = []
+    for name, fn in (("decide_action", scalar), ("decide_actions", batched)):
+        seconds, _ = _best_time(fn, repeat)
+        results.append({
+            "bench": name,
+            "params": {"agents": agents},
+            "seconds": seconds,
+            "agent_laps_per_s": calls * agents / seconds,
+        })
+    return results
+
+
+def bench_update_traits_prl(agents, repeat):
+    profiles = [AgentProfile.from_dict(a) for a in make_agents(agents)]
+    perf = {
+        "current_lap_time": 90.4, "best_lap_time": 90.1, "tyre_wear_increase": 0.03,
+        "expected_wear": 0.04, "position_before": 4, "position_after": 2,
+        "total_cars": agents, "pitted_this_lap": False, "lap_number": 5,
+    }
+    calls = max(1, 20_000 // agents)
+
+    def scalar():
+        for _ in range(calls):
+            for profile in profiles:
+                update_traits_prl(profile, perf)
+
+    traits = {key: [getattr(p, key) for p in profiles] for key in PRL_TRAIT_KEYS}
+    columns = {key: [value] * agents for key, value in perf.items()}
+
+    def batched():
+        for _ in range(calls):
+            update_traits_prl_batch(
+                traits, columns["current_lap_time"], columns["best_lap_time"],
+                columns["tyre_wear_increase"], columns["position_before"],
+                columns["position_after"], agents, columns["pitted_this_lap"],
+                perf["expected_wear"],
+            )
+
+    results = []
+    for name, fn in (("update_traits_prl", scalar), ("update_traits_prl_batch", batched)):
+        seconds, _ = _best_time(fn, repeat)
+        results.append({
+            "bench": name,
+            "params": {"agents": agents},
+            "seconds": seconds,
+            "agent_laps_per_s": calls * agents / seconds,
+        })
+    return results
+
+
+def bench_detect_overtakes(agents, repeat):
+    rng = np.random.default_rng(3)
+    prev_position = np.arange(1, agents + 1)
+    # Typical lap: small lap-time noise reshuffles neighbours
+    order = np.argsort(np.arange(agents) + rng.normal(0.0, 3.0, agents), kind="stable")
+    results = []
+    for max_events in (None, MAX_OVERTAKES):
+        seconds, passes = _best_time(lambda: detect_overtakes(order, prev_position, max_events), repeat)
+        results.append({
+            "bench": "detect_overtakes",
+            "params": {"agents": agents, "max_events": max_events},
+            "seconds": seconds,
+            "agent_laps_per_s": agents / seconds,
+            "events": int(passes[0].size),
+        })
+    # Worst case: the whole field reverses (n(n-1)/2 passes); picking the
+    # default cap's worth must not list every pass
+    reversed_order = np.arange(agents)[::-1].copy()
+    cap = default_max_overtakes(agents)
+    seconds, passes = _best_time(
+        lambda: detect_overtakes(reversed_order, prev_position, cap, "spread"), repeat
+    )
+    results.append({
+        "bench": "detect_overtakes",
+        "params": {"agents": agents, "max_events": cap, "lap": "reversed", "sampling": "spread"},
+        "seconds": seconds,
+        "agent_laps_per_s": agents / seconds,
+        "events": int(passes[0].size),
+    })
+    return results
+
+
+def _serialize_validated(result):
+    """The old records path: validate through SimulationResponse, jsonable_encoder, json.dumps."""
+    response = SimulationResponse(**result)
+    return json.dumps(jsonable_encoder(response)).encode("utf-8")
+
+
+def _serialize_records(result):
+    """The /api/simulate records path: trusted body, fast encoder."""
+    return dumps(records_body(result))
+
+
+def _serialize_columnar(result):
+    return dumps(result)
+
+
+def bench_serialize_response(agents, laps, repeat):
+    """
+    Encoding cost of the response body. Cells within RECORDS_CELL_LIMIT time
+    the records path, both as served ("fast") and through the previous
+    model validation ("validated"); larger ones time columnar JSON.
+    """
+    race_params = {"total_laps": laps, "weather": "mixed"}
+    settings = make_agents(agents)
+    layout = _layout_for(agents * laps)
+    columnar = run_simulation(race_params, settings, seed=1, layout="columnar",
+                              max_overtakes=MAX_OVERTAKES)
+    payload_bytes = {
+        "columnar_json": len(_serialize_columnar(columnar)),
+        "npz": len(to_npz_bytes(columnar)),
+    }
+
+    if layout == "records":
+        result = run_simulation(race_params, settings, seed=1, max_overtakes=MAX_OVERTAKES)
+        paths = (("fast", _serialize_records), ("validated", _serialize_validated))
+    else:
+        result, paths = columnar, (("fast", _serialize_columnar),)
+    del columnar
+
+    results = []
+    for path, serialize in paths:
+        seconds, payload = _best_time(lambda: serialize(result), _repeat_for(agents * laps, repeat))
+        if layout == "records":
+            payload_bytes["records_json"] = len(payload)
+        results.append({
+            "bench": "serialize_response",
+            "params": {"agents": agents, "laps": laps, "layout": layout, "path": path},
+            "seconds": seconds,
+            "agent_laps_per_s": agents * laps / seconds,
+            "peak_bytes": _traced_peak(lambda: serialize(result)),
+            "payload_bytes": dict(payload_bytes),
+        })
+    return results
+
+
+def bench_simulate_endpoint(agents, laps, repeat):
+    """
+    End-to-end POST /api/simulate latency (unseeded, so never cached) with
+    debug response validation off (as deployed) and on.
+    """
+    from fastapi.testclient import TestClient
+    import routes.simulation as simulation_routes
+    from main import app
+
+    client = TestClient(app)
+    body = {"race": {"total_laps": laps, "weather": "mixed"}, "agents": make_agents(agents)}
+    results = []
+    for validate in (False, True):
+        simulation_routes.VALIDATE_RESPONSES = validate
+        try:
+            seconds, response = _best_time(
+                lambda: client.post("/api/simulate", json=body), _repeat_for(agents * laps, repeat)
+            )
+        finally:
+            simulation_routes.VALIDATE_RESPONSES = False
+        assert response.status_code == 200, response.text
+        results.append({
+            "bench": "simulate_endpoint",
+            "params": {"agents": agents, "laps": laps, "validate": validate},
+            "seconds": seconds,
+            "agent_laps_per_s": agents * laps / seconds,
+        })
+    return results
+
+
+def bench_execution(agents, laps, repeat):
+    """
+    Concurrent /api/simulate-style runs (two per core) through each execution
+    mode; aggregate agent-laps/s shows how throughput scales with cores.
+    """
+    race = {"total_laps": laps, "weather": "dry"}
+    settings = make_agents(agents)
+    concurrent = 2 * (os.cpu_count() or 1)
+
+    async def burst(executor):
+        await asyncio.gather(*(
+            executor.render(race, settings, "records", seed=seed, include_timeline=False)
+            for seed in range(concurrent)
+        ))
+
+    results = []
+    for mode in ("thread", "process"):
+        executor = SimulationExecutor(mode=mode)
+        try:
+            executor.start()
+            seconds, _ = _best_time(lambda: asyncio.run(burst(executor)), repeat)
+        finally:
+            executor.shutdown()
+        results.append({
+            "bench": "execution",
+            "params": {"mode": mode, "agents": agents, "laps": laps, "concurrent": concurrent},
+            "seconds": seconds,
+            "agent_laps_per_s": concurrent * agents * laps / seconds,
+        })
+    return results
+
+
+def bench_expected_race_time(laps, repeat):
+    profile = AgentProfile.from_dict(make_agents(1)[0])
+    # Every two-stop plan of the race, scored as one batch
+    plans = pit_plan(laps, candidate_plans(laps, (2,))[0])
+    seconds, _ = _best_time(lambda: expected_race_time(profile, plans), repeat)
+    return [{
+        "bench": "expected_race_time",
+        "params": {"laps": laps, "plans": len(plans)},
+        "seconds": seconds,
+        "agent_laps_per_s": len(plans) * laps / seconds,
+        "plans_per_s": len(plans) / seconds,
+    }]
+
+
+def run_suite(grid, repeat=3, log=print):
+    cells = GRIDS[grid]
+    results = []
+    for agents in cells["agents"]:
+        results += bench_decide_action(agents, repeat)
+        results += bench_update_traits_prl(agents, repeat)
+        results += bench_detect_overtakes(agents, repeat)
+        for laps in cells["laps"]:
+            log(f"  {agents} agents x {laps} laps")
+            results += bench_run_simulation(agents, laps, repeat)
+            results += bench_serialize_response(agents, laps, repeat)
+            if _layout_for(agents * laps) == "records":
+                results += bench_simulate_endpoint(agents, laps, repeat)
+    for laps in cells["laps"]:
+        results += bench_expected_race_time(laps, repeat)
+    if cells["execution"]:
+        log("  execution modes")
+        results += bench_execution(*cells["execution"], repeat)
+    return {
+        "meta": {
+            "grid": grid,
+            "repeat": repeat,
+            "engine_version": ENGINE_VERSION,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+# ---------------- baseline comparison ---------------- #
+
+def _key(entry):
+    return entry["bench"], json.dumps(entry["params"], sort_keys=True)
+
+
+def compare(current, baseline, throughput_drop=THROUGHPUT_DROP, memory_growth=MEMORY_GROWTH):
+    """
+    Regressions of `current` against `baseline` (both suite outputs).
+    Entries missing from either side are ignored.
+    """
+    previous = {_key(entry): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in current["results"]:
+        old = previous.get(_key(entry))
+        if old is None:
+            continue
+        label = f"{entry['bench']} {entry['params']}"
+        ratio = entry["agent_laps_per_s"] / old["agent_laps_per_s"]
+        if ratio < 1.0 - throughput_drop:
+            regressions.append(f"{label}: throughput {ratio:.0%} of baseline")
+        if entry.get("peak_bytes") and old.get("peak_bytes"):
+            growth = entry["peak_bytes"] / old["peak_bytes"]
+            if growth > 1.0 + memory_growth:
+                regressions.append(f"{label}: peak memory {growth:.0%} of baseline")
+    return regressions
+
+
+def _print_table(suite):
+    print(f"{'bench':<24} {'params':<52} {'agent-laps/s':>14} {'peak MB':>9}")
+    for entry in suite["results"]:
+        peak = entry.get("peak_bytes")
+        print(
+            f"{entry['bench']:<24} {json.dumps(entry['params']):<52} "
+            f"{entry['agent_laps_per_s']:>14,.0f} {(peak / 1e6 if peak else 0):>9.1f}"
+        )
+        if "payload_bytes" in entry:
+            sizes = ", ".join(f"{k}={v:,}" for k, v in entry["payload_bytes"].items())
+            print(f"{'':<24}   payload bytes: {sizes}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--rss-peak"]:
+        engine, agents, laps, layout = argv[1:5]
+        print(_rss_peak_child(engine, int(agents), int(laps), layout))
+        return 0
+
+    parser = argparse.ArgumentParser(description="PitSynapse benchmark suite")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="quick")
+    parser.add_argument("--repeat", type=int, default=3, help="timed repeats per cell (best is kept)")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--throughput-drop", type=float, default=THROUGHPUT_DROP,
+                        help="allowed fractional drop in agent-laps/s")
+    parser.add_argument("--memory-growth", type=float, default=MEMORY_GROWTH,
+                        help="allowed fractional growth in peak memory")
+    args = parser.parse_args(argv)
+
+    print(f"Running {args.grid} benchmark grid...")
+    suite = run_suite(args.grid, repeat=args.repeat)
+    _print_table(suite)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(suite, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(suite, baseline, args.throughput_drop, args.memory_growth)
+        if regressions:
+            print(f"\n[FAIL] {len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print(f"\n[OK] No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Tests for the benchmark suite (smoke grid + baseline comparison).
+Run from project root: python test_benchmarks.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "benchmarks"))
+
+from run_benchmarks import run_suite, compare
+
+
+def test_smoke_grid_reports_throughput_memory_and_payloads():
+    suite = run_suite("smoke", repeat=1, log=lambda _: None)
+    benches = {entry["bench"] for entry in suite["results"]}
+    assert benches == {
+        "run_simulation", "decide_action", "decide_actions",
+        "update_traits_prl", "update_traits_prl_batch", "detect_overtakes",
+        "serialize_response", "simulate_endpoint", "expected_race_time",
+    }
+    for entry in suite["results"]:
+        assert entry["agent_laps_per_s"] > 0
+        if entry["bench"] in ("run_simulation", "serialize_response"):
+            assert entry["peak_bytes"] > 0
+    payloads = [e["payload_bytes"] for e in suite["results"] if e["bench"] == "serialize_response"]
+    assert all(p["records_json"] > p["columnar_json"] > 0 for p in payloads)
+
+    # Identical results never regress against themselves
+    assert compare(suite, suite) == []
+
+
+def test_compare_flags_throughput_and_memory_regressions():
+    baseline = {"results": [
+        {"bench": "run_simulation", "params": {"agents": 3}, "agent_laps_per_s": 1000.0, "peak_bytes": 100},
+        {"bench": "decide_action", "params": {"agents": 3}, "agent_laps_per_s": 1000.0},
+    ]}
+    current = {"results": [
+        {"bench": "run_simulation", "params": {"agents": 3}, "agent_laps_per_s": 700.0, "peak_bytes": 200},
+        {"bench": "decide_action", "params": {"agents": 3}, "agent_laps_per_s": 950.0},
+        {"bench": "decide_action", "params": {"agents": 20}, "agent_laps_per_s": 1.0},  # not in baseline
+    ]}
+    regressions = compare(current, baseline, throughput_drop=0.2, memory_growth=0.25)
+    assert len(regressions) == 2
+    assert all(line.startswith("run_simulation") for line in regressions)
+
+
+if __name__ == "__main__":
+    test_smoke_grid_reports_throughput_memory_and_payloads()
+    test_compare_flags_throughput_and_memory_regressions()
+    print("[OK] All benchmark suite tests passed!")
@@ -0,0 +1,93 @@
+"""
+Tests for what-if branches from a shared race prefix.
+Run from project root: python test_branching.py
+"""
+import sys
+from pathlib import Path
+
+# Add backend and the shared fixtures to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from agent_fixtures import make_agents
+from services.branching import run_branches
+from services.simulation_runner import run_simulation
+
+RACE = {"total_laps": 60, "weather": "dry"}
+
+
+def test_branch_matches_a_full_rerun_with_the_override():
+    agents = make_agents(6)
+    for engine in ("python", "numpy"):
+        result = run_branches(
+            RACE, agents, 40,
+            [{"name": "no change"}, {"overrides": [{"type": "pit", "agent_id": "agent_4", "lap": 45}]}],
+            seed=5, engine=engine, workers=1,
+        )
+        unchanged, early_pit = result["branches"]
+        assert unchanged["summary"] == result["baseline"]["summary"]
+        assert all(d == {"total_time": 0.0, "position": 0, "pit_stops": 0} for d in unchanged["deltas"].values())
+
+        rerun = run_simulation(RACE, agents, seed=5, engine=engine,
+                               include_timeline=False, event_types=(),
+                               action_overrides={45: {3: "pit_stop"}})
+        assert early_pit["summary"] == rerun["summary"]
+        assert early_pit["name"] == "branch_2"
+
+
+def test_trait_and_action_overrides_and_parallel_pool():
+    agents = make_agents(5)
+    branches = [
+        {"overrides": [{"type": "traits", "agent_id": "agent_2", "traits": {"aggression": 1.0, "risk_taking": 0.0}}]},
+        {"overrides": [{"type": "action", "agent_id": "agent_3", "lap": 50, "action": "conserve_high"}]},
+        {"overrides": [{"type": "pit", "agent_id": "agent_1", "lap": 41}, {"type": "pit", "agent_id": "agent_5", "lap": 59}]},
+    ]
+    inline = run_branches(RACE, agents, 40, branches, seed=9, workers=1)
+    pooled = run_branches(RACE, agents, 40, branches, seed=9, workers=2)
+    assert inline == pooled
+    assert any(d["total_time"] != 0.0 for b in inline["branches"] for d in b["deltas"].values())
+
+
+def test_invalid_overrides_are_rejected():
+    agents = make_agents(3)
+    bad = [
+        {"type": "pit", "agent_id": "missing", "lap": 45},
+        {"type": "pit", "agent_id": "agent_1", "lap": 40},  # not after the fork
+        {"type": "action", "agent_id": "agent_1", "lap": 45, "action": "teleport"},
+        {"type": "traits", "agent_id": "agent_1", "traits": {"learning_rate": 0.5}},
+        {"type": "refuel", "agent_id": "agent_1"},
+    ]
+    for override in bad:
+        try:
+            run_branches(RACE, agents, 40, [{"overrides": [override]}], seed=1, workers=1)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {override}")
+
+
+def test_branch_endpoint():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    body = {
+        "race": RACE, "agents": make_agents(4), "seed": 3, "fork_lap": 40,
+        "branches": [{"name": "early", "overrides": [{"type": "pit", "agent_id": "agent_2", "lap": 43}]}],
+    }
+    response = client.post("/api/simulate/branch", json=body)
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["fork_lap"] == 40 and data["branches"][0]["name"] == "early"
+    assert set(data["branches"][0]["deltas"]) == {"agent_1", "agent_2", "agent_3", "agent_4"}
+
+    assert client.post("/api/simulate/branch", json={**body, "fork_lap": 60}).status_code == 400
+    unknown = {**body, "branches": [{"overrides": [{"type": "pit", "agent_id": "zz", "lap": 43}]}]}
+    assert client.post("/api/simulate/branch", json=unknown).status_code == 400
+
+
+if __name__ == "__main__":
+    test_branch_matches_a_full_rerun_with_the_override()
+    test_trait_and_action_overrides_and_parallel_pool()
+    test_invalid_overrides_are_rejected()
+    test_branch_endpoint()
+    print("[OK] All branching tests passed!")
@@ -0,0 +1,92 @@
+"""
+Tests for the columnar and .npz result formats and output selection.
+Run from project root: python test_columnar.py
+"""
+import sys
+import io
+import json
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import numpy as np
+
+from services.simulation_runner import run_simulation
+from services.agent_logic import ACTIONS
+from services.columnar import to_npz_bytes
+
+RACE = {"total_laps": 40, "weather": "rain", "track_id": "test_track"}
+AGENTS = [
+    {"id": f"agent_{i+1}", "name": f"Agent {i+1}", "aggression": 0.2 + 0.07 * i,
+     "risk_taking": 0.9 - 0.06 * i, "tyre_management": 0.3 + 0.05 * i,
+     "pit_bias": 0.65 - 0.04 * i, "weather_sensitivity": 0.8}
+    for i in range(10)
+]
+
+
+def _rebuild_timeline(col):
+    ids = col["agents"]["id"]
+    t = col["timeline"]
+    return [
+        {
+            "lap": t["lap"][i],
+            "agent_id": ids[t["agent"][i]],
+            "position": t["position"][i],
+            "lap_time": t["lap_time"][i],
+            "tyre_wear": t["tyre_wear"][i],
+            "action": col["actions"][t["action"][i]],
+        }
+        for i in range(len(t["lap"]))
+    ]
+
+
+def test_columnar_matches_records():
+    for engine in ("python", "numpy"):
+        records = run_simulation(RACE, AGENTS, seed=5, engine=engine)
+        columnar = run_simulation(RACE, AGENTS, seed=5, engine=engine, layout="columnar")
+
+        assert columnar["summary"] == records["summary"]
+        assert columnar["actions"] == list(ACTIONS)
+        assert _rebuild_timeline(columnar) == records["timeline"]
+        for event_type, table in columnar["events"].items():
+            expected = [e for e in records["events"] if e["event_type"] == event_type]
+            assert len(table["lap"]) == len(expected)
+            assert table["timestamp"] == [e["timestamp"] for e in expected]
+
+
+def test_npz_round_trip():
+    columnar = run_simulation(RACE, AGENTS, seed=2, layout="columnar")
+    archive = np.load(io.BytesIO(to_npz_bytes(columnar)))
+
+    assert archive["agents.id"].tolist() == columnar["agents"]["id"]
+    assert archive["timeline.lap_time"].tolist() == columnar["timeline"]["lap_time"]
+    assert archive["timeline.action"].dtype == np.uint8
+    assert archive["events.prl_update.delta_aggression"].tolist() == \
+        columnar["events"]["prl_update"]["delta_aggression"]
+    assert json.loads(str(archive["summary"])) == columnar["summary"]
+
+
+def test_output_selection_skips_unrequested_outputs():
+    for engine in ("python", "numpy"):
+        full = run_simulation(RACE, AGENTS, seed=8, engine=engine)
+        summary_only = run_simulation(RACE, AGENTS, seed=8, engine=engine,
+                                      include_timeline=False, event_types=())
+        pits_only = run_simulation(RACE, AGENTS, seed=8, engine=engine,
+                                   include_timeline=False, event_types=["pit_stop"])
+
+        assert summary_only["summary"] == full["summary"] == pits_only["summary"]
+        assert summary_only["timeline"] == [] and summary_only["events"] == []
+        assert pits_only["events"] == [e for e in full["events"] if e["event_type"] == "pit_stop"]
+
+        columnar = run_simulation(RACE, AGENTS, seed=8, engine=engine, layout="columnar",
+                                  event_types=["overtake"])
+        assert list(columnar["events"]) == ["overtake"]
+        assert len(columnar["timeline"]["lap"]) == len(full["timeline"])
+
+
+if __name__ == "__main__":
+    test_columnar_matches_records()
+    test_npz_round_trip()
+    test_output_selection_skips_unrequested_outputs()
+    print("[OK] All columnar format tests passed!")
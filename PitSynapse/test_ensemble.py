@@ -0,0 +1,49 @@
+"""
+Tests for Monte Carlo ensembles.
+Run from project root: python test_ensemble.py
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.ensemble import run_ensemble
+from services.process_pool import get_pool, shutdown_pool
+
+RACE = {"total_laps": 12, "weather": "dry", "track_id": "test_track"}
+AGENTS = [
+    {"id": "agent_1", "name": "Aggressive Racer", "aggression": 0.9, "risk_taking": 0.85, "tyre_management": 0.4, "pit_bias": 0.3},
+    {"id": "agent_2", "name": "Tyre Whisperer", "aggression": 0.4, "risk_taking": 0.35, "tyre_management": 0.95, "pit_bias": 0.4},
+    {"id": "agent_3", "name": "Balanced Racer", "aggression": 0.55, "risk_taking": 0.5, "tyre_management": 0.65, "pit_bias": 0.5},
+]
+
+
+def test_distributions_are_consistent():
+    result = run_ensemble(RACE, AGENTS, runs=40, seed=1, workers=1)
+
+    assert result["runs"] == 40
+    assert abs(sum(result["win_probability"].values()) - 1.0) < 1e-9
+    for aid, hist in result["position_histogram"].items():
+        assert len(hist) == len(AGENTS)
+        assert sum(hist) == 40
+        assert result["win_probability"][aid] == hist[0] / 40
+    for dist in result["pit_stop_distribution"].values():
+        assert sum(dist.values()) == 40
+    q = result["fastest_lap_quantiles"]
+    assert q["p5"] <= q["p50"] <= q["p95"]
+
+
+def test_process_pool_matches_inline():
+    inline = run_ensemble(RACE, AGENTS, runs=24, seed=9, workers=1)
+    pooled = run_ensemble(RACE, AGENTS, runs=24, seed=9, workers=2)
+    # Workers come from a forkserver / spawn context, never a fork of the server
+    assert get_pool()._mp_context.get_start_method() in ("forkserver", "spawn")
+    shutdown_pool()
+    assert inline == pooled
+
+
+if __name__ == "__main__":
+    test_distributions_are_consistent()
+    test_process_pool_matches_inline()
+    print("[OK] All ensemble tests passed!")
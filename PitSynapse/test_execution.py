@@ -0,0 +1,80 @@
+"""
+Tests for the simulation execution backends (thread / process / inline).
+Run from project root: python test_execution.py
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.execution import SimulationExecutor, pack_request, unpack_request, render_result, records_body
+from services.simulation_runner import run_simulation
+
+RACE = {"total_laps": 12, "weather": "rain", "track_id": "default"}
+AGENTS = [
+    {"id": "a", "name": "A", "aggression": 0.7, "risk_taking": 0.6, "tyre_management": 0.5,
+     "pit_bias": 0.4, "weather_sensitivity": 0.5},
+    {"id": None, "name": None, "aggression": 0.4, "risk_taking": 0.3, "tyre_management": 0.8,
+     "pit_bias": 0.6, "weather_sensitivity": 0.2},
+]
+OPTIONS = {"seed": 9, "engine": "python", "layout": "records", "event_types": None}
+
+
+def test_packed_request_round_trip():
+    packed = pack_request(RACE, AGENTS, **OPTIONS)
+    assert all(not isinstance(value, dict) for value in packed)
+    race_params, agent_settings, options = unpack_request(packed)
+    assert race_params == RACE
+    assert options == OPTIONS
+    assert run_simulation(race_params, agent_settings, **options) == run_simulation(RACE, AGENTS, **OPTIONS)
+
+
+def test_every_mode_returns_the_same_body():
+    expected = render_result(run_simulation(RACE, AGENTS, **OPTIONS), "records")
+    for mode in ("inline", "thread", "process"):
+        executor = SimulationExecutor(mode=mode)
+        try:
+            executor.start()
+            body, _ = asyncio.run(executor.render(RACE, AGENTS, "records", **OPTIONS))
+        finally:
+            executor.shutdown()
+        assert body == expected, mode
+
+
+def test_render_serves_the_worker_encoded_body():
+    for fmt, layout in (("records", "records"), ("columnar", "columnar"), ("npz", "columnar")):
+        options = {**OPTIONS, "layout": layout}
+        result = run_simulation(RACE, AGENTS, **options)
+        expected = render_result(result, fmt)
+        kept = records_body(result) if fmt == "records" else result
+        for mode in ("inline", "process"):
+            executor = SimulationExecutor(mode=mode)
+            try:
+                body, none = asyncio.run(executor.render(RACE, AGENTS, fmt, **options))
+                again, objects = asyncio.run(executor.render(RACE, AGENTS, fmt, keep_result=True, **options))
+            finally:
+                executor.shutdown()
+            assert body == again == expected and none is None, (fmt, mode)
+            # Decoded only on request; equal to the result after a JSON round trip
+            expected_objects = result if mode == "inline" else json.loads(json.dumps(kept))
+            assert objects == expected_objects, (fmt, mode)
+
+
+def test_unknown_mode_is_rejected():
+    try:
+        SimulationExecutor(mode="gpu")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown execution mode was accepted")
+
+
+if __name__ == "__main__":
+    test_packed_request_round_trip()
+    test_every_mode_returns_the_same_body()
+    test_render_serves_the_worker_encoded_body()
+    test_unknown_mode_is_rejected()
+    print("[OK] All execution tests passed!")
@@ -0,0 +1,197 @@
+"""
+Tests for the concurrent, disk-cached Ergast fetch in data/f1_ingest.py,
+against a local stub server.
+Run from project root: python test_f1_ingest.py
+"""
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the ingest scripts to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+
+import f1_ingest
+from f1_ingest import FetchError, fetch_json, fetch_races, compute_base_stats, parse_rounds
+
+
+def _race_body(resource, round_num):
+    race = {"season": "2024", "round": str(round_num)}
+    if resource == "laps":
+        race["Circuit"] = {"circuitId": f"track{round_num % 2}"}
+        race["Laps"] = [{"number": "1", "Timings": [{"driverId": "a", "time": f"1:3{round_num}.000"}]}]
+    else:
+        race["PitStops"] = [{"driverId": "a", "lap": "1", "duration": f"2{round_num}.0"}]
+    return {"MRData": {"RaceTable": {"Races": [race]}}}
+
+
+# 200 bodies without the Ergast race shape, by round
+MALFORMED = {
+    20: {"MRData": {"RaceTable": {"Races": None}}},
+    21: [{"MRData": {}}],
+    22: {"MRData": {"RaceTable": {"Races": [{"Laps": [{"number": "1"}]}]}}},  # no Timings
+    23: {"MRData": {"RaceTable": {"Races": [{"Laps": [{"Timings": []}]}]}}},  # no lap number
+    24: {"MRData": {"RaceTable": {"Races": {"0": {}}}}},
+}
+
+
+class _Stub:
+    """
+    Ergast-like server: /<season>/<round>/{laps,pitstops}.json; round 3 fails
+    twice, round 9 is missing, MALFORMED rounds answer 200 with a bad body.
+    """
+
+    def __init__(self):
+        self.hits = Counter()
+        self.lock = threading.Lock()
+        self.inflight = self.max_inflight = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                with stub.lock:
+                    stub.hits[path] += 1
+                    hits = stub.hits[path]
+                    stub.inflight += 1
+                    stub.max_inflight = max(stub.max_inflight, stub.inflight)
+                try:
+                    _, season, round_num, resource = path.rsplit("/", 3)
+                    round_num = int(round_num)
+                    if round_num == 9:
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    if round_num == 3 and hits <= 2:
+                        self.send_response(503)
+                        self.end_headers()
+                        return
+                    payload = MALFORMED.get(round_num) or _race_body(resource.split(".")[0], round_num)
+                    body = json.dumps(payload).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with stub.lock:
+                        stub.inflight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/f1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_bulk_fetch_retries_and_caches():
+    stub = _Stub()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            pairs = [(2024, r) for r in parse_rounds("1-4,9")]
+            races, failures = fetch_races(pairs, max_workers=2, base_url=stub.url, cache_dir=tmp, backoff=0)
+            assert set(races) == {(2024, r) for r in (1, 2, 3, 4)}
+            assert list(failures) == [(2024, 9)] and "404" in failures[(2024, 9)]
+            assert races[(2024, 3)]["laps"][0]["Timings"][0]["time"] == "1:33.000"
+            assert races[(2024, 3)]["circuit"] == "track1"
+            assert stub.hits["/api/f1/2024/3/laps.json"] == 3  # two 503s, then success
+            assert stub.hits["/api/f1/2024/9/laps.json"] == 1  # 4xx is not retried
+            assert stub.max_inflight <= 2
+
+            stats = compute_base_stats(
+                [lap for race in races.values() for lap in race["laps"]],
+                [pit for race in races.values() for pit in race["pits"]],
+            )
+            assert stats["base_lap_time"] == 92.5 and stats["avg_pit_loss"] == 22.5
+        finally:
+            stub.close()
+
+        # Re-run with the server gone: everything cached is served offline
+        again, failures = fetch_races(pairs, base_url=stub.url, cache_dir=tmp, offline=True)
+        assert again == races and list(failures) == [(2024, 9)]
+        assert len(list(Path(tmp, "objects").iterdir())) == 8  # one object per distinct body
+
+
+def test_malformed_bodies_fail_only_their_race():
+    stub = _Stub()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            pairs = [(2024, 1)] + [(2024, r) for r in MALFORMED]
+            races, failures = fetch_races(pairs, max_workers=2, base_url=stub.url, cache_dir=tmp, backoff=0)
+        finally:
+            stub.close()
+        assert list(races) == [(2024, 1)]
+        assert sorted(failures) == [(2024, r) for r in MALFORMED]
+        assert "Timings" in failures[(2024, 22)] and "'number'" in failures[(2024, 23)]
+
+        # What is accepted always loads into the lap store
+        with f1_ingest.LapStore(Path(tmp) / "laps.sqlite") as store:
+            store.add_race(2024, 1, races[(2024, 1)]["laps"], races[(2024, 1)]["pits"], races[(2024, 1)]["circuit"])
+            assert store.races() == [(2024, 1, "track1")]
+
+
+def test_cache_is_content_addressed():
+    stub = _Stub()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            url = f"{stub.url}/2024/1/laps.json"
+            first = fetch_json(url, cache_dir=tmp)
+            # Another url with the same body shares the stored object
+            assert fetch_json(url + "?limit=2000", cache_dir=tmp) == first
+            assert len(list(Path(tmp, "objects").iterdir())) == 1
+            assert len(list(Path(tmp, "refs").iterdir())) == 2
+
+            # A damaged object is a cache miss, not bad data
+            obj = next(Path(tmp, "objects").iterdir())
+            obj.write_bytes(b"{}")
+            assert fetch_json(url, cache_dir=tmp) == first
+            assert stub.hits["/api/f1/2024/1/laps.json"] == 3
+        finally:
+            stub.close()
+
+        try:
+            fetch_json(f"{stub.url}/2024/2/laps.json", cache_dir=tmp, offline=True)
+        except FetchError:
+            pass
+        else:
+            raise AssertionError("offline fetch of an uncached url succeeded")
+
+
+def test_connection_errors_are_retried_then_reported():
+    stub = _Stub()
+    url = stub.url
+    stub.close()
+    with tempfile.TemporaryDirectory() as tmp:
+        races, failures = fetch_races([(2024, 1)], base_url=url, cache_dir=tmp, retries=2, backoff=0)
+        assert races == {} and "after 3 attempts" in failures[(2024, 1)]
+
+        out = Path(tmp) / "profiles.json"
+        f1_ingest.main(["--rounds", "1", "--offline", "--cache-dir", tmp, "--output", str(out),
+                        "--store", str(Path(tmp) / "laps.sqlite")])
+        profiles = json.loads(out.read_text())
+        assert len(profiles) == f1_ingest.NUM_AGENTS and profiles[0]["base_lap_time"] == 90.0
+
+
+def test_importable_from_the_repo_root():
+    root = Path(__file__).parent.parent
+    code = "import data.f1_ingest as m; print(m.LapStore.__name__)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+    assert out.returncode == 0 and out.stdout.strip() == "LapStore", out.stderr
+
+
+if __name__ == "__main__":
+    test_bulk_fetch_retries_and_caches()
+    test_malformed_bodies_fail_only_their_race()
+    test_cache_is_content_addressed()
+    test_connection_errors_are_retried_then_reported()
+    test_importable_from_the_repo_root()
+    print("[OK] All f1 ingest tests passed!")
@@ -0,0 +1,173 @@
+"""
+Tests for the asynchronous job pool and the /api/jobs endpoints.
+Run from project root: python test_jobs.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.jobs import JobManager, QueueFull
+from services.simulation_runner import run_simulation
+
+RACE = {"total_laps": 20, "weather": "dry"}
+AGENTS = [
+    {"id": "a", "aggression": 0.7, "risk_taking": 0.6, "tyre_management": 0.5, "pit_bias": 0.4},
+    {"id": "b", "aggression": 0.4, "risk_taking": 0.3, "tyre_management": 0.8, "pit_bias": 0.6},
+]
+
+
+def _wait(manager, job, statuses=("done", "failed", "cancelled"), timeout=10.0):
+    deadline = time.time() + timeout
+    while job.status not in statuses:
+        assert time.time() < deadline, f"job stuck in {job.status}"
+        time.sleep(0.005)
+    return job
+
+
+def _blocking_call(release: threading.Event, started: threading.Event):
+    def call(progress):
+        started.set()
+        while not release.wait(0.005):
+            progress(0)  # raises once the job is cancelled
+        return {}
+    return call
+
+
+def test_job_runs_with_progress():
+    manager = JobManager(workers=1)
+    seen = []
+
+    def call(progress):
+        def record(laps):
+            seen.append(laps)
+            progress(laps)
+        return run_simulation(RACE, AGENTS, seed=3, progress=record)
+
+    job = _wait(manager, manager.submit(call, total_laps=20))
+    assert job.status == "done", job.error
+    assert job.laps_completed == 20
+    assert seen == list(range(21))
+    assert job.result == run_simulation(RACE, AGENTS, seed=3)
+    manager.shutdown()
+
+
+def test_full_queue_is_rejected():
+    manager = JobManager(workers=1, max_queued=2)
+    release, started = threading.Event(), threading.Event()
+    running = manager.submit(_blocking_call(release, started), total_laps=1)
+    assert started.wait(5)
+
+    queued = [manager.submit(lambda progress: {}, total_laps=1) for _ in range(2)]
+    try:
+        manager.submit(lambda progress: {}, total_laps=1)
+    except QueueFull:
+        pass
+    else:
+        raise AssertionError("submit past the queue limit was accepted")
+    assert manager.stats()["rejected"] == 1
+
+    release.set()
+    for job in [running] + queued:
+        assert _wait(manager, job).status == "done"
+    manager.shutdown()
+
+
+def test_cancelled_queued_job_frees_its_place():
+    manager = JobManager(workers=1, max_queued=2)
+    release, started = threading.Event(), threading.Event()
+    running = manager.submit(_blocking_call(release, started), total_laps=1)
+    assert started.wait(5)
+
+    queued = [manager.submit(lambda progress: {"ran": True}, total_laps=1) for _ in range(2)]
+    manager.cancel(queued[0].id)
+    assert manager.stats()["queue_depth"] == 1
+    # At capacity again after one resubmit; the cancelled entry does not count
+    resubmitted = manager.submit(lambda progress: {"ran": True}, total_laps=1)
+    try:
+        manager.submit(lambda progress: {}, total_laps=1)
+    except QueueFull:
+        pass
+    else:
+        raise AssertionError("submit past the queue limit was accepted")
+
+    release.set()
+    for job in (running, queued[1], resubmitted):
+        assert _wait(manager, job).status == "done"
+    assert manager.get(queued[0].id).result is None
+    assert manager.stats()["queue_depth"] == 0
+    manager.shutdown()
+
+
+def test_cancel_running_and_queued_jobs():
+    manager = JobManager(workers=1)
+    release, started = threading.Event(), threading.Event()
+    running = manager.submit(_blocking_call(release, started), total_laps=1)
+    assert started.wait(5)
+    queued = manager.submit(lambda progress: {"ran": True}, total_laps=1)
+
+    assert manager.cancel(queued.id).status == "cancelled"
+    manager.cancel(running.id)
+    assert _wait(manager, running).status == "cancelled"
+    assert manager.get(queued.id).result is None
+    assert manager.cancel("missing") is None
+    manager.shutdown()
+
+
+def test_retention_ttl_and_memory_cap():
+    manager = JobManager(workers=1, ttl_seconds=0.2, max_bytes=200)
+    payload = {"blob": "x" * 80}
+    first = _wait(manager, manager.submit(lambda progress: payload, total_laps=1))
+    second = _wait(manager, manager.submit(lambda progress: payload, total_laps=1))
+    third = _wait(manager, manager.submit(lambda progress: payload, total_laps=1))
+    # ~90 bytes each: the oldest result is evicted to stay under 200 bytes
+    assert manager.get(first.id) is None
+    assert manager.get(second.id) is not None and manager.get(third.id) is not None
+    assert manager.stats()["evicted"] == 1
+
+    too_big = _wait(manager, manager.submit(lambda progress: {"blob": "x" * 500}, total_laps=1))
+    assert too_big.status == "failed" and too_big.result is None
+
+    time.sleep(0.25)
+    assert manager.get(second.id) is None and manager.get(too_big.id) is None
+    manager.shutdown()
+
+
+def test_jobs_endpoints():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    body = {"race": RACE, "agents": AGENTS, "seed": 5}
+    response = client.post("/api/jobs", json=body)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    deadline = time.time() + 10
+    while True:
+        status = client.get(f"/api/jobs/{job_id}").json()
+        if status["status"] not in ("queued", "running"):
+            break
+        assert time.time() < deadline
+        time.sleep(0.01)
+    assert status["status"] == "done"
+    assert status["laps_completed"] == status["total_laps"] == 20
+    direct = client.post("/api/simulate", json=body).json()
+    assert status["result"]["summary"] == direct["summary"]
+
+    assert client.get("/api/jobs/unknown").status_code == 404
+    assert client.delete("/api/jobs/unknown").status_code == 404
+    assert "pitsynapse_jobs{" in client.get("/metrics").text
+
+
+if __name__ == "__main__":
+    test_job_runs_with_progress()
+    test_full_queue_is_rejected()
+    test_cancelled_queued_job_frees_its_place()
+    test_cancel_running_and_queued_jobs()
+    test_retention_ttl_and_memory_cap()
+    test_jobs_endpoints()
+    print("[OK] All job tests passed!")
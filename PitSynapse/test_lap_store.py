@@ -0,0 +1,105 @@
+"""
+Tests for the historical lap/pit store in data/lap_store.py.
+Run from project root: python test_lap_store.py
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the ingest scripts and backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from lap_store import LapStore, parse_times
+from services import lap_history
+
+
+def _race(drivers, laps, base, pit_lap=None):
+    """Ergast-shaped Laps / PitStops: driver i laps in base + i seconds, +5s on in/out laps."""
+    out = []
+    for n in range(1, laps + 1):
+        timings = []
+        for i, driver in enumerate(drivers):
+            seconds = base + i + (5 if pit_lap in (n, n - 1) else 0) + (3 if n == 1 else 0)
+            timings.append({"driverId": driver, "position": str(i + 1),
+                            "time": f"{int(seconds // 60)}:{seconds % 60:06.3f}"})
+        out.append({"number": str(n), "Timings": timings})
+    pits = [{"driverId": d, "lap": str(pit_lap), "stop": "1", "duration": f"{21 + i}.5"}
+            for i, d in enumerate(drivers)] if pit_lap else []
+    return out, pits
+
+
+def test_parse_times_is_vectorized_and_lenient():
+    parsed = parse_times(["1:32.456", "23.917", " 1:05.000 ", "", None, "DNF", "1:2:3", "2:3.4.5"])
+    assert np.allclose(parsed[:3], [92.456, 23.917, 65.0])
+    assert np.isnan(parsed[3:]).all()
+    assert parse_times([]).shape == (0,)
+
+
+def test_store_queries():
+    with tempfile.TemporaryDirectory() as tmp:
+        with LapStore(Path(tmp) / "laps.sqlite") as store:
+            laps, pits = _race(["ver", "ham"], 10, 90.0, pit_lap=5)
+            store.add_race(2024, 1, laps, pits, circuit="bahrain")
+            laps, pits = _race(["ver", "ham"], 8, 100.0)
+            store.add_race(2024, 2, laps, pits, circuit="jeddah")
+            assert store.races() == [(2024, 1, "bahrain"), (2024, 2, "jeddah")]
+
+            # Clean pace drops lap 1 and the in/out laps (5, 6)
+            pace = store.base_pace(circuit="bahrain", driver="ham")
+            assert pace["count"] == 7 and pace["mean"] == pace["p50"] == 91.0 and pace["std"] == 0
+            raw = store.base_pace(clean=False, circuit="bahrain", driver="ham")
+            assert raw["count"] == 10 and raw["mean"] == 91.0 + 13 / 10
+
+            by_circuit = store.base_pace_by("circuit", driver="ver")
+            assert by_circuit["bahrain"]["mean"] == 90.0 and by_circuit["jeddah"]["mean"] == 100.0
+            assert set(store.base_pace_by("driver")) == {"ham", "ver"}
+
+            assert store.pit_loss(circuit="bahrain") == {
+                "count": 2, "mean": 22.0, "std": 0.5, "p10": 21.6, "p50": 22.0, "p90": 22.4,
+            }
+            assert store.pit_loss_by("driver")["ham"]["mean"] == 22.5
+            assert store.pit_loss(circuit="jeddah")["count"] == 0
+
+            # Re-adding a race replaces it
+            laps, pits = _race(["ver"], 4, 80.0)
+            store.add_race(2024, 1, laps, pits, circuit="bahrain")
+            assert store.base_pace(circuit="bahrain")["count"] == 3
+            assert store.pit_loss(circuit="bahrain")["count"] == 0
+
+            for bad in (lambda: store.base_pace(track="x"), lambda: store.base_pace_by("lap")):
+                try:
+                    bad()
+                except ValueError:
+                    continue
+                raise AssertionError("accepted an unknown filter / group key")
+
+            # Filtered queries are served from the indexes, not table scans
+            plan = store._conn.execute(
+                "EXPLAIN QUERY PLAN SELECT time FROM laps WHERE circuit = ? AND driver = ?", ("x", "y")
+            ).fetchall()
+            assert any("USING INDEX" in row[-1] for row in plan)
+
+
+def test_backend_reads_distributions_through_the_adapter():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "laps.sqlite"
+        assert not lap_history.available(path) and lap_history.track_distributions("bahrain", path=path) is None
+        with LapStore(path) as store:
+            laps, pits = _race(["ver", "ham"], 10, 90.0, pit_lap=5)
+            store.add_race(2024, 1, laps, pits, circuit="bahrain")
+
+        found = lap_history.track_distributions("bahrain", path=path)
+        assert found["base_pace"]["count"] == 14 and found["base_pace"]["p50"] == 90.5
+        assert found["pit_loss"]["mean"] == 22.0
+        assert lap_history.track_distributions("bahrain", "ham", path=path)["base_pace"]["mean"] == 91.0
+        assert lap_history.track_distributions("monaco", path=path)["base_pace"]["count"] == 0
+
+
+if __name__ == "__main__":
+    test_parse_times_is_vectorized_and_lenient()
+    test_store_queries()
+    test_backend_reads_distributions_through_the_adapter()
+    print("[OK] All lap store tests passed!")
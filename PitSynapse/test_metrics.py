@@ -0,0 +1,91 @@
+"""
+Tests for the Prometheus metrics registry and /metrics endpoint.
+Run from project root: python test_metrics.py
+"""
+import sys
+import threading
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.metrics import Metrics
+
+
+def _sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not found")
+
+
+def test_concurrent_updates_are_summed_across_shards():
+    registry = Metrics({
+        "jobs_total": ("counter", "Jobs.", None),
+        "latency_seconds": ("histogram", "Latency.", (0.1, 1.0)),
+    })
+
+    def work():
+        for _ in range(1000):
+            registry.inc("jobs_total", {"kind": "a"})
+            registry.observe("latency_seconds", 0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert _sample(text, 'jobs_total{kind="a"}') == 8000
+    assert _sample(text, 'latency_seconds_bucket{le="0.1"}') == 0
+    assert _sample(text, 'latency_seconds_bucket{le="1"}') == 8000
+    assert _sample(text, 'latency_seconds_bucket{le="+Inf"}') == 8000
+    assert _sample(text, "latency_seconds_count") == 8000
+    assert _sample(text, "latency_seconds_sum") == 4000
+
+
+def test_gauges_and_collectors():
+    registry = Metrics({"in_flight": ("gauge", "In flight.", None)})
+    registry.inc("in_flight")
+    done = threading.Thread(target=registry.inc, args=("in_flight", None, -1))
+    done.start()
+    done.join()
+    registry.add_collector(lambda: [("cache_entries", "gauge", "Entries.", {}, 3)])
+
+    text = registry.render()
+    assert _sample(text, "in_flight") == 0
+    assert _sample(text, "cache_entries") == 3
+
+
+def test_metrics_endpoint():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    agents = [
+        {"id": f"agent_{i}", "aggression": 0.5, "risk_taking": 0.5,
+         "tyre_management": 0.5, "pit_bias": 0.5}
+        for i in range(3)
+    ]
+    response = client.post("/api/simulate", json={"race": {"total_laps": 5}, "agents": agents})
+    assert response.status_code == 200
+    assert client.get("/api/jobs/missing").status_code == 404
+
+    scrape = client.get("/metrics")
+    assert scrape.status_code == 200
+    assert scrape.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = scrape.text
+    assert 'pitsynapse_http_request_duration_seconds_count{method="POST",route="/api/simulate",status="200"}' in text
+    assert 'route="/api/jobs/{job_id}",status="404"}' in text
+    assert _sample(text, 'pitsynapse_simulation_agent_laps_total{engine="python"}') >= 15
+    assert "pitsynapse_cache_misses_total" in text
+    assert _sample(text, 'pitsynapse_simulations_in_flight{kind="simulate"}') == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_updates_are_summed_across_shards()
+    test_gauges_and_collectors()
+    test_metrics_endpoint()
+    print("[OK] All metrics tests passed!")
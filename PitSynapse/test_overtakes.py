@@ -0,0 +1,99 @@
+"""
+Tests for pairwise overtake detection.
+Run from project root: python test_overtakes.py
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import numpy as np
+
+from services.overtakes import detect_overtakes, default_max_overtakes
+from services.simulation_runner import run_simulation
+
+
+def _brute_force(order, prev_position):
+    new_position = np.empty(len(order), dtype=int)
+    new_position[order] = np.arange(1, len(order) + 1)
+    passes = [
+        (a, b) for a in order for b in order
+        if prev_position[a] > prev_position[b] and new_position[a] < new_position[b]
+    ]
+    return [(int(a), int(b)) for a, b in passes]
+
+
+def test_reports_every_pairwise_pass():
+    rng = np.random.default_rng(1)
+    for n in (1, 2, 3, 7, 16, 33, 100):
+        for _ in range(10):
+            prev_position = rng.permutation(n) + 1
+            order = rng.permutation(n)
+            agent, overtaken, before, after = detect_overtakes(order, prev_position)
+            assert list(zip(agent.tolist(), overtaken.tolist())) == _brute_force(order, prev_position)
+            assert before.tolist() == prev_position[agent].tolist()
+            # A car can pass others without a net gain, so only check the new position
+            assert [order.tolist().index(a) + 1 for a in agent.tolist()] == after.tolist()
+
+
+def test_large_field_adjacent_swaps():
+    # Output-sensitive: 100k cars, 50k passes, no per-passer rescans
+    n = 100_000
+    order = np.arange(n)
+    order[0::2], order[1::2] = np.arange(1, n, 2), np.arange(0, n, 2)
+    agent, overtaken, before, after = detect_overtakes(order, np.arange(1, n + 1))
+    assert agent.tolist() == list(range(1, n, 2)) and overtaken.tolist() == list(range(0, n, 2))
+    assert (after == before - 1).all()
+    agent, overtaken, _, _ = detect_overtakes(order, np.arange(1, n + 1), max_events=3, sampling="spread")
+    assert overtaken.tolist() == (agent - 1).tolist() and agent.tolist()[0] == 1
+
+
+def test_cap_and_spread_sampling():
+    rng = np.random.default_rng(2)
+    prev_position = rng.permutation(50) + 1
+    order = rng.permutation(50)
+    every = _brute_force(order, prev_position)
+    assert len(every) > 40
+
+    agent, overtaken, _, _ = detect_overtakes(order, prev_position, max_events=10)
+    assert list(zip(agent.tolist(), overtaken.tolist())) == every[:10]
+
+    agent, overtaken, _, _ = detect_overtakes(order, prev_position, max_events=10, sampling="spread")
+    expected = [every[(i * len(every)) // 10] for i in range(10)]
+    assert list(zip(agent.tolist(), overtaken.tolist())) == expected
+
+    assert detect_overtakes(order, prev_position, max_events=0)[0].size == 0
+
+
+def test_runner_caps_overtakes_per_lap():
+    agents = [{"id": f"agent_{i+1}", "aggression": (i % 10) / 10} for i in range(40)]
+    for engine in ("python", "numpy"):
+        result = run_simulation(
+            {"total_laps": 10}, agents, seed=4, engine=engine,
+            event_types=["overtake"], max_overtakes=5, overtake_sampling="spread"
+        )
+        per_lap = {}
+        for event in result["events"]:
+            per_lap[event["timestamp"]] = per_lap.get(event["timestamp"], 0) + 1
+        assert per_lap and max(per_lap.values()) <= 5
+
+
+def test_default_cap_scales_with_field():
+    assert default_max_overtakes(10) == 100 and default_max_overtakes(1000) == 2000
+    agents = [{"id": f"agent_{i+1}", "aggression": (i % 10) / 10} for i in range(1000)]
+    result = run_simulation({"total_laps": 4}, agents, seed=3, engine="numpy",
+                            include_timeline=False, event_types=["overtake"])
+    per_lap = {}
+    for event in result["events"]:
+        per_lap[event["timestamp"]] = per_lap.get(event["timestamp"], 0) + 1
+    assert per_lap and max(per_lap.values()) == 2000  # capped, and the cap is reached
+
+
+if __name__ == "__main__":
+    test_reports_every_pairwise_pass()
+    test_large_field_adjacent_swaps()
+    test_cap_and_spread_sampling()
+    test_runner_caps_overtakes_per_lap()
+    test_default_cap_scales_with_field()
+    print("[OK] All overtake tests passed!")
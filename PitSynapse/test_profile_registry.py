@@ -0,0 +1,120 @@
+"""
+Tests for the load-once agent profile registry.
+Run from project root: python test_profile_registry.py
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.profile_registry import ProfileRegistry
+from services.simulation_runner import AGENT_PROFILES_PATH
+
+
+def _write(path, data, mtime_ns):
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_repo_profiles_load():
+    registry = ProfileRegistry(AGENT_PROFILES_PATH)
+    raw = json.loads(AGENT_PROFILES_PATH.read_text())["profiles"]
+    assert registry.load() == len(raw)
+    assert registry.ids() == [p["id"] for p in raw]
+    profile = registry.get(raw[0]["id"])
+    assert profile["name"] == raw[0]["name"]
+    assert all(profile["traits"][key] == raw[0][key] for key in ("aggression", "risk_taking", "pit_bias"))
+    assert registry.get("missing") is None and registry.shapes("missing") is None
+
+
+def test_ingest_list_with_ragged_shapes():
+    entries = [
+        {"id": "VER", "name": "Verstappen", "aggression": 0.8, "risk": 0.7,
+         "speed_shape": [[1.0, 2.0, 3.0]] * 4, "tyre_wear_shape": [0.1, 0.2, 0.3, 0.4]},
+        {"id": "HAM", "name": "Hamilton", "aggression": 0.6,
+         "speed_shape": [[4.0, 5.0, 6.0]] * 2, "tyre_wear_shape": [0.5, 0.6]},
+        {"id": "NEW"},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "profiles.json"
+        path.write_text(json.dumps(entries))
+        registry = ProfileRegistry(path)
+        assert registry.load() == 3
+
+        # risk_taking falls back to risk, other traits to the AgentProfile defaults
+        traits = registry.get("HAM")["traits"]
+        assert traits["risk_taking"] == traits["risk"] == 0.5 and traits["tyre_management"] == 0.6
+        assert registry.get("VER")["traits"]["risk_taking"] == 0.7
+
+        ver, ham, new = (registry.shapes(pid) for pid in ("VER", "HAM", "NEW"))
+        assert ver["speed_shape"].shape == (4, 3) and ham["speed_shape"].shape == (2, 3)
+        assert np.allclose(ham["tyre_wear_shape"], [0.5, 0.6])
+        assert len(new["speed_shape"]) == 0 and len(new["tyre_wear_shape"]) == 0
+
+
+def test_hot_reload_and_bad_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "profiles.json"
+        _write(path, {"profiles": [{"id": "a", "aggression": 0.1}]}, 1_000_000_000)
+        registry = ProfileRegistry(path, check_interval=0)
+        assert registry.get("a")["traits"]["aggression"] == 0.1
+
+        _write(path, {"profiles": [{"id": "a", "aggression": 0.2}, {"id": "b"}]}, 2_000_000_000)
+        assert registry.get("a")["traits"]["aggression"] == 0.2
+        assert registry.ids() == ["a", "b"] and registry.stats()["reloads"] == 2
+
+        # A broken file keeps the last good table; load() reports it
+        path.write_text('{"profiles": [')
+        os.utime(path, ns=(3_000_000_000,) * 2)
+        assert registry.ids() == ["a", "b"]
+        try:
+            registry.load()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("load() accepted a broken file")
+
+        # Unchanged mtime and size: no re-parse within the check interval
+        throttled = ProfileRegistry(path, check_interval=3600)
+        _write(path, {"profiles": [{"id": "c"}]}, 4_000_000_000)
+        assert throttled.ids() == ["c"]
+        _write(path, {"profiles": [{"id": "d"}]}, 5_000_000_000)
+        assert throttled.ids() == ["c"]
+
+        path.unlink()
+        assert registry.ids() == []
+
+
+def test_registry_profile_endpoints():
+    from fastapi.testclient import TestClient
+    from main import app
+    from routes.simulation import profile_registry
+
+    client = TestClient(app)
+    pid = profile_registry.ids()[0]
+    assert pid in client.get("/api/profiles").json()["registry"]
+    profile = client.get(f"/api/profiles/{pid}").json()
+    assert profile["meta"] == {"source": "registry"} and profile["shapes"] is None
+    assert set(client.get(f"/api/profiles/{pid}?shapes=true").json()["shapes"]) == {"speed_shape", "tyre_wear_shape"}
+
+    body = {"race": {"total_laps": 10, "weather": "dry"}, "seed": 2,
+            "outputs": {"timeline": False, "events": []},
+            "agents": [{"id": "x", "profile_id": pid},
+                       {"id": "y", "profile_id": pid, "aggression": 0.1}]}
+    response = client.post("/api/simulate", json=body)
+    assert response.status_code == 200, response.text
+    assert set(response.json()["summary"]["pit_stops"]) == {"x", "y"}
+
+
+if __name__ == "__main__":
+    test_repo_profiles_load()
+    test_ingest_list_with_ragged_shapes()
+    test_hot_reload_and_bad_file()
+    test_registry_profile_endpoints()
+    print("[OK] All profile registry tests passed!")
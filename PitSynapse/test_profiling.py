@@ -0,0 +1,45 @@
+"""
+Tests for per-phase timing instrumentation.
+Run from project root: python test_profiling.py
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.profiling import PHASES, phase_totals
+from services.simulation_runner import run_simulation
+
+RACE = {"total_laps": 12, "weather": "dry"}
+AGENTS = [{"id": f"agent_{i+1}", "aggression": i / 10} for i in range(6)]
+
+
+def test_timings_off_by_default():
+    for engine in ("python", "numpy"):
+        assert "metadata" not in run_simulation(RACE, AGENTS, seed=1, engine=engine)
+
+
+def test_phase_breakdown_and_process_totals():
+    for engine in ("python", "numpy"):
+        runs_before = phase_totals.snapshot()["runs"]
+        plain = run_simulation(RACE, AGENTS, seed=1, engine=engine)
+        timed = run_simulation(RACE, AGENTS, seed=1, engine=engine, phase_timings=True)
+
+        metadata = timed.pop("metadata")
+        assert timed == plain  # timing never changes the race
+        assert metadata["engine"] == engine
+        phases = metadata["phase_timings"]["phases"]
+        assert set(phases) == set(PHASES)
+        assert phases["decisions"]["calls"] == 12 * 6
+        assert phases["positions"]["calls"] == 12
+        assert phases["prl"]["calls"] == 11 * 6  # no PRL on lap 1
+        assert phases["summary"]["calls"] == 1
+        assert sum(p["seconds"] for p in phases.values()) <= metadata["phase_timings"]["total_seconds"]
+        assert phase_totals.snapshot()["runs"] == runs_before + 1
+
+
+if __name__ == "__main__":
+    test_timings_off_by_default()
+    test_phase_breakdown_and_process_totals()
+    print("[OK] All profiling tests passed!")
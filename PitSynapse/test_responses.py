@@ -0,0 +1,88 @@
+"""
+Tests for the unvalidated /api/simulate response fast path.
+Run from project root: python test_responses.py
+"""
+import json
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+import routes.simulation as simulation_routes
+from routes.simulation import SimulationResponse, check_response
+from services.execution import records_body
+from services import encoding
+from services.simulation_runner import run_simulation
+
+AGENTS = [
+    {"id": None, "name": None, "aggression": a, "risk_taking": 0.5, "tyre_management": 0.6,
+     "pit_bias": 0.4, "weather_sensitivity": 0.5}
+    for a in (0.2, 0.5, 0.8, 0.9)
+]
+
+
+def _validated_body(result):
+    """What FastAPI sent before: validate through the model, then encode."""
+    encoded = jsonable_encoder(SimulationResponse(**result))
+    return json.dumps(encoded, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def test_fast_path_matches_validated_output():
+    for engine in ("python", "numpy"):
+        for options in ({}, {"include_timeline": False}, {"event_types": ["pit_stop"]}):
+            result = run_simulation(
+                {"total_laps": 25, "weather": "mixed"}, AGENTS, seed=4, engine=engine, **options
+            )
+            assert encoding.dumps(records_body(result)) == _validated_body(result)
+
+
+def test_stdlib_fallback_encodes_the_same():
+    payload = {"lap": 3, "time": 90.25, "arr": np.arange(3), "x": np.float64(1.5), "s": "é"}
+    fallback = json.dumps(payload, separators=(",", ":"), default=encoding._default).encode("utf-8")
+    assert json.loads(encoding.dumps(payload)) == json.loads(fallback)
+
+
+def test_debug_mode_validates():
+    result = run_simulation({"total_laps": 3, "weather": "dry"}, AGENTS, seed=1)
+    result["timeline"][0]["position"] = "first"
+    check_response(result)  # trusted: not checked
+    simulation_routes.VALIDATE_RESPONSES = True
+    try:
+        check_response(result)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("invalid result passed debug validation")
+    finally:
+        simulation_routes.VALIDATE_RESPONSES = False
+
+
+def test_openapi_schema_is_kept():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    schema = client.get("/openapi.json").json()
+    ok = schema["paths"]["/api/simulate"]["post"]["responses"]["200"]["content"]["application/json"]
+    assert ok["schema"]["$ref"].endswith("/SimulationResponse")
+    assert "TimelineEntry" in schema["components"]["schemas"]
+
+    body = {"race": {"total_laps": 5, "weather": "dry"}, "agents": AGENTS[:2], "seed": 8}
+    response = client.post("/api/simulate", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == _validated_body(
+        run_simulation(body["race"], AGENTS[:2], seed=8)
+    )
+
+
+if __name__ == "__main__":
+    test_fast_path_matches_validated_output()
+    test_stdlib_fallback_encodes_the_same()
+    test_debug_mode_validates()
+    test_openapi_schema_is_kept()
+    print("[OK] All response tests passed!")
@@ -0,0 +1,52 @@
+"""
+Tests for the simulation result cache.
+Run from project root: python test_result_cache.py
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.result_cache import ResultCache, cache_key
+
+
+def test_key_is_canonical():
+    assert cache_key({"a": 1, "b": [1.5, "x"]}) == cache_key({"b": [1.5, "x"], "a": 1})
+    assert cache_key({"seed": 1}) != cache_key({"seed": 2})
+
+
+def test_lru_eviction_respects_byte_bound():
+    cache = ResultCache(max_bytes=100)
+    cache.put("a", {"v": "x" * 30})
+    cache.put("b", {"v": "y" * 30})
+    assert cache.get("a") is not None  # "a" becomes most recently used
+    cache.put("c", {"v": "z" * 30})
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= 100
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": "x" * 30}
+    assert cache.get("c") == {"v": "z" * 30}
+
+
+def test_disk_tier_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        ResultCache(disk_dir=tmp).put("k", {"summary": {"winner": "Agent 1"}})
+
+        fresh = ResultCache(disk_dir=tmp)
+        assert fresh.get("k") == {"summary": {"winner": "Agent 1"}}
+        assert fresh.get("k") is not None
+        stats = fresh.stats()
+        assert stats["disk_hits"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 0
+
+
+if __name__ == "__main__":
+    test_key_is_canonical()
+    test_lru_eviction_respects_byte_bound()
+    test_disk_tier_survives_restart()
+    print("[OK] All result cache tests passed!")
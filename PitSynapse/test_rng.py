@@ -0,0 +1,52 @@
+"""
+Tests for per-run RNG isolation.
+Run from project root: python test_rng.py
+"""
+import sys
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.simulation_runner import run_simulation
+from services.rng import spawn_seeds
+
+RACE = {"total_laps": 30, "weather": "mixed", "track_id": "test_track"}
+AGENTS = [
+    {"id": f"agent_{i+1}", "name": f"Agent {i+1}", "aggression": 0.3 + 0.1 * i,
+     "risk_taking": 0.8 - 0.1 * i, "tyre_management": 0.5, "pit_bias": 0.4 + 0.05 * i}
+    for i in range(6)
+]
+
+
+def test_concurrent_runs_match_sequential():
+    seeds = spawn_seeds(123, 16)
+    expected = [run_simulation(RACE, AGENTS, seed=s) for s in seeds]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        concurrent = list(pool.map(lambda s: run_simulation(RACE, AGENTS, seed=s), seeds))
+
+    assert concurrent == expected
+
+
+def test_global_random_state_is_untouched():
+    random.seed(5)
+    before = random.getstate()
+    run_simulation(RACE, AGENTS, seed=1)
+    assert random.getstate() == before
+
+
+def test_spawned_seeds_are_stable_and_distinct():
+    seeds = spawn_seeds(7, 100)
+    assert seeds == spawn_seeds(7, 100)
+    assert spawn_seeds(7, 10) == seeds[:10]
+    assert len(set(seeds)) == 100
+
+
+if __name__ == "__main__":
+    test_concurrent_runs_match_sequential()
+    test_global_random_state_is_untouched()
+    test_spawned_seeds_are_stable_and_distinct()
+    print("[OK] All RNG tests passed!")
@@ -0,0 +1,76 @@
+"""
+Tests for race snapshots and resuming a race from one.
+Run from project root: python test_snapshots.py
+"""
+import sys
+from pathlib import Path
+
+# Add backend and the shared fixtures to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from agent_fixtures import make_agents
+from services.simulation_runner import run_simulation, resume_simulation
+from services.snapshots import RaceSnapshot
+
+RACE = {"total_laps": 30, "weather": "mixed"}
+
+
+def test_resume_reproduces_the_rest_of_the_race():
+    agents = make_agents(8)
+    for engine in ("python", "numpy"):
+        full = run_simulation(RACE, agents, seed=7, engine=engine, snapshot_laps=[0, 1, 12, 30])
+        snapshots = full.pop("snapshots")
+        assert [s.lap for s in snapshots] == [0, 1, 12, 30]
+        for snapshot in snapshots:
+            resumed = resume_simulation(RaceSnapshot.from_bytes(snapshot.to_bytes()))
+            assert resumed["summary"] == full["summary"], (engine, snapshot.lap)
+            assert resumed["timeline"] == [e for e in full["timeline"] if e["lap"] > snapshot.lap]
+            count = len(resumed["events"])
+            assert resumed["events"] == (full["events"][-count:] if count else [])
+
+
+def test_resume_columnar_and_chained_snapshots():
+    agents = make_agents(5)
+    for engine in ("python", "numpy"):
+        full = run_simulation(RACE, agents, seed=3, engine=engine, layout="columnar")
+        first = run_simulation(RACE, agents, seed=3, engine=engine, snapshot_laps=[10])["snapshots"][0]
+        second = resume_simulation(first, snapshot_laps=[20])["snapshots"][0]
+        resumed = resume_simulation(second, layout="columnar")
+        assert resumed["summary"] == full["summary"]
+        laps = full["timeline"]["lap"]
+        tail = [i for i, lap in enumerate(laps) if lap > 20]
+        assert resumed["timeline"]["lap_time"] == [full["timeline"]["lap_time"][i] for i in tail]
+
+
+def test_snapshots_are_array_packed():
+    agents = make_agents(200)
+    for engine in ("python", "numpy"):
+        snapshot = run_simulation(
+            RACE, agents, seed=1, engine=engine, include_timeline=False, event_types=(),
+            snapshot_laps=[15],
+        )["snapshots"][0]
+        assert snapshot.profiles.shape == (200, 7) and snapshot.state.shape == (200, 9)
+        # Learned traits are carried: PRL has moved them off the settings
+        assert snapshot.profiles[:, 0].tolist() != [a["aggression"] for a in agents]
+        # Two float64 matrices plus, for the python engine, 625 RNG words
+        assert snapshot.nbytes <= 200 * (7 + 9) * 8 + 625 * 4
+        assert len(snapshot.to_bytes()) < 2 * snapshot.nbytes
+
+
+def test_resume_rejects_other_engine():
+    snapshot = run_simulation(RACE, make_agents(3), seed=1, snapshot_laps=[5])["snapshots"][0]
+    try:
+        run_simulation(RACE, [], engine="numpy", resume_from=snapshot)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("python snapshot resumed on the numpy engine")
+
+
+if __name__ == "__main__":
+    test_resume_reproduces_the_rest_of_the_race()
+    test_resume_columnar_and_chained_snapshots()
+    test_snapshots_are_array_packed()
+    test_resume_rejects_other_engine()
+    print("[OK] All snapshot tests passed!")
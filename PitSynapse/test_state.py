@@ -0,0 +1,61 @@
+"""
+Tests for the slotted race state objects and their dict adapters.
+Run from project root: python test_state.py
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from models.state import AgentProfile, AgentState, RaceState
+from services.agent_logic import decide_action
+from prl_system import update_traits_prl
+
+
+def test_objects_are_slotted():
+    profile = AgentProfile(id="a", name="A")
+    state = AgentState(position=1)
+    for obj in (profile, state, RaceState()):
+        assert not hasattr(obj, "__dict__")
+    try:
+        state.typo_field = 1
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("slotted state accepted an unknown attribute")
+
+
+def test_decide_action_accepts_objects_and_dicts():
+    agent_state = {"tyre_wear": 0.72, "position": 3, "gap_ahead": 1.0}
+    profile = {"aggression": 0.8, "risk": 0.4, "tyre_management": 0.7, "pit_bias": 0.3}
+    for laps_remaining in (2, 5, 20):
+        for weather in ("dry", "light_rain"):
+            race_state = {"laps_remaining": laps_remaining, "weather": weather}
+            expected = decide_action(agent_state, profile, race_state)
+            assert decide_action(
+                AgentState.from_dict(agent_state),
+                AgentProfile.from_dict(profile),
+                RaceState.from_dict(race_state),
+            ) == expected
+
+
+def test_update_traits_prl_accepts_profile():
+    profile = AgentProfile(id="a", name="A", aggression=0.6, risk_taking=0.4,
+                           tyre_management=0.7, pit_bias=0.55)
+    perf = {
+        "current_lap_time": 90.4, "best_lap_time": 90.1, "tyre_wear_increase": 0.03,
+        "expected_wear": 0.04, "position_before": 4, "position_after": 2,
+        "total_cars": 10, "pitted_this_lap": False, "lap_number": 5,
+    }
+    from_profile = update_traits_prl(profile, perf)
+    from_dict = update_traits_prl(profile.prl_traits(), perf)
+    assert from_profile == from_dict
+    assert set(from_profile["changes"]) == {"aggression", "tyre_management", "risk_taking", "pit_bias"}
+
+
+if __name__ == "__main__":
+    test_objects_are_slotted()
+    test_decide_action_accepts_objects_and_dicts()
+    test_update_traits_prl_accepts_profile()
+    print("[OK] All state object tests passed!")
@@ -0,0 +1,166 @@
+"""
+Tests for the pit-strategy optimizer.
+Run from project root: python test_strategy.py
+"""
+from itertools import combinations
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.strategy import MAX_CANDIDATES, optimize_strategy, candidate_plans, _plan_laps, _stint_laps
+from services.race_model import BASE_LAP_TIME, FRESH_TYRE_WEAR, PIT_LOSS
+from services.simulation_runner import _build_profiles, _simulate_lap_time, _simulate_tyre_wear
+
+RACE = {"total_laps": 40, "weather": "dry"}
+AGENTS = [
+    {"id": "a", "aggression": 0.7, "risk_taking": 0.5, "tyre_management": 0.3, "pit_bias": 0.5},
+    {"id": "b", "aggression": 0.2, "risk_taking": 0.4, "tyre_management": 0.9, "pit_bias": 0.5},
+]
+
+
+class _NoNoise:
+    def uniform(self, low, high):
+        return 0.0
+
+
+def _expected_total(profile, pit_laps, total_laps, pace="maintain"):
+    """Noise-free race time, stepping the runner's own lap and wear models."""
+    wear, total = 0.0, 0.0
+    for lap in range(1, total_laps + 1):
+        if lap in pit_laps:
+            total += _simulate_lap_time(BASE_LAP_TIME, "maintain", profile, 0.0, _NoNoise()) + PIT_LOSS
+            wear = FRESH_TYRE_WEAR
+        else:
+            total += _simulate_lap_time(BASE_LAP_TIME, pace, profile, wear, _NoNoise())
+            wear = _simulate_tyre_wear(wear, pace, profile)
+    return total
+
+
+def test_candidate_plans_respect_min_stint():
+    total_laps, min_stint = 30, 4
+    plans = candidate_plans(total_laps, (1, 2, 3), min_stint)
+    for k, found in zip((1, 2, 3), plans):
+        expected = [
+            c for c in combinations(range(1, total_laps + 1), k)
+            if all(b - a >= min_stint for a, b in zip((0,) + c, c + (total_laps + 1,)))
+            and c[0] > min_stint and c[-1] <= total_laps - min_stint
+        ]
+        assert [tuple(p) for p in found.tolist()] == expected
+
+
+def test_plan_lap_times_follow_the_runner_models():
+    profile = _build_profiles(AGENTS)[0]
+    total_laps = RACE["total_laps"]
+    first = _stint_laps(profile, "push_medium", 0.0, total_laps)
+    fresh = _stint_laps(profile, "push_medium", FRESH_TYRE_WEAR, total_laps)
+    plans = np.array([[12, 27], [5, 30]])
+    laps = _plan_laps(plans, first, fresh, BASE_LAP_TIME)
+    for plan, row in zip(plans.tolist(), laps):
+        expected = _expected_total(profile, plan, total_laps, "push_medium") - len(plan) * PIT_LOSS
+        assert abs(np.round(row, 2).sum() - expected) < 1e-6
+
+
+def test_successive_halving_finds_the_best_plans():
+    result = optimize_strategy(RACE, AGENTS, "a", stops=(1, 2), min_stint=3, top_k=3,
+                               initial_samples=4, max_samples=64, seed=11, workers=1)
+    rounds = result["rounds"]
+    assert rounds[0]["candidates"] == result["candidates"]
+    assert [r["samples"] for r in rounds] == [4 * 2 ** i for i in range(len(rounds))]
+    assert all(b["candidates"] <= (a["candidates"] + 1) // 2 or b["candidates"] == 3
+               for a, b in zip(rounds, rounds[1:]))
+    assert result["evaluations"] < result["candidates"] * 64
+
+    best = result["strategies"]
+    assert len(best) == 3
+    assert [s["mean_time"] for s in best] == sorted(s["mean_time"] for s in best)
+    for s in best:
+        assert s["ci95"][0] <= s["mean_time"] <= s["ci95"][1]
+
+    # The noise-free optimum survives the pruning
+    profile = _build_profiles(AGENTS)[0]
+    plans = [p for group in candidate_plans(40, (1, 2), 3) for p in group.tolist()]
+    optimum = min(plans, key=lambda p: _expected_total(profile, p, 40))
+    assert optimum in [s["pit_laps"] for s in best]
+
+
+def test_results_do_not_depend_on_workers():
+    options = dict(stops=(1, 2, 3), min_stint=5, initial_samples=2, max_samples=16, seed=4)
+    inline = optimize_strategy(RACE, AGENTS, "b", workers=1, **options)
+    pooled = optimize_strategy(RACE, AGENTS, "b", workers=2, **options)
+    assert inline == pooled
+
+
+def test_surrogate_prescreen_narrows_the_search():
+    options = dict(stops=(1, 2, 3), min_stint=3, top_k=3, max_samples=64, seed=8, workers=1)
+    full = optimize_strategy(RACE, AGENTS, "a", **options)
+    screened = optimize_strategy(RACE, AGENTS, "a", prescreen=40, **options)
+    assert full["prescreened"] is None
+    assert screened["prescreened"] == screened["rounds"][0]["candidates"] == 40
+    assert screened["candidates"] == full["candidates"]
+    assert screened["evaluations"] < full["evaluations"]
+    # Screening keeps the contenders: its winner is among the full search's best
+    assert screened["strategies"][0]["pit_laps"] in [s["pit_laps"] for s in full["strategies"]]
+
+
+def test_invalid_requests_are_rejected():
+    for kwargs in ({"agent_id": "zz"}, {"stops": (4,)}, {"pace": "pit_stop"},
+                   {"min_stint": 0}, {"min_stint": 30}):
+        options = {"agent_id": "a", **kwargs}
+        try:
+            optimize_strategy(RACE, AGENTS, workers=1, **options)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {kwargs}")
+
+
+def test_strategy_endpoint():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    body = {"race": RACE, "agents": AGENTS, "seed": 2, "agent_id": "b",
+            "stops": [1, 2], "min_stint": 4, "max_samples": 32, "top_k": 2}
+    response = client.post("/api/simulate/strategy", json=body)
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["agent_id"] == "b" and len(data["strategies"]) == 2
+    assert client.post("/api/simulate/strategy", json={**body, "agent_id": "zz"}).status_code == 400
+    assert client.post("/api/simulate/strategy", json={**body, "stops": [5]}).status_code == 422
+
+
+
+def test_default_request_on_a_long_race():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    # 78 laps, stops 1-3, min_stint 1: 73,226 pit-lap sets, shortlisted by the surrogate
+    body = {"race": {"total_laps": 78, "weather": "dry"}, "agents": AGENTS, "seed": 4, "agent_id": "a"}
+    response = client.post("/api/simulate/strategy", json=body)
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["candidates"] == 73_226 and data["prescreened"] == MAX_CANDIDATES
+    assert len(data["strategies"]) == 5
+
+    try:  # 250 laps: past MAX_ENUMERATED, rejected before enumerating
+        optimize_strategy({"total_laps": 250}, AGENTS, "a", workers=1)
+    except ValueError as e:
+        assert "min_stint" in str(e)
+    else:
+        raise AssertionError("accepted a search past the enumeration limit")
+
+
+if __name__ == "__main__":
+    test_candidate_plans_respect_min_stint()
+    test_plan_lap_times_follow_the_runner_models()
+    test_successive_halving_finds_the_best_plans()
+    test_results_do_not_depend_on_workers()
+    test_surrogate_prescreen_narrows_the_search()
+    test_invalid_requests_are_rejected()
+    test_strategy_endpoint()
+    test_default_request_on_a_long_race()
+    print("[OK] All strategy tests passed!")
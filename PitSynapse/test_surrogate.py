@@ -0,0 +1,94 @@
+"""
+Tests for the noise-free surrogate evaluator.
+Run from project root: python test_surrogate.py
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from services.agent_logic import ACTIONS, A_PIT
+from services.surrogate import expected_lap_times, expected_race_time, pit_plan, plan_codes
+from services.race_model import BASE_LAP_TIME, FRESH_TYRE_WEAR, PIT_LOSS
+from services.simulation_runner import (
+    _build_profiles, _simulate_lap_time, _simulate_tyre_wear,
+    run_simulation,
+)
+
+AGENT = {"id": "a", "aggression": 0.8, "risk_taking": 0.5, "tyre_management": 0.35, "pit_bias": 0.5}
+PLAN = ["push_hard"] * 8 + ["pit_stop"] + ["conserve_low"] * 12 + ["push_medium"] * 10 + ["pit_stop"] + ["maintain"] * 9
+
+
+class _NoNoise:
+    def uniform(self, low, high):
+        return 0.0
+
+
+def _stepped(profile, plan):
+    """Reference: the runner's own per-lap models, noise switched off."""
+    wear, laps = 0.0, []
+    for action in plan:
+        if action == "pit_stop":
+            laps.append(_simulate_lap_time(BASE_LAP_TIME, "maintain", profile, 0.0, _NoNoise()) + PIT_LOSS)
+            wear = FRESH_TYRE_WEAR
+        else:
+            laps.append(_simulate_lap_time(BASE_LAP_TIME, action, profile, wear, _NoNoise()))
+            wear = _simulate_tyre_wear(wear, action, profile)
+    return np.array(laps)
+
+
+def test_matches_the_stepped_models():
+    profile = _build_profiles([AGENT])[0]
+    laps = expected_lap_times(profile, PLAN)
+    assert laps.shape == (len(PLAN),)
+    # Only the engine's per-lap rounding separates the two
+    assert np.abs(laps - _stepped(profile, PLAN)).max() < 0.01
+    assert abs(expected_race_time(AGENT, PLAN) - _stepped(profile, PLAN).sum()) < 0.05
+
+
+def test_lines_up_with_the_stochastic_engine():
+    overrides = {lap: {0: action} for lap, action in enumerate(PLAN, start=1)}
+    totals = []
+    for seed in range(150):
+        result = run_simulation({"total_laps": len(PLAN)}, [AGENT], seed=seed,
+                                include_timeline=True, event_types=(), action_overrides=overrides)
+        totals.append(sum(entry["lap_time"] for entry in result["timeline"]))
+    assert abs(np.mean(totals) - expected_race_time(AGENT, PLAN)) < 0.2
+
+
+def test_batches_and_pit_plans():
+    batch = pit_plan(30, np.array([[10, 20], [5, 25], [15, 15]]), pace="push_medium")
+    assert batch.shape == (3, 30)
+    assert (batch == A_PIT).sum(axis=1).tolist() == [2, 2, 1]
+    assert pit_plan(30, []).tolist() == [ACTIONS.index("maintain")] * 30
+
+    totals = expected_race_time(AGENT, batch)
+    assert totals.shape == (3,)
+    for row, total in zip(batch, totals):
+        assert np.isclose(expected_race_time(AGENT, row), total)
+
+    names = np.array(ACTIONS)[batch]
+    assert np.array_equal(plan_codes(names), batch)
+
+
+def test_invalid_plans_are_rejected():
+    for call in (lambda: plan_codes(["maintain", "teleport"]),
+                 lambda: plan_codes([0, 9]),
+                 lambda: pit_plan(20, [0]),
+                 lambda: pit_plan(20, [21])):
+        try:
+            call()
+        except ValueError:
+            continue
+        raise AssertionError("accepted an invalid plan")
+
+
+if __name__ == "__main__":
+    test_matches_the_stepped_models()
+    test_lines_up_with_the_stochastic_engine()
+    test_batches_and_pit_plans()
+    test_invalid_plans_are_rejected()
+    print("[OK] All surrogate tests passed!")
@@ -0,0 +1,95 @@
+"""
+Tests for seeded, vectorized synthetic profile generation (data/synth_profile.py).
+Run from project root: python test_synth_profile.py
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add backend and the ingest scripts to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+
+import synth_profile
+from synth_profile import (
+    LAPS, SECTORS, TRAITS, TRAIT_RANGES, add_speed_shapes, agent_settings, generate_profiles, load_field, save_field,
+)
+from f1_ingest import generate_agent_profiles, save_profiles
+from services.profile_registry import ProfileRegistry
+from services.simulation_runner import run_simulation
+
+
+def test_field_is_seeded_and_in_range():
+    field = generate_profiles(500, laps=40, sectors=4, seed=11)
+    assert field["traits"].shape == (500, len(TRAITS))
+    assert field["speed_shape"].shape == (500, 40, 4) and field["speed_shape"].dtype == np.float32
+    assert field["tyre_wear_shape"].shape == (500, 40)
+
+    for i, (low, high) in enumerate(TRAIT_RANGES.values()):
+        assert low <= field["traits"][:, i].min() and field["traits"][:, i].max() <= high
+    wear = field["tyre_wear_shape"]
+    assert (np.diff(wear, axis=1) >= 0).all() and wear.max() <= 1.0
+    assert abs(field["speed_shape"].mean() - synth_profile.BASE_SPEED) < 0.1
+
+    again = generate_profiles(500, laps=40, sectors=4, seed=11)
+    assert all(np.array_equal(field[k], again[k]) for k in field)
+    assert not np.array_equal(field["speed_shape"], generate_profiles(500, 40, 4, seed=12)["speed_shape"])
+
+
+def test_binary_round_trip_and_simulation():
+    field = generate_profiles(2000, seed=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        save_field(field, tmp, seed=3)
+        index = json.loads(Path(tmp, "index.json").read_text())
+        assert index["agents"] == 2000 and index["traits"] == list(TRAITS) and index["seed"] == 3
+
+        loaded = load_field(tmp)
+        assert isinstance(loaded["speed_shape"], np.memmap)
+        assert all(np.array_equal(field[k], loaded[k]) for k in field)
+        del loaded
+
+    settings = agent_settings(generate_profiles(50, seed=3))
+    assert settings[0]["id"] == "agent_1" and settings[0]["risk_taking"] == settings[0]["risk"]
+    result = run_simulation({"total_laps": 5}, settings, seed=0, engine="numpy", include_timeline=False)
+    assert len(result["summary"]["finishing_order"]) == 50
+
+
+def test_ingest_profiles_are_seeded_and_load_in_registry():
+    stats = {"base_lap_time": 91.0, "avg_pit_loss": 21.0, "tyre_wear_rate": 0.04}
+    profiles = generate_agent_profiles(stats, num_agents=4, seed=5)
+    assert profiles == generate_agent_profiles(stats, num_agents=4, seed=5)
+    assert len(profiles[0]["speed_shape"]) == 50 and len(profiles[0]["speed_shape"][0]) == 3
+    assert profiles[0]["tyre_wear_shape"][-1] <= 1.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "agent_profiles.json"
+        save_profiles(profiles, path)
+        registry = ProfileRegistry(path)
+        assert registry.load() == 4
+        assert registry.shapes("agent_2")["speed_shape"].shape == (50, 3)
+        assert registry.get("agent_1")["traits"]["risk_taking"] == profiles[0]["risk"]
+
+
+def test_speed_shapes_keep_the_profiles_file_shape():
+    profiles = [{"id": "a", "aggression": 0.5}, {"id": "b", "aggression": 0.7}]
+    with tempfile.TemporaryDirectory() as tmp:
+        for data in ({"profiles": profiles}, profiles):
+            path = Path(tmp) / "agent_profiles.json"
+            path.write_text(json.dumps(data))
+            add_speed_shapes(path, seed=2)
+            filled = json.loads(path.read_text())
+            assert type(filled) is type(data)
+            rows = filled["profiles"] if isinstance(filled, dict) else filled
+            assert [p["id"] for p in rows] == ["a", "b"]
+            assert np.array(rows[1]["speed_shape"]).shape == (LAPS, SECTORS)
+
+
+if __name__ == "__main__":
+    test_field_is_seeded_and_in_range()
+    test_binary_round_trip_and_simulation()
+    test_ingest_profiles_are_seeded_and_load_in_registry()
+    test_speed_shapes_keep_the_profiles_file_shape()
+    print("[OK] All synthetic profile tests passed!")
@@ -0,0 +1,124 @@
+"""
+Tests for multi-race PRL training and the learned profile store.
+Run from project root: python test_training.py
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add backend and the shared fixtures to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from agent_fixtures import make_agents
+from services.profile_store import ProfileStore, profile_settings
+from services.rng import spawn_seeds
+from services.simulation_runner import run_simulation
+from services.snapshots import PROFILE_COLUMNS
+from services.training import train_profiles, _carried_settings
+
+RACE = {"total_laps": 25, "weather": "dry"}
+
+
+def test_traits_carry_over_between_races():
+    agents = make_agents(4)
+    for engine in ("python", "numpy"):
+        result = train_profiles(RACE, agents, races=3, seeds=1, seed=6, engine=engine, workers=1)
+
+        # The same season by hand: each race starts from the previous race's final profiles
+        settings = agents
+        for race_seed in spawn_seeds(spawn_seeds(6, 1)[0], 3):
+            final = run_simulation(RACE, settings, seed=race_seed, engine=engine, include_timeline=False,
+                                   event_types=(), snapshot_laps=[RACE["total_laps"]])["snapshots"][0]
+            settings = _carried_settings(final.agent_ids, final.agent_names, final.profiles)
+
+        for i, agent in enumerate(agents):
+            learned = result["profiles"][agent["id"]]["traits"]
+            expected = dict(zip(PROFILE_COLUMNS, final.profiles[i].tolist()))
+            assert all(abs(learned[key] - expected[key]) < 1e-4 for key in PROFILE_COLUMNS)
+            # PRL moved the trained traits; the decision risk is carried unchanged
+            assert learned["risk"] == round(agent["risk_taking"], 4)
+        assert any(
+            result["profiles"][a["id"]]["traits"]["aggression"] != round(a["aggression"], 4) for a in agents
+        )
+
+
+def test_parallel_seasons_are_reproducible():
+    agents = make_agents(3)
+    inline = train_profiles(RACE, agents, races=2, seeds=3, seed=1, workers=1)
+    pooled = train_profiles(RACE, agents, races=2, seeds=3, seed=1, workers=2)
+    assert inline == pooled
+    assert inline["training_id"] == train_profiles(RACE, agents, races=2, seeds=3, seed=1, workers=1)["training_id"]
+    assert all(len(curve) == 2 for curve in inline["mean_position"].values())
+    assert any(v > 0 for p in inline["profiles"].values() for v in p["spread"].values())
+
+
+def test_store_round_trip_and_profile_settings():
+    agents = make_agents(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ProfileStore(tmp)
+        result = train_profiles(RACE, agents, races=2, seed=3, workers=1, store=store, name="rookies")
+        assert store.list_ids() == ["rookies.agent_1", "rookies.agent_2"]
+        assert result["profiles"]["agent_1"]["profile_id"] == "rookies.agent_1"
+
+        stored = store.get("rookies.agent_2")
+        assert stored["meta"]["races"] == 2 and stored["meta"]["agent_id"] == "agent_2"
+        assert store.get("missing") is None and store.get("../etc") is None
+
+        # A run from the stored profile starts with exactly the learned traits
+        settings = profile_settings(stored, {"id": "x", "aggression": None})
+        start = run_simulation(RACE, [settings], seed=0, include_timeline=False, event_types=(),
+                               snapshot_laps=[0])["snapshots"][0]
+        assert np.allclose(start.profiles[0], [stored["traits"][key] for key in PROFILE_COLUMNS])
+        assert profile_settings(stored, {"risk_taking": 0.1})["risk"] == 0.1
+
+    for bad in ("bad/name", ".hidden"):
+        try:
+            train_profiles(RACE, agents, races=1, seed=3, workers=1, name=bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted name {bad!r}")
+
+
+def test_training_and_profile_endpoints():
+    from fastapi.testclient import TestClient
+    from main import app
+    from routes.simulation import profile_store
+
+    client = TestClient(app)
+    original = profile_store.directory
+    with tempfile.TemporaryDirectory() as tmp:
+        profile_store.directory = Path(tmp)
+        try:
+            body = {"race": RACE, "agents": make_agents(3), "seed": 8, "races": 2, "seeds": 2, "name": "pre"}
+            response = client.post("/api/train", json=body)
+            assert response.status_code == 200, response.text
+            assert response.json()["profiles"]["agent_3"]["profile_id"] == "pre.agent_3"
+
+            assert client.get("/api/profiles").json()["profiles"] == ["pre.agent_1", "pre.agent_2", "pre.agent_3"]
+            assert client.get("/api/profiles/pre.agent_1").json()["meta"]["seeds"] == 2
+            assert client.get("/api/profiles/nope").status_code == 404
+
+            race = {"race": RACE, "seed": 1, "outputs": {"timeline": False, "events": []}}
+            agents = [{"id": "p", "profile_id": "pre.agent_1"},
+                      {"id": "q", "aggression": 0.5, "risk_taking": 0.5, "tyre_management": 0.5, "pit_bias": 0.5}]
+            response = client.post("/api/simulate", json={**race, "agents": agents})
+            assert response.status_code == 200, response.text
+            assert set(response.json()["summary"]["pit_stops"]) == {"p", "q"}
+
+            unknown = [{"profile_id": "pre.zz"}]
+            assert client.post("/api/simulate", json={**race, "agents": unknown}).status_code == 400
+            no_traits = [{"id": "r", "aggression": 0.5}]
+            assert client.post("/api/simulate", json={**race, "agents": no_traits}).status_code == 400
+        finally:
+            profile_store.directory = original
+
+
+if __name__ == "__main__":
+    test_traits_carry_over_between_races()
+    test_parallel_seasons_are_reproducible()
+    test_store_round_trip_and_profile_settings()
+    test_training_and_profile_endpoints()
+    print("[OK] All training tests passed!")
@@ -0,0 +1,136 @@
+"""
+Tests for the NumPy batch engine.
+Run from project root: python test_vector_engine.py
+"""
+import sys
+from pathlib import Path
+
+# Add backend and the shared fixtures to path
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from agent_fixtures import make_agents
+from services.simulation_runner import run_simulation
+from services.agent_logic import ACTIONS, decide_action, decide_actions
+from prl_system import PRL_TRAIT_KEYS, update_traits_prl, update_traits_prl_batch
+
+
+def test_same_shape_as_python_engine():
+    """Both engines return the same keys and entry counts."""
+    race_params = {"total_laps": 15, "weather": "rain", "track_id": "test_track"}
+    agents = make_agents(8)
+
+    scalar = run_simulation(race_params, agents, seed=3)
+    batch = run_simulation(race_params, agents, seed=3, engine="numpy")
+
+    assert set(batch) == set(scalar)
+    assert set(batch["summary"]) == set(scalar["summary"])
+    assert len(batch["timeline"]) == len(scalar["timeline"]) == 15 * 8
+    assert set(batch["timeline"][0]) == set(scalar["timeline"][0])
+    assert set(batch["summary"]["pit_stops"]) == {a["id"] for a in agents}
+
+    scalar_types = {e["event_type"] for e in scalar["events"]}
+    batch_types = {e["event_type"] for e in batch["events"]}
+    assert batch_types <= {"lap_complete", "pit_stop", "overtake", "prl_update"}
+    assert {"lap_complete", "prl_update"} <= batch_types & scalar_types
+
+    for lap in range(1, 16):
+        positions = sorted(e["position"] for e in batch["timeline"] if e["lap"] == lap)
+        assert positions == list(range(1, 9))
+
+
+def test_seeded_runs_are_reproducible():
+    race_params = {"total_laps": 20, "weather": "mixed"}
+    agents = make_agents(30)
+    first = run_simulation(race_params, agents, seed=11, engine="numpy")
+    second = run_simulation(race_params, agents, seed=11, engine="numpy")
+    assert first == second
+
+
+def test_batched_decisions_match_decide_action():
+    rng = np.random.default_rng(5)
+    n = 2000
+    wear, aggression, risk, tyre_mgmt, pit_bias, weather_sens = rng.random((6, n))
+    position = rng.integers(1, 20, n)
+    gap_ahead = rng.uniform(0.0, 3.0, n)
+    pit_next = rng.random(n) < 0.05
+    # Exact rule thresholds, where > vs >= matters
+    wear[:8] = [0.82, 0.78, 0.7, 0.6, 0.55, 0.65, 0.75, 0.45]
+    aggression[8:12] = [0.65, 0.7, 0.85, 0.5]
+    tyre_mgmt[12:15] = [0.6, 0.8, 0.85]
+
+    for laps_remaining in (0, 4, 6, 20):
+        for weather in ("dry", "light_rain"):
+            codes = decide_actions(
+                {"tyre_wear": wear, "position": position, "gap_ahead": gap_ahead, "pit_next": pit_next},
+                {
+                    "aggression": aggression,
+                    "risk": risk,
+                    "tyre_management": tyre_mgmt,
+                    "pit_bias": pit_bias,
+                    "weather_sensitivity": weather_sens,
+                },
+                {"laps_remaining": laps_remaining, "weather": weather},
+            )
+            for i in range(n):
+                expected = decide_action(
+                    {"tyre_wear": wear[i], "position": position[i],
+                     "gap_ahead": gap_ahead[i], "pit_next": pit_next[i]},
+                    {
+                        "aggression": aggression[i],
+                        "risk": risk[i],
+                        "tyre_management": tyre_mgmt[i],
+                        "pit_bias": pit_bias[i],
+                        "weather_sensitivity": weather_sens[i],
+                    },
+                    {"laps_remaining": laps_remaining, "weather": weather},
+                )
+                assert ACTIONS[codes[i]] == expected
+
+
+def test_batched_prl_matches_update_traits_prl():
+    rng = np.random.default_rng(11)
+    n = 500
+    total_cars = 20
+    traits = {key: rng.uniform(0.0, 1.0, n) for key in PRL_TRAIT_KEYS}
+    best_lap = rng.uniform(85.0, 95.0, n)
+    lap_time = best_lap + rng.choice([-2.0, 0.0, 3.0, 25.0], n) + rng.normal(0.0, 1.0, n)
+    wear_increase = rng.uniform(0.0, 0.1, n)
+    position_before = rng.integers(1, total_cars + 1, n)
+    position_after = rng.integers(1, total_cars + 1, n)
+    pitted = rng.random(n) < 0.3
+
+    batch = update_traits_prl_batch(
+        traits, lap_time, best_lap, wear_increase, position_before, position_after,
+        total_cars, pitted, 0.04, 0.02,
+    )
+    for i in range(n):
+        scalar = update_traits_prl(
+            {key: float(traits[key][i]) for key in PRL_TRAIT_KEYS},
+            {
+                "current_lap_time": float(lap_time[i]),
+                "best_lap_time": float(best_lap[i]),
+                "tyre_wear_increase": float(wear_increase[i]),
+                "expected_wear": 0.04,
+                "position_before": int(position_before[i]),
+                "position_after": int(position_after[i]),
+                "total_cars": total_cars,
+                "pitted_this_lap": bool(pitted[i]),
+                "lap_number": 2,
+            },
+            learning_rate=0.02,
+        )
+        assert batch["reward_signal"][i] == scalar["reward_signal"]
+        for key in PRL_TRAIT_KEYS:
+            assert batch["changes"][key][i] == scalar["changes"][key]
+            assert batch["traits"][key][i] == scalar["traits"][key]
+
+
+if __name__ == "__main__":
+    test_same_shape_as_python_engine()
+    test_seeded_runs_are_reproducible()
+    test_batched_decisions_match_decide_action()
+    test_batched_prl_matches_update_traits_prl()
+    print("[OK] All vector engine tests passed!")
@@ -4,57 +4,220 @@ PitSynapse F1 Data Ingest
 Fetches lap times and pit stops from Ergast API (if available),
 computes base lap/pit stats, generates per-lap speed & tyre wear curves,
 and exports agent_profiles.json for simulation ingestion.
+
+Bulk mode (fetch_races / --rounds) fetches many (season, round) pairs
+concurrently over one pooled HTTP session, with bounded parallelism and
+retry with exponential backoff. Raw responses are cached on disk,
+content-addressed (objects/<sha256 of body>, refs/<sha256 of url> -> body
+hash), so re-runs are served from the cache and --offline never touches
+the network. A 200 body without the Ergast race shape fails only its own
+race (MalformedResponse), like any other fetch error. Every fetched race
+is also written to the lap store (lap_store.py) for per-track /
+per-driver pace and pit-loss queries.
 """
 
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
 from pathlib import Path
-from typing import List, Dict
-import random
+import sys
+import tempfile
+import time
+from typing import List, Dict, Iterable, Optional, Tuple
 import numpy as np
 
+# The sibling ingest modules, wherever this script is run or imported from
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lap_store import LAP_STORE, LapStore, parse_times
+from synth_profile import TRAITS, generate_profiles
+
 OUTPUT_JSON = Path("data/agent_profiles.json")
+CACHE_DIR = Path("data/cache/ergast")
+ERGAST_URL = os.environ.get("ERGAST_URL", "http://ergast.com/api/f1")  # or a mirror / local stub
 TOTAL_LAPS = 50
 NUM_AGENTS = 6
 SECTORS = 3
 
+MAX_WORKERS = 8
+RETRIES = 3
+BACKOFF = 0.5  # seconds; doubles per attempt
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """A response could not be fetched (or, offline, was not cached)."""
+
+
+class MalformedResponse(FetchError, ValueError):
+    """A 200 response whose JSON does not have the Ergast race shape."""
+
+# ------------------- Response Cache ------------------- #
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def cache_get(url: str, cache_dir: Path = CACHE_DIR) -> Optional[bytes]:
+    try:
+        digest = (Path(cache_dir) / "refs" / _sha256(url.encode())).read_text().strip()
+        body = (Path(cache_dir) / "objects" / digest).read_bytes()
+    except OSError:
+        return None
+    return body if _sha256(body) == digest else None  # ignore a damaged object
+
+
+def cache_put(url: str, body: bytes, cache_dir: Path = CACHE_DIR):
+    digest = _sha256(body)
+    obj = Path(cache_dir) / "objects" / digest
+    if not obj.exists():
+        _write_atomic(obj, body)
+    _write_atomic(Path(cache_dir) / "refs" / _sha256(url.encode()), digest.encode())
+
+# ------------------- HTTP ------------------- #
+
+def make_session(max_workers: int = MAX_WORKERS) -> requests.Session:
+    """One session whose connection pool fits `max_workers` concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_json(url: str, session: Optional[requests.Session] = None, cache_dir: Path = CACHE_DIR,
+               offline: bool = False, retries: int = RETRIES, backoff: float = BACKOFF, timeout: float = 5) -> Dict:
+    """GET `url` as JSON, from the cache when present. Raises FetchError."""
+    body = cache_get(url, cache_dir)
+    if body is None:
+        if offline:
+            raise FetchError(f"{url}: not cached (offline)")
+        if session is None:
+            with make_session(1) as session:
+                body = _download(url, session, retries, backoff, timeout)
+        else:
+            body = _download(url, session, retries, backoff, timeout)
+        data = json.loads(body)  # only cache what parses
+        cache_put(url, body, cache_dir)
+        return data
+    return json.loads(body)
+
+
+def _download(url: str, session: requests.Session, retries: int, backoff: float, timeout: float) -> bytes:
+    for attempt in range(retries + 1):
+        try:
+            resp = session.get(url, timeout=timeout)
+            if resp.status_code not in RETRY_STATUS:
+                resp.raise_for_status()
+                return resp.content
+            error = f"HTTP {resp.status_code}"
+        except requests.HTTPError as e:
+            raise FetchError(f"{url}: {e}") from e  # 4xx: retrying will not help
+        except requests.RequestException as e:
+            error = str(e)
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    raise FetchError(f"{url}: {error} after {retries + 1} attempts")
+
 # ------------------- Ergast API ------------------- #
 
+def _ergast_race(season: int, round_num: int, resource: str, session: Optional[requests.Session] = None,
+                 base_url: str = ERGAST_URL, **fetch_kwargs) -> Dict:
+    """The race entry of one Ergast resource ("laps", "pitstops"); {} for a race with no data yet."""
+    url = f"{base_url}/{season}/{round_num}/{resource}.json?limit=2000"
+    data = fetch_json(url, session, **fetch_kwargs)
+    try:
+        races = data['MRData']['RaceTable']['Races']
+    except (TypeError, KeyError) as e:
+        raise MalformedResponse(f"{url}: no MRData.RaceTable.Races") from e
+    races = _rows(races, url, "Races")
+    return races[0] if races else {}
+
+
+def _rows(value, where: str, what: str, numbered: Optional[str] = None) -> List[Dict]:
+    """`value` if it is a list of objects (each with an integer `numbered` field), else MalformedResponse."""
+    if not isinstance(value, list) or not all(isinstance(row, dict) for row in value):
+        raise MalformedResponse(f"{where}: {what} is not a list of objects")
+    if numbered and not all(str(row.get(numbered, "")).isdigit() for row in value):
+        raise MalformedResponse(f"{where}: {what} entry without an integer {numbered!r}")
+    return value
+
+
+def fetch_race(season: int, round_num: int, session: Optional[requests.Session] = None,
+               base_url: str = ERGAST_URL, **fetch_kwargs) -> Dict[str, List[Dict]]:
+    """{"circuit", "laps", "pits"} of one race. Raises FetchError (MalformedResponse for a bad body)."""
+    race = _ergast_race(season, round_num, "laps", session, base_url, **fetch_kwargs)
+    pits = _ergast_race(season, round_num, "pitstops", session, base_url, **fetch_kwargs).get('PitStops', [])
+    where = f"{season} round {round_num}"
+    laps = _rows(race.get('Laps', []), where, "Laps", numbered='number')
+    for lap in laps:
+        _rows(lap.get('Timings'), where, f"Laps[{lap.get('number')}].Timings")
+    circuit = race.get('Circuit')
+    return {
+        "circuit": circuit.get('circuitId') if isinstance(circuit, dict) else None,
+        "laps": laps,
+        "pits": _rows(pits, where, "PitStops", numbered='lap'),
+    }
+
+
+def fetch_races(pairs: Iterable[Tuple[int, int]], max_workers: int = MAX_WORKERS, base_url: str = ERGAST_URL,
+                **fetch_kwargs) -> Tuple[Dict[Tuple[int, int], Dict], Dict[Tuple[int, int], str]]:
+    """
+    Fetch many (season, round) races concurrently, at most `max_workers` in
+    flight over one pooled session. Returns (races, failures) keyed by pair;
+    a failed race never aborts the others.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    races, failures = {}, {}
+    with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pair: pool.submit(fetch_race, *pair, session=session, base_url=base_url, **fetch_kwargs)
+            for pair in pairs
+        }
+        for pair, future in futures.items():
+            try:
+                races[pair] = future.result()
+            except (FetchError, ValueError, KeyError) as e:
+                failures[pair] = str(e)
+    return races, failures
+
+
 def fetch_ergast_laps(season: int, round_num: int) -> List[Dict]:
-    url = f"http://ergast.com/api/f1/{season}/{round_num}/laps.json?limit=2000"
     try:
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
-        laps = data['MRData']['RaceTable']['Races'][0]['Laps']
-        return laps
-    except Exception:
+        return _ergast_race(season, round_num, "laps").get('Laps', [])
+    except (FetchError, ValueError, KeyError) as e:
+        print(f"Lap fetch failed, using defaults: {e}", file=sys.stderr)
         return []
 
 def fetch_ergast_pits(season: int, round_num: int) -> List[Dict]:
-    url = f"http://ergast.com/api/f1/{season}/{round_num}/pitstops.json?limit=2000"
     try:
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
-        pits = data['MRData']['RaceTable']['Races'][0].get('PitStops', [])
-        return pits
-    except Exception:
+        return _ergast_race(season, round_num, "pitstops").get('PitStops', [])
+    except (FetchError, ValueError, KeyError) as e:
+        print(f"Pit stop fetch failed, using defaults: {e}", file=sys.stderr)
         return []
 
 # ------------------- Base Stats ------------------- #
 
 def compute_base_stats(laps: List[Dict], pits: List[Dict]) -> Dict:
-    lap_times_sec = []
-    for lap in laps:
-        for timing in lap.get('Timings', []):
-            mm, ss = map(float, timing['time'].split(':'))
-            lap_times_sec.append(mm * 60 + ss)
-    base_lap_time = sum(lap_times_sec) / len(lap_times_sec) if lap_times_sec else 90.0
+    lap_times_sec = parse_times(t.get('time') for lap in laps for t in lap.get('Timings', []))
+    lap_times_sec = lap_times_sec[~np.isnan(lap_times_sec)]
+    base_lap_time = float(lap_times_sec.mean()) if len(lap_times_sec) else 90.0
 
-    pit_times_sec = [float(pit['duration']) for pit in pits if 'duration' in pit]
-    avg_pit_loss = sum(pit_times_sec) / len(pit_times_sec) if pit_times_sec else 22.0
+    pit_times_sec = parse_times(pit.get('duration') for pit in pits)
+    pit_times_sec = pit_times_sec[~np.isnan(pit_times_sec)]
+    avg_pit_loss = float(pit_times_sec.mean()) if len(pit_times_sec) else 22.0
 
     tyre_wear_rate = 1.0 / 25  # assume full degradation in 25 laps if no telemetry
 
@@ -66,49 +229,36 @@ def compute_base_stats(laps: List[Dict], pits: List[Dict]) -> Dict:
 
 # ------------------- Synthetic Curves ------------------- #
 
-def generate_speed_curve(total_laps: int = TOTAL_LAPS, sectors: int = SECTORS) -> List[List[float]]:
+def generate_speed_curve(total_laps: int = TOTAL_LAPS, sectors: int = SECTORS,
+                         seed: Optional[int] = None) -> List[List[float]]:
     """Per-lap sector speed array with random realistic variations (m/s)."""
-    base_speed = 70.0
-    curve = []
-    for lap in range(total_laps):
-        lap_curve = [round(base_speed + np.random.normal(0, 2.0), 2) for _ in range(sectors)]
-        curve.append(lap_curve)
-    return curve
-
-def generate_tyrewear_curve(total_laps: int = TOTAL_LAPS, base_rate: float = 0.04) -> List[float]:
+    speed = generate_profiles(1, total_laps, sectors, seed=seed)["speed_shape"][0]
+    return np.round(speed.astype(float), 2).tolist()
+
+def generate_tyrewear_curve(total_laps: int = TOTAL_LAPS, base_rate: float = 0.04,
+                            seed: Optional[int] = None) -> List[float]:
     """Per-lap cumulative tyre wear (0-1)"""
-    wear_curve = []
-    cumulative = 0.0
-    for lap in range(total_laps):
-        increment = base_rate * random.uniform(0.9, 1.1)
-        cumulative += increment
-        wear_curve.append(round(min(cumulative, 1.0), 4))
-    return wear_curve
+    wear = generate_profiles(1, total_laps, 1, seed=seed, wear_rate=base_rate)["tyre_wear_shape"][0]
+    return np.round(wear.astype(float), 4).tolist()
 
 # ------------------- Agent Profiles ------------------- #
 
-def generate_agent_profiles(base_stats: Dict, num_agents: int = NUM_AGENTS) -> List[Dict]:
+def generate_agent_profiles(base_stats: Dict, num_agents: int = NUM_AGENTS, seed: Optional[int] = None) -> List[Dict]:
+    """Synthetic agents around `base_stats`, drawn as one seeded field (synth_profile)."""
+    field = generate_profiles(num_agents, TOTAL_LAPS, SECTORS, seed=seed, wear_rate=base_stats["tyre_wear_rate"])
+    speed = np.round(field["speed_shape"].astype(float), 2).tolist()
+    wear = np.round(field["tyre_wear_shape"].astype(float), 4).tolist()
     profiles = []
-    for i in range(num_agents):
-        aggression = round(random.uniform(0.3, 0.9), 2)
-        risk = round(random.uniform(0.2, 0.85), 2)
-        tyre_management = round(random.uniform(0.3, 0.9), 2)
-        pit_bias = round(random.uniform(0.2, 0.8), 2)
-        weather_sensitivity = round(random.uniform(0.3, 0.9), 2)
-
+    for i, traits in enumerate(field["traits"].tolist()):
         profiles.append({
             "id": f"agent_{i+1}",
             "name": f"Agent {i+1}",
-            "aggression": aggression,
-            "risk": risk,
-            "tyre_management": tyre_management,
-            "pit_bias": pit_bias,
-            "weather_sensitivity": weather_sensitivity,
+            **dict(zip(TRAITS, traits)),
             "base_lap_time": base_stats["base_lap_time"],
             "avg_pit_loss": base_stats["avg_pit_loss"],
             "tyre_wear_rate": base_stats["tyre_wear_rate"],
-            "speed_shape": generate_speed_curve(),
-            "tyre_wear_shape": generate_tyrewear_curve(base_rate=base_stats["tyre_wear_rate"])
+            "speed_shape": speed[i],
+            "tyre_wear_shape": wear[i],
         })
     return profiles
 
@@ -117,19 +267,44 @@ def generate_agent_profiles(base_stats: Dict, num_agents: int = NUM_AGENTS) -> L
 def save_profiles(profiles: List[Dict], path: str = OUTPUT_JSON):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w") as f:
-        json.dump(profiles, f, indent=4)
+        json.dump(profiles, f, separators=(",", ":"))
     print(f"Saved {len(profiles)} agent profiles to {path}")
 
 # ------------------- Main ------------------- #
 
-def main():
-    SEASON = 2025
-    ROUND = 1
-    laps = fetch_ergast_laps(SEASON, ROUND)
-    pits = fetch_ergast_pits(SEASON, ROUND)
+def parse_rounds(spec: str) -> List[int]:
+    """"1-5,8" -> [1, 2, 3, 4, 5, 8]"""
+    rounds = []
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        rounds.extend(range(int(first), int(last or first) + 1))
+    return rounds
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--season", type=int, default=2025)
+    parser.add_argument("--rounds", default="1", help='e.g. "1-24" or "1,3,5"')
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--offline", action="store_true", help="serve from the cache only")
+    parser.add_argument("--output", type=Path, default=OUTPUT_JSON)
+    parser.add_argument("--store", type=Path, default=LAP_STORE, help="lap/pit store (SQLite)")
+    parser.add_argument("--seed", type=int, help="seed for the synthetic agents and curves")
+    args = parser.parse_args(argv)
+
+    pairs = [(args.season, r) for r in parse_rounds(args.rounds)]
+    races, failures = fetch_races(pairs, max_workers=args.workers, cache_dir=args.cache_dir, offline=args.offline)
+    for (season, round_num), error in sorted(failures.items()):
+        print(f"Skipped {season} round {round_num}: {error}", file=sys.stderr)
+    with LapStore(args.store) as store:
+        for (season, round_num), race in races.items():
+            store.add_race(season, round_num, race["laps"], race["pits"], race["circuit"])
+    laps = [lap for race in races.values() for lap in race["laps"]]
+    pits = [pit for race in races.values() for pit in race["pits"]]
     base_stats = compute_base_stats(laps, pits)
-    profiles = generate_agent_profiles(base_stats)
-    save_profiles(profiles)
+    profiles = generate_agent_profiles(base_stats, seed=args.seed)
+    save_profiles(profiles, args.output)
 
 if __name__ == "__main__":
     main()
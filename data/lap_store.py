@@ -0,0 +1,221 @@
+"""
+Local store of historical lap times and pit stops (SQLite).
+
+f1_ingest.py writes every fetched race here, so calibration and track setup
+query indexed columns instead of reparsing raw Ergast JSON.
+
+Tables (one row per timing / stop, times in seconds):
+  races(season, round, circuit)
+  laps(season, round, circuit, driver, lap, position, time, pit_lap)
+  pit_stops(season, round, circuit, driver, stop, lap, duration)
+indexed on (season, round, driver, lap), (circuit, driver) and (driver).
+
+Query API (filters: season, round, circuit, driver):
+  LapStore.base_pace(**filters)        -> distribution of clean lap times
+  LapStore.pit_loss(**filters)         -> distribution of pit stop durations
+  LapStore.base_pace_by(key, **filters) / pit_loss_by(key, **filters)
+                                       -> {circuit or driver: distribution}
+  LapStore.lap_times(**filters)        -> raw np.ndarray
+A distribution is {"count", "mean", "std", "p10", "p50", "p90"}.
+
+The backend reads these distributions through services/lap_history.py
+(track_distributions). The simulation engines still run on the fixed
+parameters in backend/services/race_model.py: per-track pace and pit loss
+from here are not yet fed into a race.
+"""
+
+from pathlib import Path
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+LAP_STORE = Path("data/laps.sqlite")
+
+FILTERS = ("season", "round", "circuit", "driver")
+GROUP_KEYS = ("circuit", "driver")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS races (
+    season INTEGER NOT NULL, round INTEGER NOT NULL, circuit TEXT,
+    PRIMARY KEY (season, round)
+);
+CREATE TABLE IF NOT EXISTS laps (
+    season INTEGER NOT NULL, round INTEGER NOT NULL, circuit TEXT, driver TEXT NOT NULL,
+    lap INTEGER NOT NULL, position INTEGER, time REAL,
+    pit_lap INTEGER NOT NULL DEFAULT 0  -- 1 on a pit in-lap or out-lap
+);
+CREATE TABLE IF NOT EXISTS pit_stops (
+    season INTEGER NOT NULL, round INTEGER NOT NULL, circuit TEXT, driver TEXT NOT NULL,
+    stop INTEGER, lap INTEGER NOT NULL, duration REAL
+);
+CREATE INDEX IF NOT EXISTS laps_race ON laps (season, round, driver, lap);
+CREATE INDEX IF NOT EXISTS laps_circuit ON laps (circuit, driver);
+CREATE INDEX IF NOT EXISTS laps_driver ON laps (driver);
+CREATE INDEX IF NOT EXISTS pit_stops_race ON pit_stops (season, round, driver, lap);
+CREATE INDEX IF NOT EXISTS pit_stops_circuit ON pit_stops (circuit, driver);
+CREATE INDEX IF NOT EXISTS pit_stops_driver ON pit_stops (driver);
+"""
+
+# Laps that measure race pace: not the standing-start lap, nor a pit in/out lap
+_CLEAN_LAP = "l.lap > 1 AND l.pit_lap = 0"
+
+# ------------------- Parsing ------------------- #
+
+def parse_times(values: Iterable[Any]) -> np.ndarray:
+    """
+    Ergast time strings ("1:32.456", "23.917") -> seconds, in one pass over
+    the whole column. Missing or malformed values become NaN.
+    """
+    text = np.asarray([v if isinstance(v, str) else "" for v in values], dtype=str)
+    if text.size == 0:
+        return np.empty(0)
+    head, sep, tail = np.char.partition(np.char.strip(text), ":").T
+    has_minutes = sep == ":"
+    minutes = np.where(has_minutes, head, "0")
+    seconds = np.where(has_minutes, tail, head)
+    valid = np.char.isdigit(minutes) & np.char.isdigit(np.char.replace(seconds, ".", "", count=1))
+    out = np.full(text.shape, np.nan)
+    out[valid] = minutes[valid].astype(float) * 60 + seconds[valid].astype(float)
+    return out
+
+
+def _lap_columns(laps: List[Dict]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    timings = [(lap.get("number"), t) for lap in laps for t in lap.get("Timings", [])]
+    drivers = [t.get("driverId", "") for _, t in timings]
+    numbers = np.array([int(n) for n, _ in timings], dtype=np.int64)
+    positions = np.array([int(t.get("position") or 0) for _, t in timings], dtype=np.int64)
+    return drivers, numbers, positions, parse_times(t.get("time") for _, t in timings)
+
+
+def _pit_columns(pits: List[Dict]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    drivers = [p.get("driverId", "") for p in pits]
+    stops = np.array([int(p.get("stop") or 0) for p in pits], dtype=np.int64)
+    laps = np.array([int(p["lap"]) for p in pits], dtype=np.int64)
+    return drivers, stops, laps, parse_times(p.get("duration") for p in pits)
+
+# ------------------- Distributions ------------------- #
+
+def distribution(values: np.ndarray) -> Dict[str, Optional[float]]:
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {"count": 0, "mean": None, "std": None, "p10": None, "p50": None, "p90": None}
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {
+        "count": int(len(values)),
+        "mean": round(float(values.mean()), 3),
+        "std": round(float(values.std()), 3),
+        "p10": round(float(p10), 3),
+        "p50": round(float(p50), 3),
+        "p90": round(float(p90), 3),
+    }
+
+
+def _where(filters: Dict[str, Any], alias: str) -> Tuple[str, list]:
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise ValueError(f"unknown filters {sorted(unknown)}; expected {FILTERS}")
+    used = [key for key in FILTERS if filters.get(key) is not None]
+    clauses = [f"{alias}.{key} = ?" for key in used]
+    return " AND ".join(clauses) or "1", [filters[key] for key in used]
+
+# ------------------- Store ------------------- #
+
+class LapStore:
+    def __init__(self, path: str | Path = LAP_STORE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    # ---------------- writes ---------------- #
+
+    def add_race(self, season: int, round_num: int, laps: List[Dict], pits: List[Dict], circuit: Optional[str] = None):
+        """Store (or replace) one race's Ergast Laps and PitStops, in one transaction."""
+        drivers, numbers, positions, times = _lap_columns(laps)
+        pit_drivers, stops, pit_laps, durations = _pit_columns(pits)
+        # in-laps (the stop's lap) and out-laps (the lap after)
+        pitted = set(zip(pit_drivers, pit_laps.tolist())) | set(zip(pit_drivers, (pit_laps + 1).tolist()))
+        pit_flags = [int(pair in pitted) for pair in zip(drivers, numbers.tolist())]
+        key = (season, round_num)
+        with self._conn:
+            self._conn.execute("DELETE FROM laps WHERE season = ? AND round = ?", key)
+            self._conn.execute("DELETE FROM pit_stops WHERE season = ? AND round = ?", key)
+            self._conn.execute("INSERT OR REPLACE INTO races VALUES (?, ?, ?)", (*key, circuit))
+            self._conn.executemany(
+                "INSERT INTO laps VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                zip([season] * len(drivers), [round_num] * len(drivers), [circuit] * len(drivers), drivers,
+                    numbers.tolist(), positions.tolist(), _nullable(times), pit_flags),
+            )
+            self._conn.executemany(
+                "INSERT INTO pit_stops VALUES (?, ?, ?, ?, ?, ?, ?)",
+                zip([season] * len(pit_drivers), [round_num] * len(pit_drivers), [circuit] * len(pit_drivers),
+                    pit_drivers, stops.tolist(), pit_laps.tolist(), _nullable(durations)),
+            )
+
+    # ---------------- queries ---------------- #
+
+    def races(self) -> List[Tuple[int, int, Optional[str]]]:
+        return self._conn.execute("SELECT season, round, circuit FROM races ORDER BY season, round").fetchall()
+
+    def lap_times(self, clean: bool = True, **filters) -> np.ndarray:
+        """Lap times in seconds; `clean` drops lap 1 and pit in/out laps."""
+        where, params = _where(filters, "l")
+        sql = f"SELECT l.time FROM laps l WHERE {where} AND l.time IS NOT NULL"
+        return self._column(sql + (f" AND {_CLEAN_LAP}" if clean else ""), params)
+
+    def pit_durations(self, **filters) -> np.ndarray:
+        where, params = _where(filters, "p")
+        return self._column(f"SELECT p.duration FROM pit_stops p WHERE {where} AND p.duration IS NOT NULL", params)
+
+    def base_pace(self, clean: bool = True, **filters) -> Dict[str, Optional[float]]:
+        return distribution(self.lap_times(clean, **filters))
+
+    def pit_loss(self, **filters) -> Dict[str, Optional[float]]:
+        return distribution(self.pit_durations(**filters))
+
+    def base_pace_by(self, key: str, clean: bool = True, **filters) -> Dict[str, Dict[str, Optional[float]]]:
+        where, params = _where(filters, "l")
+        sql = f"SELECT l.{_group_key(key)}, l.time FROM laps l WHERE {where} AND l.time IS NOT NULL"
+        return self._grouped(sql + (f" AND {_CLEAN_LAP}" if clean else ""), params)
+
+    def pit_loss_by(self, key: str, **filters) -> Dict[str, Dict[str, Optional[float]]]:
+        where, params = _where(filters, "p")
+        sql = f"SELECT p.{_group_key(key)}, p.duration FROM pit_stops p WHERE {where} AND p.duration IS NOT NULL"
+        return self._grouped(sql, params)
+
+    # ---------------- internals ---------------- #
+
+    def _column(self, sql: str, params: list) -> np.ndarray:
+        rows = self._conn.execute(sql, params).fetchall()
+        return np.fromiter((row[0] for row in rows), dtype=float, count=len(rows))
+
+    def _grouped(self, sql: str, params: list) -> Dict[str, Dict[str, Optional[float]]]:
+        rows = self._conn.execute(sql, params).fetchall()
+        if not rows:
+            return {}
+        keys = np.array([row[0] or "" for row in rows], dtype=str)
+        values = np.fromiter((row[1] for row in rows), dtype=float, count=len(rows))
+        order = np.argsort(keys, kind="stable")
+        unique, starts = np.unique(keys[order], return_index=True)
+        groups = np.split(values[order], starts[1:])
+        return {str(k): distribution(v) for k, v in zip(unique, groups)}
+
+
+def _group_key(key: str) -> str:
+    if key not in GROUP_KEYS:
+        raise ValueError(f"group key must be one of {GROUP_KEYS}")
+    return key
+
+
+def _nullable(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(v) else v for v in values.tolist()]
@@ -1,40 +1,144 @@
 """
-Generate synthetic speed & tyre curves when telemetry is missing.
+Generate synthetic agent profiles and speed & tyre curves when telemetry is missing.
 Used by f1_ingest.py or any other synthetic scenario.
+
+generate_profiles() draws a whole field (traits, agents x laps x sectors
+speed shapes, agents x laps tyre wear) in a few array operations from one
+seeded numpy Generator, so the same seed always gives the same field.
+save_field() writes it as one .npy per array (memory-mappable) plus a small
+index.json; load_field() reads it back, memory-mapped by default.
+
+    python data/synth_profile.py --agents 10000 --seed 7 --out data/synthetic
 """
 
-import numpy as np
+import argparse
 import json
+import numpy as np
 from pathlib import Path
+from typing import Dict, List, Optional
 
 OUTPUT_JSON = Path("data/agent_profiles.json")
+OUTPUT_DIR = Path("data/synthetic")
+
+LAPS = 50
+SECTORS = 3
+BASE_SPEED = 70.0  # m/s average
+SPEED_NOISE = 2.0
+BASE_WEAR_RATE = 0.04
+WEAR_JITTER = 0.1  # per-lap wear increment within +-10% of the base rate
+
+# Trait -> uniform range, as drawn for ingested agents
+TRAIT_RANGES = {
+    "aggression": (0.3, 0.9),
+    "risk": (0.2, 0.85),
+    "tyre_management": (0.3, 0.9),
+    "pit_bias": (0.2, 0.8),
+    "weather_sensitivity": (0.3, 0.9),
+}
+TRAITS = tuple(TRAIT_RANGES)
+ARRAYS = ("traits", "speed_shape", "tyre_wear_shape")
+
+
+def generate_profiles(n: int, laps: int = LAPS, sectors: int = SECTORS, seed: Optional[int] = None,
+                      wear_rate: float = BASE_WEAR_RATE) -> Dict[str, np.ndarray]:
+    """
+    A synthetic field of `n` agents:
+      traits           n x len(TRAITS), rounded to 0.01
+      speed_shape      n x laps x sectors sector speeds (m/s), float32
+      tyre_wear_shape  n x laps cumulative wear (0-1), float32
+    """
+    rng = np.random.default_rng(seed)
+    low, high = np.array(list(TRAIT_RANGES.values())).T
+    traits = np.round(rng.uniform(low, high, (n, len(TRAITS))), 2)
+    speed = (BASE_SPEED + rng.normal(0.0, SPEED_NOISE, (n, laps, sectors))).astype(np.float32)
+    increments = wear_rate * rng.uniform(1 - WEAR_JITTER, 1 + WEAR_JITTER, (n, laps))
+    wear = np.minimum(np.cumsum(increments, axis=1), 1.0).astype(np.float32)
+    return {"traits": traits, "speed_shape": speed, "tyre_wear_shape": wear}
+
 
+def generate_synthetic_speed_curve(laps: int = LAPS, sectors: int = SECTORS, seed: Optional[int] = None) -> List[List[float]]:
+    """Return a synthetic speed shape array (m/s), laps x sectors."""
+    speed = BASE_SPEED + np.random.default_rng(seed).normal(0.0, SPEED_NOISE, (laps, sectors))
+    return np.round(speed, 2).tolist()
 
-def generate_synthetic_speed_curve(laps: int = 50, sectors: int = 3):
-    """Return a synthetic speed shape array (m/s) for one lap."""
-    base_speed = 70.0  # m/s average
-    curve = []
-    for lap in range(laps):
-        lap_curve = []
-        for s in range(sectors):
-            fluct = np.random.normal(0, 2.0)
-            lap_curve.append(round(base_speed + fluct, 2))
-        curve.append(lap_curve)
-    return curve
 
+def agent_settings(field: Dict[str, np.ndarray], prefix: str = "agent_") -> List[Dict]:
+    """Agent settings for run_simulation (e.g. engine="numpy" stress runs)."""
+    columns = {key: field["traits"][:, i].tolist() for i, key in enumerate(TRAITS)}
+    return [
+        {"id": f"{prefix}{i + 1}", "risk_taking": columns["risk"][i],
+         **{key: values[i] for key, values in columns.items()}}
+        for i in range(len(field["traits"]))
+    ]
 
-def add_speed_shapes(profiles_json: str = OUTPUT_JSON):
-    """Fill in speed_shape arrays for existing profiles."""
+# ------------------- Binary output ------------------- #
+
+def save_field(field: Dict[str, np.ndarray], directory: str | Path = OUTPUT_DIR, seed: Optional[int] = None,
+               prefix: str = "agent_") -> Path:
+    """Write <array>.npy files and index.json into `directory`; returns the index path."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in ARRAYS:
+        np.save(directory / f"{name}.npy", field[name])
+    n, laps, sectors = field["speed_shape"].shape
+    index = {
+        "agents": n,
+        "laps": laps,
+        "sectors": sectors,
+        "seed": seed,
+        "id_prefix": prefix,  # agent i (0-based) is f"{id_prefix}{i + 1}"
+        "traits": list(TRAITS),
+        "arrays": {name: f"{name}.npy" for name in ARRAYS},
+    }
+    path = directory / "index.json"
+    path.write_text(json.dumps(index, indent=2))
+    return path
+
+
+def load_field(directory: str | Path = OUTPUT_DIR, mmap: bool = True) -> Dict[str, np.ndarray]:
+    directory = Path(directory)
+    index = json.loads((directory / "index.json").read_text())
+    mode = "r" if mmap else None
+    return {name: np.load(directory / file, mmap_mode=mode) for name, file in index["arrays"].items()}
+
+# ------------------- JSON profiles ------------------- #
+
+def add_speed_shapes(profiles_json: str = OUTPUT_JSON, seed: Optional[int] = None,
+                     laps: int = LAPS, sectors: int = SECTORS):
+    """
+    Fill in laps x sectors speed_shape arrays for existing profiles. The file
+    is either a list of profiles or {"profiles": [...]} (agent_profiles.json),
+    and is written back in the same shape.
+    """
     with open(profiles_json, "r") as f:
-        profiles = json.load(f)
+        data = json.load(f)
+    profiles = data["profiles"] if isinstance(data, dict) else data
 
-    for profile in profiles:
-        profile["speed_shape"] = generate_synthetic_speed_curve()
+    speed = BASE_SPEED + np.random.default_rng(seed).normal(0.0, SPEED_NOISE, (len(profiles), laps, sectors))
+    for profile, shape in zip(profiles, np.round(speed, 2).tolist()):
+        profile["speed_shape"] = shape
 
     with open(profiles_json, "w") as f:
-        json.dump(profiles, f, indent=4)
+        json.dump(data, f, indent=2)
     print(f"Synthetic speed curves added to {profiles_json}")
 
 
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Synthetic agent profiles")
+    parser.add_argument("--agents", type=int, help="generate a binary field of this many agents")
+    parser.add_argument("--laps", type=int, default=LAPS)
+    parser.add_argument("--sectors", type=int, default=SECTORS)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--out", type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args(argv)
+
+    if args.agents is None:
+        add_speed_shapes(seed=args.seed, laps=args.laps, sectors=args.sectors)  # into agent_profiles.json
+        return
+    field = generate_profiles(args.agents, args.laps, args.sectors, seed=args.seed)
+    index = save_field(field, args.out, seed=args.seed)
+    print(f"Saved {args.agents} synthetic agents to {index.parent}")
+
+
 if __name__ == "__main__":
-    add_speed_shapes()
+    main()